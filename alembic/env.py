@@ -21,6 +21,7 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 from src.app.database.models import Base
 from src.app.config import settings
+from src.app.database.search import FTS_TABLE
 
 target_metadata = Base.metadata
 
@@ -28,7 +29,14 @@ target_metadata = Base.metadata
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
-config.set_main_option("sqlalchemy.url", settings.db.db_url)
+config.set_main_option(
+    "sqlalchemy.url", config.attributes.get("db_url", settings.db.db_url)
+)
+
+
+def include_name(name, type_, parent_names) -> bool:
+    """Leaves the FTS5 index and its shadow tables out of autogenerate."""
+    return not (type_ == "table" and name.startswith(FTS_TABLE))
 
 
 def run_migrations_offline() -> None:
@@ -47,6 +55,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -56,7 +65,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,35 @@
+"""Add (user_id, date, id) index to financial records
+
+Revision ID: 90e1b9cbaf69
+Revises: bd295f8c1f83
+Create Date: 2026-10-18 09:10:42.512093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "90e1b9cbaf69"
+down_revision: Union[str, None] = "bd295f8c1f83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_financialrecords_user_id_date_id",
+        "financialrecords",
+        ["user_id", "date", "id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_financialrecords_user_id_date_id",
+        table_name="financialrecords",
+    )
@@ -0,0 +1,62 @@
+"""Create monthly rollups table
+
+Revision ID: a442f05982e7
+Revises: 90e1b9cbaf69
+Create Date: 2026-10-18 10:24:07.318554
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a442f05982e7"
+down_revision: Union[str, None] = "90e1b9cbaf69"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "monthlyrollups",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("category_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "type",
+            sa.Enum("expense", "income", name="typefinancerecord"),
+            nullable=False,
+        ),
+        sa.Column("month", sa.String(length=7), nullable=False),
+        sa.Column("amount", sa.Float(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["category_id"], ["categories.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id",
+            "category_id",
+            "type",
+            "month",
+            name="uq_monthlyrollups_user_category_type_month",
+        ),
+    )
+    op.execute(
+        """
+        INSERT INTO monthlyrollups
+            (user_id, category_id, type, month, amount, count)
+        SELECT user_id, category_id, type, strftime('%Y-%m', date),
+               sum(amount), count(id)
+        FROM financialrecords
+        GROUP BY user_id, category_id, type, strftime('%Y-%m', date)
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("monthlyrollups")
@@ -0,0 +1,40 @@
+"""Never reuse IDs of categories and financial records
+
+Revision ID: 5c3f9e2a7d14
+Revises: a442f05982e7
+Create Date: 2026-10-18 11:05:31.270918
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c3f9e2a7d14"
+down_revision: Union[str, None] = "a442f05982e7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("categories", "financialrecords")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite keeps the last ID of AUTOINCREMENT tables in sqlite_sequence,
+    # which is where each shard's ID range is reserved.
+    for table in TABLES:
+        with op.batch_alter_table(
+            table,
+            recreate="always",
+            table_kwargs={"sqlite_autoincrement": True},
+        ):
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table, recreate="always"):
+            pass
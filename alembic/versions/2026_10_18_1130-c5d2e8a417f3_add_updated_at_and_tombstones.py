@@ -0,0 +1,53 @@
+"""Add updated_at and deleted_at to financial records and categories
+
+Revision ID: c5d2e8a417f3
+Revises: 5c3f9e2a7d14
+Create Date: 2026-10-18 11:30:52.604113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d2e8a417f3"
+down_revision: Union[str, None] = "5c3f9e2a7d14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("financialrecords", "categories")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        # Existing rows predate every sync cursor, so any past time works.
+        op.add_column(
+            table,
+            sa.Column(
+                "updated_at",
+                sa.DateTime(),
+                nullable=False,
+                server_default="1970-01-01 00:00:00.000000",
+            ),
+        )
+        op.add_column(table, sa.Column("deleted_at", sa.DateTime()))
+        op.create_index(
+            f"ix_{table}_user_id_updated_at",
+            table,
+            ["user_id", "updated_at"],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        op.drop_index(f"ix_{table}_user_id_updated_at", table_name=table)
+        with op.batch_alter_table(
+            table, table_kwargs={"sqlite_autoincrement": True}
+        ) as batch_op:
+            batch_op.drop_column("deleted_at")
+            batch_op.drop_column("updated_at")
@@ -0,0 +1,71 @@
+"""Create full-text index of financial records
+
+Revision ID: 7b9d41c6e8f2
+Revises: e1f6b3a09c27
+Create Date: 2026-10-18 13:40:52.904113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b9d41c6e8f2"
+down_revision: Union[str, None] = "e1f6b3a09c27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE VIRTUAL TABLE financialrecords_fts USING fts5(
+            description,
+            user_id,
+            content='financialrecords',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3 4'
+        )
+        """)
+    op.execute("""
+        CREATE TRIGGER financialrecords_fts_insert
+        AFTER INSERT ON financialrecords WHEN new.deleted_at IS NULL BEGIN
+            INSERT INTO financialrecords_fts (rowid, description, user_id)
+            VALUES (new.id, new.description, new.user_id);
+        END
+        """)
+    op.execute("""
+        CREATE TRIGGER financialrecords_fts_delete
+        AFTER DELETE ON financialrecords WHEN old.deleted_at IS NULL BEGIN
+            INSERT INTO financialrecords_fts
+                (financialrecords_fts, rowid, description, user_id)
+            VALUES ('delete', old.id, old.description, old.user_id);
+        END
+        """)
+    op.execute("""
+        CREATE TRIGGER financialrecords_fts_update
+        AFTER UPDATE OF description, deleted_at ON financialrecords BEGIN
+            INSERT INTO financialrecords_fts
+                (financialrecords_fts, rowid, description, user_id)
+            SELECT 'delete', old.id, old.description, old.user_id
+            WHERE old.deleted_at IS NULL;
+            INSERT INTO financialrecords_fts (rowid, description, user_id)
+            SELECT new.id, new.description, new.user_id
+            WHERE new.deleted_at IS NULL;
+        END
+        """)
+    op.execute("""
+        INSERT INTO financialrecords_fts (rowid, description, user_id)
+        SELECT id, description, user_id FROM financialrecords
+        WHERE deleted_at IS NULL
+        """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER financialrecords_fts_update")
+    op.execute("DROP TRIGGER financialrecords_fts_delete")
+    op.execute("DROP TRIGGER financialrecords_fts_insert")
+    op.execute("DROP TABLE financialrecords_fts")
@@ -0,0 +1,48 @@
+"""Create archived partitions table
+
+Revision ID: 3f8a6c2d91b4
+Revises: 7b9d41c6e8f2
+Create Date: 2026-10-18 14:55:41.612907
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f8a6c2d91b4"
+down_revision: Union[str, None] = "7b9d41c6e8f2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "archivedpartitions",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("path", sa.String(), nullable=False),
+        sa.Column("records", sa.Integer(), nullable=False),
+        sa.Column("first_date", sa.DateTime(), nullable=False),
+        sa.Column("last_date", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_archivedpartitions_user_id"),
+        "archivedpartitions",
+        ["user_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_archivedpartitions_user_id"), table_name="archivedpartitions"
+    )
+    op.drop_table("archivedpartitions")
@@ -0,0 +1,67 @@
+"""Make names of live categories unique per user, ignoring case
+
+Revision ID: 9a4e7c1b5d28
+Revises: 3f8a6c2d91b4
+Create Date: 2026-10-18 16:10:37.481925
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4e7c1b5d28"
+down_revision: Union[str, None] = "3f8a6c2d91b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Live categories sharing a name with an older live category of the user.
+DUPLICATES = """
+SELECT id FROM categories AS c
+WHERE deleted_at IS NULL AND EXISTS (
+    SELECT 1 FROM categories AS o
+    WHERE o.user_id = c.user_id
+        AND lower(o.name) = lower(c.name)
+        AND o.deleted_at IS NULL
+        AND o.id < c.id
+)
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicates get their ID appended, which keeps their records and
+    # lets the user merge them; clients see the rename on the next sync.
+    op.execute(
+        f"""
+        UPDATE dataversions SET version = version + 1
+        WHERE user_id IN (
+            SELECT user_id FROM categories WHERE id IN ({DUPLICATES})
+        )
+        """
+    )
+    op.execute(
+        f"""
+        UPDATE categories
+        SET name = name || ' (' || id || ')',
+            updated_at = strftime('%Y-%m-%d %H:%M:%f000', 'now')
+        WHERE id IN ({DUPLICATES})
+        """
+    )
+    op.create_index(
+        "uq_categories_user_id_lower_name",
+        "categories",
+        ["user_id", sa.text("lower(name)")],
+        unique=True,
+        sqlite_where=sa.text("deleted_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "uq_categories_user_id_lower_name", table_name="categories"
+    )
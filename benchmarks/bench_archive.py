@@ -0,0 +1,131 @@
+"""Compares reads of a long history before and after archiving old years.
+
+Usage: poetry run python benchmarks/bench_archive.py [--rows 200000]
+    [--keep-days 365] [--repeat 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import FinancialRecordCreate
+from app.database import archive
+from common import Timer, create_user, print_table, temporary_database
+
+HISTORY_DAYS = 5 * 365
+END = datetime(2026, 1, 1)
+
+
+def make_records(count: int, category_id: int):
+    """Generates evenly spread records of the last five years."""
+    start = END - timedelta(days=HISTORY_DAYS)
+    step = timedelta(days=HISTORY_DAYS) / count
+    return [
+        FinancialRecordCreate(
+            type="expense",
+            description=f"Card payment {i}",
+            amount=float(i % 500),
+            date=start + i * step,
+            category_id=category_id,
+        )
+        for i in range(count)
+    ]
+
+
+def database_size(helper) -> float:
+    """Returns size of the SQLite file and its WAL in MB."""
+    path = Path(helper.engine.url.database)
+    wal = path.with_name(path.name + "-wal")
+    return sum(p.stat().st_size for p in (path, wal) if p.exists()) / 2**20
+
+
+async def time_reads(helper, user_id, recent_from, repeat) -> list[float]:
+    """Returns median ms of recent and full-history reads."""
+    reads = {
+        "recent page": lambda s: crud.get_financial_records(
+            s, user_id, limit=100, date_from=recent_from
+        ),
+        "recent summary": lambda s: crud.get_financial_summary(
+            s, user_id, date_from=recent_from
+        ),
+        "full summary": lambda s: crud.get_financial_summary(s, user_id),
+        "oldest page": lambda s: crud.get_financial_records(
+            s, user_id, limit=100
+        ),
+    }
+    medians = []
+    for read in reads.values():
+        samples = []
+        for _ in range(repeat):
+            async with helper.read_session_factory() as session:
+                with Timer() as timer:
+                    await read(session)
+            samples.append(timer.elapsed)
+        medians.append(statistics.median(samples) * 1000)
+
+    with Timer() as timer:
+        async with helper.read_session_factory() as session:
+            async for _ in crud.stream_financial_records(session, user_id):
+                pass
+    return list(reads), medians + [timer.elapsed * 1000]
+
+
+async def main(rows_count: int, keep_days: int, repeat: int) -> None:
+    """Archives all but the last days and compares reads and file size."""
+    with tempfile.TemporaryDirectory() as archive_dir:
+        archive.settings.archive.dir = Path(archive_dir)
+        async with temporary_database() as helper:
+            user_id, category_id = await create_user(helper)
+            async with helper.session_factory() as session:
+                await crud.create_financial_records_bulk(
+                    session, make_records(rows_count, category_id), user_id
+                )
+            cutoff = END - timedelta(days=keep_days)
+
+            names, before = await time_reads(helper, user_id, cutoff, repeat)
+            async with helper.engine.connect() as conn:
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            size_before = database_size(helper)
+            with Timer() as timer:
+                while await archive.archive_records(
+                    helper.session_factory,
+                    helper.writer,
+                    user_id,
+                    cutoff,
+                    limit=100000,
+                ):
+                    pass
+            async with helper.engine.connect() as conn:
+                conn = await conn.execution_options(
+                    isolation_level="AUTOCOMMIT"
+                )
+                await conn.exec_driver_sql("VACUUM")
+                await conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            names, after = await time_reads(helper, user_id, cutoff, repeat)
+            size_after = database_size(helper)
+            parquet = sum(
+                p.stat().st_size for p in Path(archive_dir).rglob("*")
+            )
+
+    print(f"Archived in {timer.elapsed:.1f} s")
+    print_table(
+        ["read", "hot only ms", "archived ms"],
+        [[name, b, a] for name, b, a in zip(names + ["export"], before, after)]
+        + [
+            ["SQLite MB", size_before, size_after],
+            ["Parquet MB", 0.0, parquet / 2**20],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--keep-days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.keep_days, args.repeat))
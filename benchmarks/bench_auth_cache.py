@@ -0,0 +1,114 @@
+"""Compares authenticated GET latency with and without the claims cache.
+
+Usage: PYTHONPATH=src:. poetry run python benchmarks/bench_auth_cache.py
+    [--requests 2000] [--users 10]
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+from pathlib import Path
+
+import httpx
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import Depends, FastAPI
+
+from app.api.financial_records import utils
+from app.api.users.claims_cache import claims_cache
+from app.api.users.utils import encode_jwt
+from app.config import settings
+from app.database.models import User
+from common import Timer, percentile, print_table, temporary_database
+
+
+def write_keys(directory: Path) -> None:
+    """Points the JWT settings to a fresh RSA key pair."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_key_path = directory / "jwt-private.pem"
+    public_key_path = directory / "jwt-public.pem"
+    private_key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_key_path.write_bytes(
+        key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    settings.auth_jwt.private_key_path = private_key_path
+    settings.auth_jwt.public_key_path = public_key_path
+
+
+async def bench(requests: int, users: int) -> list:
+    """Times sequential authenticated GETs with the cache off and on."""
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user_id: int = Depends(utils.get_current_user)):
+        return {"user_id": user_id}
+
+    rows = []
+    async with temporary_database() as helper:
+        async with helper.session_factory() as session:
+            accounts = [
+                User(username=f"user{i}", hashed_password=b"-")
+                for i in range(users)
+            ]
+            session.add_all(accounts)
+            await session.commit()
+            tokens = [
+                encode_jwt({"sub": user.username, "user_id": user.id})
+                for user in accounts
+            ]
+        app.dependency_overrides[utils.db_helper.read_session_dependency] = (
+            helper.read_session_dependency
+        )
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            for label, maxsize in (("no cache", 0), ("cache", users)):
+                claims_cache.clear()
+                claims_cache.maxsize = maxsize
+                claims_cache.hits = claims_cache.misses = 0
+                samples = []
+                for i in range(requests):
+                    client.cookies.set("access_token", tokens[i % users])
+                    with Timer() as timer:
+                        response = await client.get("/me")
+                    assert response.status_code == 200, response.text
+                    samples.append(timer.elapsed * 1000)
+                rows.append(
+                    [
+                        label,
+                        statistics.median(samples),
+                        percentile(samples, 95),
+                        requests / (sum(samples) / 1000),
+                        claims_cache.hits,
+                        claims_cache.misses,
+                    ]
+                )
+    return rows
+
+
+async def main(requests: int, users: int) -> None:
+    """Runs the benchmark and prints latency per configuration."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_keys(Path(tmp))
+        rows = await bench(requests, users)
+    print_table(["auth", "p50 ms", "p95 ms", "req/s", "hits", "misses"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.users))
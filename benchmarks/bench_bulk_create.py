@@ -0,0 +1,79 @@
+"""Compares per-record and bulk creation of financial records.
+
+Usage: poetry run python benchmarks/bench_bulk_create.py [--records N]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import FinancialRecordCreate
+from common import Timer, create_user, print_table, temporary_database
+
+
+def make_records(count: int, category_id: int):
+    """Generates a year of synthetic expense records."""
+    start = datetime(2025, 1, 1)
+    return [
+        FinancialRecordCreate(
+            type="expense",
+            description=f"Imported transaction {i}",
+            amount=float(i % 500),
+            date=start + timedelta(minutes=i * 263),
+            category_id=category_id,
+        )
+        for i in range(count)
+    ]
+
+
+async def bench_per_record(records_count: int) -> float:
+    """Creates records one by one, committing each as the POST / does."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        records = make_records(records_count, category_id)
+        async with helper.session_factory() as session:
+            with Timer() as timer:
+                for record in records:
+                    await crud.create_financial_record(
+                        session, record, user_id=user_id
+                    )
+        return timer.elapsed
+
+
+async def bench_bulk(records_count: int) -> float:
+    """Creates all records with a single bulk insert transaction."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        records = make_records(records_count, category_id)
+        async with helper.session_factory() as session:
+            with Timer() as timer:
+                await crud.create_financial_records_bulk(
+                    session, records, user_id=user_id
+                )
+        return timer.elapsed
+
+
+async def main(records_count: int) -> None:
+    """Runs both variants and prints their throughput."""
+    per_record = await bench_per_record(records_count)
+    bulk = await bench_bulk(records_count)
+    print_table(
+        ["variant", "records", "seconds", "records/s"],
+        [
+            [
+                "POST / per record",
+                records_count,
+                per_record,
+                records_count / per_record,
+            ],
+            ["POST /bulk", records_count, bulk, records_count / bulk],
+        ],
+    )
+    print(f"speedup: {per_record / bulk:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=2000)
+    asyncio.run(main(parser.parse_args().records))
@@ -0,0 +1,67 @@
+"""Compares serving a full record page with answering 304 by version.
+
+Usage: poetry run python benchmarks/bench_conditional_get.py
+    [--rows 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+
+from pydantic import TypeAdapter
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import FinancialRecord
+from app.database.versions import get_data_version
+from bench_bulk_create import make_records
+from common import Timer, create_user, print_table, temporary_database
+
+RECORDS = TypeAdapter(list[FinancialRecord])
+
+
+async def full_response(session, user_id, limit) -> int:
+    """Loads and serializes a page of records as GET / does."""
+    page = await crud.get_financial_records(session, user_id, limit=limit)
+    return len(RECORDS.dump_json(RECORDS.validate_python(page)))
+
+
+async def not_modified(session, user_id, limit) -> int:
+    """Reads the data version only, as a matching If-None-Match does."""
+    await get_data_version(session, user_id)
+    return 0
+
+
+async def bench_rows(rows_count: int, repeat: int) -> list:
+    """Times both answers for a page of rows_count records."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        row = [rows_count]
+        for answer in (full_response, not_modified):
+            samples = []
+            for _ in range(repeat):
+                async with helper.read_session_factory() as session:
+                    with Timer() as timer:
+                        sent = await answer(session, user_id, rows_count)
+                samples.append(timer.elapsed)
+            row += [statistics.median(samples) * 1000, sent / 2**10]
+        return row
+
+
+async def main(rows_counts: list[int], repeat: int) -> None:
+    """Benchmarks every page size and prints response times."""
+    print_table(
+        ["rows", "200 ms", "200 KB", "304 ms", "304 KB"],
+        [await bench_rows(rows_count, repeat) for rows_count in rows_counts],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
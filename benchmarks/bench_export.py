@@ -0,0 +1,63 @@
+"""Measures time to first byte and peak memory of streamed exports.
+
+Usage: poetry run python benchmarks/bench_export.py [--rows 10000 100000]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app.api.financial_records import crud, exporters
+from bench_bulk_create import make_records
+from common import create_user, print_table, temporary_database
+
+
+async def bench_export(rows_count: int, export_format: str) -> list:
+    """Exports a history of the given size, returning a result row."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        exported = 0
+        first_byte = None
+        tracemalloc.start()
+        started = time.perf_counter()
+        async for chunk in exporters.stream_export(
+            helper.session_factory, export_format, user_id=user_id
+        ):
+            if first_byte is None and exported:
+                first_byte = time.perf_counter() - started
+            exported += len(chunk)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return [
+            export_format,
+            rows_count,
+            exported / 2**20,
+            first_byte * 1000,
+            elapsed,
+            peak / 2**20,
+        ]
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Exports every history size in both formats and prints results."""
+    results = [
+        await bench_export(rows_count, export_format)
+        for rows_count in rows_counts
+        for export_format in exporters.FORMATTERS
+    ]
+    print_table(
+        ["format", "rows", "MB", "first rows ms", "seconds", "peak MB"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    asyncio.run(main(parser.parse_args().rows))
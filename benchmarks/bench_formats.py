@@ -0,0 +1,99 @@
+"""Compares record lists as JSON, MessagePack and Arrow IPC.
+
+Usage: poetry run python benchmarks/bench_formats.py [--rows 1000 10000]
+"""
+
+import argparse
+import asyncio
+import json
+
+import msgpack
+import pandas as pd
+import pyarrow as pa
+
+from app.api.financial_records import crud
+from app.api.financial_records.encoders import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    ROW_ENCODERS,
+)
+from bench_bulk_create import make_records
+from common import Timer, create_user, print_table, temporary_database
+
+REPEATS = 5
+NAMES = {
+    JSON_MEDIA_TYPE: "json",
+    MSGPACK_MEDIA_TYPE: "msgpack",
+    ARROW_MEDIA_TYPE: "arrow",
+}
+# How clients turn each body into a data frame with typed columns.
+LOADERS = {
+    JSON_MEDIA_TYPE: lambda body: _typed(pd.DataFrame(json.loads(body))),
+    MSGPACK_MEDIA_TYPE: lambda body: _typed(
+        pd.DataFrame(msgpack.unpackb(body))
+    ),
+    ARROW_MEDIA_TYPE: lambda body: pa.ipc.open_stream(body)
+    .read_all()
+    .to_pandas(split_blocks=True, self_destruct=True),
+}
+
+
+def _typed(df: pd.DataFrame) -> pd.DataFrame:
+    """Parses dates of a frame decoded from JSON-like values."""
+    df["date"] = pd.to_datetime(df["date"])
+    return df
+
+
+def best_of(func) -> tuple[float, object]:
+    """Returns the fastest of REPEATS runs in ms and the last result."""
+    timings = []
+    for _ in range(REPEATS):
+        with Timer() as timer:
+            result = func()
+        timings.append(timer.elapsed * 1000)
+    return min(timings), result
+
+
+async def bench_formats(rows_count: int) -> list[list]:
+    """Encodes a history of rows_count records in every format."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        async with helper.read_session_factory() as session:
+            rows = await crud.get_financial_record_rows(session, user_id)
+
+    results = []
+    for media_type, encode in ROW_ENCODERS.items():
+        encode_ms, body = best_of(lambda: encode(rows))
+        load_ms, df = best_of(lambda: LOADERS[media_type](body))
+        assert len(df) == rows_count
+        results.append(
+            [
+                rows_count,
+                NAMES[media_type],
+                len(body) // 1024,
+                encode_ms,
+                load_ms,
+            ]
+        )
+    return results
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Benchmarks every list size and prints sizes and times."""
+    print_table(
+        ["rows", "format", "KiB", "encode ms", "to DataFrame ms"],
+        [row for count in rows_counts for row in await bench_formats(count)],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args().rows))
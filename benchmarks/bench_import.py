@@ -0,0 +1,72 @@
+"""Measures statement import throughput and peak memory by file size.
+
+Usage: poetry run python benchmarks/bench_import.py [--rows 10000 100000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.api.financial_records import importers
+from common import Timer, create_user, print_table, temporary_database
+
+
+def write_statement(stream, rows_count: int) -> None:
+    """Writes a synthetic CSV bank statement row by row."""
+    start = datetime(2025, 1, 1)
+    stream.write(b"date,amount,description,category\n")
+    for i in range(rows_count):
+        date = start + timedelta(minutes=i * 7)
+        stream.write(
+            f"{date.isoformat()},-{i % 500}.25,Card payment {i},"
+            f"bench\n".encode()
+        )
+    stream.seek(0)
+
+
+async def bench_import(rows_count: int) -> list:
+    """Imports a statement of the given size, returning a result row."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        with tempfile.TemporaryFile() as statement:
+            write_statement(statement, rows_count)
+            size_mb = statement.seek(0, 2) / 2**20
+            statement.seek(0)
+            tracemalloc.start()
+            with Timer() as timer:
+                async for event in importers.import_statement(
+                    helper.session_factory,
+                    statement,
+                    statement_format="csv",
+                    user_id=user_id,
+                    categories={"bench": category_id},
+                    default_category_id=category_id,
+                ):
+                    pass
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return [
+            rows_count,
+            size_mb,
+            event["inserted"],
+            timer.elapsed,
+            rows_count / timer.elapsed,
+            peak / 2**20,
+        ]
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Imports every statement size and prints throughput and memory."""
+    results = [await bench_import(rows_count) for rows_count in rows_counts]
+    print_table(
+        ["rows", "file MB", "inserted", "seconds", "rows/s", "peak MB"],
+        results,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    asyncio.run(main(parser.parse_args().rows))
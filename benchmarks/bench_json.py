@@ -0,0 +1,88 @@
+"""Compares response-model serialization of records with the orjson path.
+
+Usage: poetry run python benchmarks/bench_json.py [--rows 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+import json
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.api.financial_records import crud
+from app.api.financial_records.encoders import encode_records
+from app.api.financial_records.schemas import FinancialRecord
+from bench_bulk_create import make_records
+from common import Timer, create_user, print_table, temporary_database
+
+REPEATS = 5
+
+
+async def response_model_json(field, records) -> bytes:
+    """Validates and renders records the way FastAPI's response_model does."""
+    content = await serialize_response(
+        field=field, response_content=records, is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+async def best_of(encode) -> tuple[float, bytes]:
+    """Returns the fastest of REPEATS runs in ms and the encoded body."""
+    timings = []
+    for _ in range(REPEATS):
+        with Timer() as timer:
+            body = await encode()
+        timings.append(timer.elapsed * 1000)
+    return min(timings), body
+
+
+async def bench_json(rows_count: int) -> list:
+    """Loads a history of rows_count records and encodes it both ways."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        async with helper.read_session_factory() as session:
+            with Timer() as fetch:
+                records = await crud.get_financial_records(session, user_id)
+
+    field = create_model_field(
+        name="Response", type_=list[FinancialRecord], mode="serialization"
+    )
+    model_ms, model_body = await best_of(
+        lambda: response_model_json(field, records)
+    )
+
+    async def fast_json():
+        return encode_records(records)
+
+    fast_ms, fast_body = await best_of(fast_json)
+    assert json.loads(fast_body) == json.loads(model_body)
+    return [
+        rows_count,
+        fetch.elapsed * 1000,
+        model_ms,
+        fast_ms,
+        model_ms / fast_ms,
+        len(fast_body) // 1024,
+    ]
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Benchmarks every list size and prints encoding times."""
+    print_table(
+        ["rows", "fetch ms", "model ms", "orjson ms", "speedup", "KiB"],
+        [await bench_json(rows_count) for rows_count in rows_counts],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args().rows))
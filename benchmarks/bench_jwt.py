@@ -0,0 +1,90 @@
+"""Compares token signing and verification rates of the JWT algorithms.
+
+The "PEM per call" row signs and verifies RS256 the way the API used to,
+passing PEM text that PyJWT parses on every call.
+
+Usage: poetry run python benchmarks/bench_jwt.py [--tokens 2000]
+"""
+
+import argparse
+import time
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.api.users.jwt_signer import JWTSigner
+from common import Timer, print_table
+
+PRIVATE_KEYS = {
+    "RS256": lambda: rsa.generate_private_key(65537, 2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def payload() -> dict:
+    """Returns claims shaped like an access token's."""
+    now = int(time.time())
+    return {"sub": "bench", "user_id": 1, "iat": now, "exp": now + 3600}
+
+
+def rate(operation, count: int) -> float:
+    """Returns how many times per second the operation runs."""
+    with Timer() as timer:
+        for _ in range(count):
+            operation()
+    return count / timer.elapsed
+
+
+def bench_pem(count: int) -> list:
+    """Times RS256 with PEM keys parsed on every call."""
+    key = PRIVATE_KEYS["RS256"]()
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = (
+        key.public_key()
+        .public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+        .decode()
+    )
+    token = jwt.encode(payload(), private_pem, algorithm="RS256")
+    return [
+        "RS256 PEM per call",
+        len(token),
+        rate(lambda: jwt.encode(payload(), private_pem, "RS256"), count),
+        rate(lambda: jwt.decode(token, public_pem, ["RS256"]), count),
+    ]
+
+
+def bench_signer(algorithm: str, count: int) -> list:
+    """Times a signer with parsed keys of the algorithm."""
+    signer = JWTSigner(PRIVATE_KEYS[algorithm](), "1", {})
+    token = signer.encode(payload())
+    return [
+        algorithm,
+        len(token),
+        rate(lambda: signer.encode(payload()), count),
+        rate(lambda: signer.decode(token), count),
+    ]
+
+
+def main(count: int) -> None:
+    """Benchmarks every algorithm and prints tokens per second."""
+    print_table(
+        ["algorithm", "token bytes", "signed/s", "verified/s"],
+        [bench_pem(count)]
+        + [bench_signer(algorithm, count) for algorithm in PRIVATE_KEYS],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tokens", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.tokens)
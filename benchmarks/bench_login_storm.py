@@ -0,0 +1,142 @@
+"""Measures record GET latency during a burst of logins.
+
+Password checks run either on the event loop, as they used to, or in the
+bounded password pool. Record reads are sent one after another while the
+logins are in progress.
+
+Usage: PYTHONPATH=src:. poetry run python benchmarks/bench_login_storm.py
+    [--logins 40] [--records 1000]
+"""
+
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+
+import bcrypt
+import httpx
+from fastapi import FastAPI
+
+from app.api.financial_records import crud
+from app.api.users.password_pool import password_pool
+from app.api.users.utils import validate_password
+from app.api.users.views import run_in_password_pool
+from bench_auth_cache import write_keys
+from bench_bulk_create import make_records
+from common import (
+    Timer,
+    create_user,
+    percentile,
+    print_table,
+    temporary_database,
+)
+
+PASSWORD = "secret1"
+
+
+def make_app(helper, user_id: int, hashed_password: bytes) -> FastAPI:
+    """Builds an app with blocking and pooled logins and a record read."""
+    app = FastAPI()
+
+    @app.post("/login/blocking")
+    async def login_blocking():
+        return validate_password(PASSWORD, hashed_password)
+
+    @app.post("/login/pool")
+    async def login_pool():
+        return await run_in_password_pool(
+            validate_password, PASSWORD, hashed_password
+        )
+
+    @app.get("/records")
+    async def records():
+        async with helper.read_session_factory() as session:
+            page = await crud.get_financial_records(session, user_id, limit=20)
+        return len(page)
+
+    return app
+
+
+async def probe(client, stop: asyncio.Event) -> list[float]:
+    """Reads records back to back until stopped, returns latencies in ms."""
+    samples = []
+    while not stop.is_set():
+        with Timer() as timer:
+            response = await client.get("/records")
+        assert response.status_code == 200, response.text
+        samples.append(timer.elapsed * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+
+async def storm(client, mode: str | None, logins: int) -> list:
+    """Runs the probe alone or alongside a burst of logins."""
+    password_pool.max_queue_depth = password_pool.rejected = 0
+    stop = asyncio.Event()
+    probing = asyncio.create_task(probe(client, stop))
+    statuses = []
+    with Timer() as timer:
+        if mode is None:
+            await asyncio.sleep(2)
+        else:
+            responses = await asyncio.gather(
+                *(client.post(f"/login/{mode}") for _ in range(logins))
+            )
+            statuses = [response.status_code for response in responses]
+    stop.set()
+    samples = await probing
+    return [
+        mode or "idle",
+        len(samples),
+        percentile(samples, 50),
+        percentile(samples, 99),
+        max(samples),
+        statuses.count(200),
+        statuses.count(503),
+        password_pool.max_queue_depth,
+        timer.elapsed,
+    ]
+
+
+async def main(logins: int, records: int) -> None:
+    """Runs the probe idle and during blocking and pooled login storms."""
+    hashed_password = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt())
+    with tempfile.TemporaryDirectory() as tmp:
+        write_keys(Path(tmp))
+        async with temporary_database() as helper:
+            user_id, category_id = await create_user(helper)
+            async with helper.session_factory() as session:
+                await crud.create_financial_records_bulk(
+                    session, make_records(records, category_id), user_id
+                )
+            app = make_app(helper, user_id, hashed_password)
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench", timeout=None
+            ) as client:
+                rows = [
+                    await storm(client, mode, logins)
+                    for mode in (None, "blocking", "pool")
+                ]
+    print_table(
+        [
+            "logins",
+            "reads",
+            "p50 ms",
+            "p99 ms",
+            "max ms",
+            "200",
+            "503",
+            "max queue",
+            "storm s",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.records))
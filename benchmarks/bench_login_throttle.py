@@ -0,0 +1,138 @@
+"""Compares the Redis work of a failed login before and after the script.
+
+Logins used to check the lock, INCR the counter, EXPIRE it on the first
+attempt and SET the lock at the limit, one round trip each. Now the check
+is followed by one script call. Without ``--redis-url`` an in-process
+Redis stand-in adds a fixed delay to every command to model the network
+round trip; it runs Lua much slower than Redis does.
+
+Usage: poetry run python benchmarks/bench_login_throttle.py
+    [--logins 500] [--rtt-ms 0.5] [--concurrency 20]
+    [--redis-url redis://localhost:6379/15]
+"""
+
+import argparse
+import asyncio
+import statistics
+from datetime import timedelta
+
+import fakeredis
+import redis.asyncio as redis
+
+from app.api.users import redis_utils
+from common import Timer, percentile, print_table
+
+
+class CountingRedis(redis.Redis):
+    """Redis client that counts every command."""
+
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        self.round_trips += 1
+        return await super().execute_command(*args, **options)
+
+
+class LatentRedis(fakeredis.FakeAsyncRedis):
+    """In-process Redis that delays and counts every command."""
+
+    rtt = 0.0
+    round_trips = 0
+
+    async def execute_command(self, *args, **options):
+        self.round_trips += 1
+        await asyncio.sleep(self.rtt)
+        return await super().execute_command(*args, **options)
+
+
+def make_client(redis_url: str | None, rtt: float):
+    """Connects to the Redis at redis_url or to a delayed stand-in."""
+    if redis_url:
+        return CountingRedis.from_url(redis_url, decode_responses=True)
+    client = LatentRedis(decode_responses=True)
+    client.rtt = rtt
+    return client
+
+
+async def separate_calls(client, username: str) -> bool:
+    """Runs a failed login's calls the way login_user used to."""
+    if await client.get(f"locked:{username}") is not None:
+        return False
+    key = f"failed_attempts:{username}"
+    attempts = await client.incr(key)
+    if attempts == 1:
+        await client.expire(key, 300)
+    if attempts >= 5:
+        await client.set(f"locked:{username}", "true", ex=timedelta(minutes=5))
+    return True
+
+
+async def script(client, username: str) -> bool:
+    """Runs a failed login's calls the way login_user does now."""
+    if await redis_utils.is_account_locked(username):
+        return False
+    return await redis_utils.record_failed_attempt(username) != (
+        redis_utils.LOCKED
+    )
+
+
+async def bench(flow, client, logins: int, concurrency: int) -> list:
+    """Times failed logins up to the limit and counts a concurrent burst."""
+    await client.flushdb()
+    client.round_trips = 0
+    redis_utils.redis_helper.redis_client = client
+    samples = []
+    for i in range(logins):
+        with Timer() as timer:
+            await flow(client, f"user{i // redis_utils.MAX_FAILED_ATTEMPTS}")
+        samples.append(timer.elapsed * 1000)
+    round_trips = client.round_trips / logins
+
+    await client.flushdb()
+    counted = await asyncio.gather(
+        *(flow(client, "burst") for _ in range(concurrency))
+    )
+    return [
+        flow.__name__.replace("_", " "),
+        round_trips,
+        statistics.median(samples),
+        percentile(samples, 99),
+        sum(counted),
+    ]
+
+
+async def main(
+    logins: int, rtt_ms: float, concurrency: int, redis_url: str | None
+) -> None:
+    """Runs both flows and prints their latency and burst results."""
+    client = make_client(redis_url, rtt_ms / 1000)
+    try:
+        rows = [
+            await bench(flow, client, logins, concurrency)
+            for flow in (separate_calls, script)
+        ]
+        await client.flushdb()
+    finally:
+        await client.aclose()
+    print_table(
+        [
+            "flow",
+            "round trips",
+            "p50 ms",
+            "p99 ms",
+            f"counted of {concurrency}",
+        ],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=0.5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--redis-url")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.logins, args.rtt_ms, args.concurrency, args.redis_url)
+    )
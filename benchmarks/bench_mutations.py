@@ -0,0 +1,112 @@
+"""Compares record mutations loading the record first and in one statement.
+
+Usage: poetry run python benchmarks/bench_mutations.py [--records 1000]
+"""
+
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import select
+
+from app.api.financial_records import crud, rollups
+from app.api.financial_records.schemas import FinancialRecordUpdatePartial
+from app.config import SqlitePragmas
+from app.database.models import FinancialRecord
+from bench_bulk_create import make_records
+from common import (
+    Timer,
+    create_user,
+    percentile,
+    print_table,
+    temporary_database,
+)
+
+
+async def load_and_patch(session, financial_record_id, user_id, update):
+    """Patches the way the views did: SELECT, set attributes, flush."""
+    result = await session.execute(
+        select(FinancialRecord).where(
+            FinancialRecord.id == financial_record_id,
+            FinancialRecord.user_id == user_id,
+        )
+    )
+    financial_record = result.scalars().first()
+    if financial_record is None:
+        return False
+    await rollups.apply_record(session, financial_record, sign=-1)
+    for name, value in update.model_dump(exclude_unset=True).items():
+        setattr(financial_record, name, value)
+    await rollups.apply_record(session, financial_record)
+    await session.commit()
+    return True
+
+
+async def load_and_delete(session, financial_record_id, user_id):
+    """Deletes the way the views did: SELECT, ORM delete, flush."""
+    result = await session.execute(
+        select(FinancialRecord).where(
+            FinancialRecord.id == financial_record_id,
+            FinancialRecord.user_id == user_id,
+        )
+    )
+    financial_record = result.scalars().first()
+    if financial_record is None:
+        return False
+    await rollups.apply_record(session, financial_record, sign=-1)
+    await session.delete(financial_record)
+    await session.commit()
+    return True
+
+
+async def bench_variant(name, patch, delete, records_count: int) -> list:
+    """Patches, then deletes every record, one write operation each."""
+    async with temporary_database(sqlite_pragmas=SqlitePragmas()) as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            ids = await crud.create_financial_records_bulk(
+                session, make_records(records_count, category_id), user_id
+            )
+        update = FinancialRecordUpdatePartial(amount=1.0)
+        latencies = {"patch": [], "delete": []}
+        for financial_record_id in ids:
+            with Timer() as timer:
+                await helper.writer.run(
+                    patch, financial_record_id, user_id, update
+                )
+            latencies["patch"].append(timer.elapsed)
+        for financial_record_id in ids:
+            with Timer() as timer:
+                await helper.writer.run(delete, financial_record_id, user_id)
+            latencies["delete"].append(timer.elapsed)
+        return [
+            [
+                name,
+                operation,
+                statistics.mean(samples) * 1000,
+                percentile(samples, 50) * 1000,
+                percentile(samples, 99) * 1000,
+            ]
+            for operation, samples in latencies.items()
+        ]
+
+
+async def main(records_count: int) -> None:
+    """Benchmarks both mutation paths and prints their latency."""
+    rows = await bench_variant(
+        "load + ORM", load_and_patch, load_and_delete, records_count
+    )
+    rows += await bench_variant(
+        "RETURNING",
+        crud.update_financial_record_partial,
+        crud.delete_financial_record,
+        records_count,
+    )
+    print_table(["variant", "operation", "mean ms", "p50 ms", "p99 ms"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.records))
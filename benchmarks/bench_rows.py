@@ -0,0 +1,77 @@
+"""Compares reading records as ORM instances with reading Core rows.
+
+Usage: poetry run python benchmarks/bench_rows.py [--rows 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+
+from app.api.financial_records import crud
+from bench_bulk_create import make_records
+from common import Timer, create_user, print_table, temporary_database
+
+REPEATS = 3
+READS = {
+    "orm": crud.get_financial_records,
+    "core": crud.get_financial_record_rows,
+}
+
+
+async def rows_per_second(helper, read, user_id) -> int:
+    """Returns the best read rate of REPEATS reads of the whole history."""
+    rates = []
+    for _ in range(REPEATS):
+        async with helper.read_session_factory() as session:
+            with Timer() as timer:
+                rows = await read(session, user_id)
+        rates.append(round(len(rows) / timer.elapsed))
+    return max(rates)
+
+
+async def bytes_per_row(helper, read, user_id) -> tuple[int, int]:
+    """Returns memory held per row while the session is open, and peak.
+
+    ORM instances stay in the session's identity map along with their
+    state, so the rows are measured before the session is closed.
+    """
+    async with helper.read_session_factory() as session:
+        tracemalloc.start()
+        try:
+            rows = await read(session, user_id)
+            held, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return held // len(rows), peak // len(rows)
+
+
+async def bench_rows(rows_count: int) -> list[list]:
+    """Reads a history of rows_count records both ways."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        results = []
+        for name, read in READS.items():
+            held, peak = await bytes_per_row(helper, read, user_id)
+            rate = await rows_per_second(helper, read, user_id)
+            results.append([rows_count, name, rate, held, peak])
+        return results
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Benchmarks every history size and prints rates and memory."""
+    print_table(
+        ["rows", "path", "rows/s", "bytes/row held", "bytes/row peak"],
+        [row for count in rows_counts for row in await bench_rows(count)],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args().rows))
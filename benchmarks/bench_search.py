@@ -0,0 +1,126 @@
+"""Compares FTS5 search of descriptions with a LIKE scan.
+
+Usage: poetry run python benchmarks/bench_search.py [--rows 1000000]
+    [--other-rows 0] [--repeat 20]
+
+--other-rows adds a second user with the same kind of history, written
+after the searched user's, so their matches are the newest in the index.
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import FinancialRecordCreate
+from app.database.models import FinancialRecord
+from common import Timer, create_user, print_table, temporary_database
+
+# Words drawn with falling frequencies, from every record to a rare few.
+WORDS = ["card", "grocery", "coffee", "taxi", "pharmacy", "bookshop", "zoo"]
+WEIGHTS = [1.0, 0.3, 0.1, 0.03, 0.01, 0.003, 0.001]
+SEARCHES = {
+    "missing word": ("zebra", {}),
+    "rare word": ("zoo", {}),
+    "common word": ("coffee", {}),
+    "two words": ("card taxi", {}),
+    "word + filters": (
+        "grocery",
+        {"amount_min": 100, "date_from": datetime(2025, 6, 1)},
+    ),
+}
+
+
+def make_records(count: int, category_id: int):
+    """Generates a year of expenses with descriptions of known words."""
+    rng = random.Random(42)
+    start = datetime(2025, 1, 1)
+    return [
+        FinancialRecordCreate(
+            type="expense",
+            description=" ".join(
+                word
+                for word, weight in zip(WORDS, WEIGHTS)
+                if rng.random() < weight
+            )
+            + f" payment {i}",
+            amount=float(i % 500),
+            date=start + timedelta(seconds=i * 31536000 // count),
+            category_id=category_id,
+        )
+        for i in range(count)
+    ]
+
+
+async def like_scan(session, user_id, query, **filters) -> int:
+    """Filters descriptions with LIKE, unranked, without an index."""
+    stmt = select(FinancialRecord).where(
+        FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
+    )
+    for word in query.split():
+        stmt = stmt.where(FinancialRecord.description.like(f"%{word}%"))
+    if "amount_min" in filters:
+        stmt = stmt.where(FinancialRecord.amount >= filters["amount_min"])
+    if "date_from" in filters:
+        stmt = stmt.where(FinancialRecord.date >= filters["date_from"])
+    result = await session.execute(stmt.limit(100))
+    return len(result.scalars().all())
+
+
+async def fts_search(session, user_id, query, **filters) -> int:
+    """Searches the FTS5 index as GET /search does."""
+    found = await crud.search_financial_records(
+        session, user_id, query, limit=100, **filters
+    )
+    return len(found)
+
+
+async def main(rows_count: int, other_rows_count: int, repeat: int) -> None:
+    """Fills users' histories and times every search both ways."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            with Timer() as timer:
+                await crud.create_financial_records_bulk(
+                    session, make_records(rows_count, category_id), user_id
+                )
+        print(f"Inserted {rows_count:,} rows in {timer.elapsed:.1f} s")
+        if other_rows_count:
+            other_id, other_category_id = await create_user(helper, "other")
+            async with helper.session_factory() as session:
+                await crud.create_financial_records_bulk(
+                    session,
+                    make_records(other_rows_count, other_category_id),
+                    other_id,
+                )
+            print(f"Inserted {other_rows_count:,} rows of another user")
+
+        rows = []
+        for name, (query, filters) in SEARCHES.items():
+            row = [name]
+            for search in (like_scan, fts_search):
+                samples = []
+                for _ in range(repeat):
+                    async with helper.read_session_factory() as session:
+                        with Timer() as timer:
+                            found = await search(
+                                session, user_id, query, **filters
+                            )
+                    samples.append(timer.elapsed)
+                row.append(statistics.median(samples) * 1000)
+            rows.append(row + [found])
+        print_table(["search", "LIKE ms", "FTS5 ms", "found"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--other-rows", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.other_rows, args.repeat))
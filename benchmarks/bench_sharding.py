@@ -0,0 +1,102 @@
+"""Measures concurrent writes of many users for growing shard counts.
+
+Usage: poetry run python benchmarks/bench_sharding.py
+    [--users 64] [--writes 50] [--shards 1 2 4]
+"""
+
+import argparse
+import asyncio
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from app.api.financial_records import crud
+from app.config import SqlitePragmas
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Base, Category, User
+from app.database.sharding import current_user_id, reserve_id_range
+from bench_bulk_create import make_records
+from common import Timer, percentile, print_table
+
+
+@asynccontextmanager
+async def sharded_database(shard_count: int):
+    """Yields a DatabaseHelper with a primary and shard_count shards."""
+    with tempfile.TemporaryDirectory() as tmp:
+        helper = DatabaseHelper(
+            url=f"sqlite+aiosqlite:///{Path(tmp) / 'bench.sqlite3'}",
+            sqlite_pragmas=SqlitePragmas(),
+            shard_urls=[
+                f"sqlite+aiosqlite:///{Path(tmp) / f'shard{i}.sqlite3'}"
+                for i in range(shard_count)
+            ],
+        )
+        for engine in (helper.engine, *helper.shard_engines):
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+        for shard_id, engine in enumerate(helper.shard_engines):
+            async with engine.begin() as conn:
+                await conn.run_sync(reserve_id_range, str(shard_id))
+        try:
+            yield helper
+        finally:
+            await helper.dispose()
+
+
+async def register(session, username: str) -> tuple[int, int]:
+    """Creates a user with one category the way registration does."""
+    user = User(username=username, hashed_password=b"-")
+    session.add(user)
+    await session.flush()
+    category = Category(name="Bench", user_id=user.id)
+    session.add(category)
+    await session.commit()
+    return user.id, category.id
+
+
+async def bench_shards(shard_count: int, users: int, writes: int) -> list:
+    """Runs one concurrent client per user, each writing its records."""
+    async with sharded_database(shard_count) as helper:
+        accounts = [
+            await helper.writer.run(register, f"bench{i}")
+            for i in range(users)
+        ]
+        latencies = []
+
+        async def client(user_id, category_id):
+            current_user_id.set(user_id)
+            record = make_records(1, category_id)[0]
+            for _ in range(writes):
+                with Timer() as timer:
+                    await helper.writer.run(
+                        crud.create_financial_record, record, user_id
+                    )
+                latencies.append(timer.elapsed)
+
+        with Timer() as total:
+            await asyncio.gather(*[client(*account) for account in accounts])
+        return [
+            shard_count,
+            len(latencies) / total.elapsed,
+            percentile(latencies, 50) * 1000,
+            percentile(latencies, 99) * 1000,
+            helper.writer.batches,
+        ]
+
+
+async def main(users: int, writes: int, shard_counts: list[int]) -> None:
+    """Benchmarks every shard count and prints write throughput."""
+    rows = [
+        await bench_shards(shard_count, users, writes)
+        for shard_count in shard_counts
+    ]
+    print_table(["shards", "writes/s", "p50 ms", "p99 ms", "commits"], rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=64)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.writes, args.shards))
@@ -0,0 +1,102 @@
+"""Compares concurrent read/write throughput with and without tuning.
+
+Usage: poetry run python benchmarks/bench_sqlite_tuning.py
+    [--writers 4] [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from app.api.financial_records import crud
+from app.config import SqlitePragmas
+from bench_bulk_create import make_records
+from common import create_user, percentile, print_table, temporary_database
+
+
+async def worker(helper, operation, deadline: float, stats: dict) -> None:
+    """Repeats operation in its own session until the deadline."""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        async with helper.session_factory() as session:
+            try:
+                await operation(session)
+            except OperationalError:
+                stats["errors"] += 1
+                continue
+        stats["latencies"].append(time.perf_counter() - started)
+
+
+async def bench_profile(
+    sqlite_pragmas: SqlitePragmas | None,
+    writers: int,
+    readers: int,
+    seconds: float,
+) -> tuple[dict, dict]:
+    """Runs concurrent writers and readers against one database."""
+    async with temporary_database(sqlite_pragmas=sqlite_pragmas) as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            await crud.create_financial_records_bulk(
+                session, make_records(1000, category_id), user_id
+            )
+        record = make_records(1, category_id)[0]
+
+        async def write(session):
+            await crud.create_financial_record(session, record, user_id)
+
+        async def read(session):
+            await crud.get_financial_records(session, user_id, limit=100)
+
+        write_stats = {"latencies": [], "errors": 0}
+        read_stats = {"latencies": [], "errors": 0}
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *[
+                worker(helper, write, deadline, write_stats)
+                for _ in range(writers)
+            ],
+            *[
+                worker(helper, read, deadline, read_stats)
+                for _ in range(readers)
+            ],
+        )
+        return write_stats, read_stats
+
+
+async def main(writers: int, readers: int, seconds: float) -> None:
+    """Benchmarks the default and the tuned profile and prints results."""
+    rows = []
+    for name, sqlite_pragmas in (
+        ("default", None),
+        ("tuned", SqlitePragmas()),
+    ):
+        results = await bench_profile(
+            sqlite_pragmas, writers, readers, seconds
+        )
+        for kind, stats in zip(("write", "read"), results):
+            latencies = stats["latencies"]
+            rows.append(
+                [
+                    name,
+                    kind,
+                    len(latencies) / seconds,
+                    percentile(latencies, 50) * 1000,
+                    percentile(latencies, 99) * 1000,
+                    stats["errors"],
+                ]
+            )
+    print_table(
+        ["profile", "op", "ops/s", "p50 ms", "p99 ms", "locked errors"], rows
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.writers, args.readers, args.seconds))
@@ -0,0 +1,91 @@
+"""Compares a full reload with a delta sync after one change.
+
+Usage: poetry run python benchmarks/bench_sync.py [--rows 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+
+from app.api.categories import crud as categories_crud
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import (
+    FinancialRecord,
+    FinancialRecordUpdatePartial,
+)
+from app.database.models import utcnow
+from bench_bulk_create import make_records
+from common import Timer, create_user, print_table, temporary_database
+
+PAGE_SIZE = 1000
+
+
+async def full_reload(session, user_id) -> int:
+    """Loads all pages of records and categories as the frontend did."""
+    loaded = 0
+    after = None
+    while True:
+        page = await crud.get_financial_records(
+            session, user_id, limit=PAGE_SIZE, after=after
+        )
+        loaded += len([FinancialRecord.model_validate(r) for r in page])
+        if len(page) < PAGE_SIZE:
+            break
+        after = (page[-1].date, page[-1].id)
+    await categories_crud.get_categories.uncached(session, user_id)
+    return loaded
+
+
+async def delta_sync(session, user_id, since) -> int:
+    """Loads only records and categories changed since the cursor."""
+    changed = await crud.get_financial_records_changed_since(
+        session, user_id, since
+    )
+    await categories_crud.get_categories_changed_since(session, user_id, since)
+    return len([FinancialRecord.model_validate(r) for r in changed])
+
+
+async def bench_sync(rows_count: int) -> list:
+    """Changes one record of a history and refreshes it both ways."""
+    async with temporary_database() as helper:
+        user_id, category_id = await create_user(helper)
+        async with helper.session_factory() as session:
+            ids = await crud.create_financial_records_bulk(
+                session, make_records(rows_count, category_id), user_id
+            )
+        since = utcnow()
+        async with helper.session_factory() as session:
+            await crud.update_financial_record_partial(
+                session,
+                ids[0],
+                user_id,
+                FinancialRecordUpdatePartial(amount=1),
+            )
+        async with helper.read_session_factory() as session:
+            with Timer() as full:
+                full_rows = await full_reload(session, user_id)
+        async with helper.read_session_factory() as session:
+            with Timer() as delta:
+                delta_rows = await delta_sync(session, user_id, since)
+        return [
+            rows_count,
+            full_rows,
+            full.elapsed * 1000,
+            delta_rows,
+            delta.elapsed * 1000,
+        ]
+
+
+async def main(rows_counts: list[int]) -> None:
+    """Benchmarks every history size and prints refresh times."""
+    print_table(
+        ["rows", "full rows", "full ms", "delta rows", "delta ms"],
+        [await bench_sync(rows_count) for rows_count in rows_counts],
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    asyncio.run(main(parser.parse_args().rows))
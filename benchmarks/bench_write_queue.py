@@ -0,0 +1,83 @@
+"""Compares concurrent writes through own sessions and the write queue.
+
+Usage: poetry run python benchmarks/bench_write_queue.py
+    [--clients 32] [--writes 50]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy.exc import OperationalError
+
+from app.api.financial_records import crud
+from app.config import SqlitePragmas
+from bench_bulk_create import make_records
+from common import (
+    Timer,
+    create_user,
+    percentile,
+    print_table,
+    temporary_database,
+)
+
+
+async def session_per_write(helper, record, user_id):
+    """Writes the way the views did: one session and commit per request."""
+    async with helper.session_factory() as session:
+        await crud.create_financial_record(session, record, user_id)
+
+
+async def queued_write(helper, record, user_id):
+    """Writes through the single writer task with group commit."""
+    await helper.writer.run(crud.create_financial_record, record, user_id)
+
+
+async def bench_variant(write, clients: int, writes: int) -> list:
+    """Runs concurrent clients that each perform a series of writes."""
+    async with temporary_database(sqlite_pragmas=SqlitePragmas()) as helper:
+        user_id, category_id = await create_user(helper)
+        record = make_records(1, category_id)[0]
+        latencies = []
+        errors = 0
+
+        async def client():
+            nonlocal errors
+            for _ in range(writes):
+                with Timer() as timer:
+                    try:
+                        await write(helper, record, user_id)
+                    except OperationalError:
+                        errors += 1
+                        continue
+                latencies.append(timer.elapsed)
+
+        with Timer() as total:
+            await asyncio.gather(*[client() for _ in range(clients)])
+        return [
+            write.__name__,
+            len(latencies) / total.elapsed,
+            percentile(latencies, 50) * 1000,
+            percentile(latencies, 99) * 1000,
+            errors,
+            helper.writer.batches,
+        ]
+
+
+async def main(clients: int, writes: int) -> None:
+    """Benchmarks both write paths and prints their throughput."""
+    rows = [
+        await bench_variant(write, clients, writes)
+        for write in (session_per_write, queued_write)
+    ]
+    print_table(
+        ["variant", "writes/s", "p50 ms", "p99 ms", "errors", "commits"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--writes", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.writes))
@@ -0,0 +1,67 @@
+"""Shared helpers for the benchmark scripts."""
+
+import statistics
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Base, Category, User
+
+
+@asynccontextmanager
+async def temporary_database(**helper_kwargs):
+    """Yields a DatabaseHelper bound to a fresh SQLite file with tables."""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{Path(tmp) / 'bench.sqlite3'}"
+        helper = DatabaseHelper(url=url, **helper_kwargs)
+        async with helper.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            yield helper
+        finally:
+            await helper.dispose()
+
+
+async def create_user(helper: DatabaseHelper, username: str = "bench"):
+    """Creates a user with one category and returns their IDs."""
+    async with helper.session_factory() as session:
+        user = User(username=username, hashed_password=b"-")
+        session.add(user)
+        await session.flush()
+        category = Category(name="Bench", user_id=user.id)
+        session.add(category)
+        await session.commit()
+        return user.id, category.id
+
+
+class Timer:
+    """Context manager measuring wall time of the enclosed block."""
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.elapsed = time.perf_counter() - self.started
+
+
+def percentile(samples: list[float], q: float) -> float:
+    """Returns the q-th percentile (0-100) of the samples."""
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        min(int(q), 99) - 1
+    ]
+
+
+def print_table(headers: list[str], rows: list[list]) -> None:
+    """Prints benchmark results as an aligned plain-text table."""
+    cells = [headers] + [
+        [f"{c:,.2f}" if isinstance(c, float) else str(c) for c in row]
+        for row in rows
+    ]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for row in cells:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
@@ -1,24 +1,58 @@
-from sqlalchemy import select
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import func, select, update
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.categories.schemas import CategoryCreate, CategoryUpdate
-from app.database.models import Category
+from app.api.categories.schemas import (
+    Category as CategorySchema,
+    CategoryCreate,
+    CategoryUpdate,
+)
+from app.database import archive
+from app.database.models import (
+    ArchivedPartition,
+    Category,
+    FinancialRecord,
+    utcnow,
+)
+from app.database.versions import bump_data_version
+from app.redis.cache import cache
+
+
+def categories_key(user_id: int) -> str:
+    """Returns the cache key of user's category list."""
+    return f"categories:{user_id}"
 
 
+@cache.cached(
+    key=lambda session, user_id: categories_key(user_id),
+    model=list[CategorySchema],
+)
 async def get_categories(
     session: AsyncSession,
     user_id: int,
-) -> list[Category]:
-    """Retrieves all categories belonging to a user, sorted by their ID."""
+) -> list[CategorySchema]:
+    """Retrieves all categories belonging to a user, sorted by their ID.
+
+    The list is cached per user and has to be invalidated with
+    ``invalidate_categories`` once a change of it is committed. Only the
+    schema columns are read, as rows, since ORM instances would be
+    dropped right after caching.
+    """
     stmt = (
-        select(Category)
-        .where(Category.user_id == user_id)
+        select(Category.id, Category.name)
+        .where(Category.user_id == user_id, Category.deleted_at.is_(None))
         .order_by(Category.id)
     )
     result: Result = await session.execute(stmt)
-    categories = result.scalars().all()
-    return list(categories)
+    return list(result.all())
+
+
+async def invalidate_categories(user_id: int) -> None:
+    """Drops user's cached category list in every worker."""
+    await cache.invalidate(categories_key(user_id))
 
 
 async def get_category(
@@ -30,6 +64,7 @@ async def get_category(
     stmt = select(Category).where(
         Category.id == category_id,
         Category.user_id == user_id,
+        Category.deleted_at.is_(None),
     )
     result = await session.execute(stmt)
     return result.scalars().first()
@@ -40,31 +75,122 @@ async def create_category(
     category_in: CategoryCreate,
     user_id: int,
 ) -> Category:
-    """Creates a new category associated with the user."""
+    """Creates a new category associated with the user.
+
+    Raises IntegrityError if the user has a category of the same name,
+    compared case-insensitively.
+    """
     category = Category(**category_in.model_dump())
     category.user_id = user_id
     session.add(category)
+    await bump_data_version(session, user_id)
     await session.commit()
     await session.refresh(category)
     return category
 
 
+async def get_categories_changed_since(
+    session: AsyncSession,
+    user_id: int,
+    since: datetime,
+) -> list[Category]:
+    """Retrieves user's categories, deleted ones too, changed after since."""
+    stmt = (
+        select(Category)
+        .where(Category.user_id == user_id, Category.updated_at > since)
+        .order_by(Category.updated_at, Category.id)
+    )
+    result: Result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
 async def update_category(
     session: AsyncSession,
-    category: Category,
+    category_id: int,
+    user_id: int,
     category_update: CategoryUpdate,
-) -> Category:
-    """Updates the fields of an existing category."""
-    for name, value in category_update.model_dump().items():
-        setattr(category, name, value)
+) -> bool:
+    """Updates user's category in one statement, False if there is none.
+
+    Raises IntegrityError if the new name is taken, like create_category.
+    """
+    result = await session.execute(
+        update(Category.__table__)
+        .where(
+            Category.id == category_id,
+            Category.user_id == user_id,
+            Category.deleted_at.is_(None),
+        )
+        .values(**category_update.model_dump())
+    )
+    if result.rowcount == 0:
+        return False
+    await bump_data_version(session, user_id)
     await session.commit()
-    return category
+    return True
+
+
+async def category_in_archive(
+    session: AsyncSession,
+    category_id: int,
+    user_id: int,
+) -> tuple[bool, int]:
+    """Tells whether any archived record of the user is in the category.
+
+    Also returns the number of user's archived partitions, which
+    ``delete_category`` checks to be unchanged when it runs later.
+    """
+    partitions = await archive.get_partitions(session, user_id)
+    if not partitions:
+        return False, 0
+    in_use = await asyncio.to_thread(
+        archive.uses_category,
+        archive.partition_paths(partitions),
+        category_id,
+    )
+    return in_use, len(partitions)
 
 
 async def delete_category(
     session: AsyncSession,
-    category: Category,
-) -> None:
-    """Deletes the specified category."""
-    await session.delete(category)
+    category_id: int,
+    user_id: int,
+    archived_partitions: int = 0,
+) -> bool:
+    """Deletes user's unused category in one statement, False otherwise.
+
+    A category that still has records is kept, as records cannot lose
+    their category. Archived records are checked beforehand by
+    ``category_in_archive``, which saw ``archived_partitions`` of the
+    user's partitions; if another one was archived since, the category
+    is kept as well. The row is kept as a tombstone for syncing clients.
+    """
+    in_use = (
+        select(FinancialRecord.id)
+        .where(
+            FinancialRecord.category_id == category_id,
+            FinancialRecord.deleted_at.is_(None),
+        )
+        .exists()
+    )
+    partitions = (
+        select(func.count(ArchivedPartition.id))
+        .where(ArchivedPartition.user_id == user_id)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        update(Category.__table__)
+        .where(
+            Category.id == category_id,
+            Category.user_id == user_id,
+            Category.deleted_at.is_(None),
+            ~in_use,
+            partitions == archived_partitions,
+        )
+        .values(deleted_at=utcnow())
+    )
+    if result.rowcount == 0:
+        return False
+    await bump_data_version(session, user_id)
     await session.commit()
+    return True
@@ -1,7 +1,11 @@
 from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette import status
-from src.app.api.financial_records.utils import get_current_user
+from src.app.api.financial_records.utils import (
+    check_data_version,
+    get_current_user,
+)
 
 from . import crud
 from .schemas import (
@@ -14,9 +18,32 @@ from src.app.database.db_helper import db_helper
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
-@router.get("/", response_model=list[Category])
+def name_taken(name: str) -> HTTPException:
+    """Returns the error of a category name the user already has."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"Category with name '{name}' already exists",
+    )
+
+
+async def refresh_cached_categories(user_id: int) -> None:
+    """Replaces user's cached categories with the committed ones.
+
+    They are read from the primary, so a lagging replica cannot put the
+    list as it was before the change back into the cache.
+    """
+    await crud.invalidate_categories(user_id)
+    async with db_helper.read_router.session(use_primary=True) as session:
+        await crud.get_categories(session=session, user_id=user_id)
+
+
+@router.get(
+    "/",
+    response_model=list[Category],
+    dependencies=[Depends(check_data_version)],
+)
 async def get_categories(
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Retrieves all categories belonging to the user."""
@@ -26,19 +53,25 @@ async def get_categories(
 @router.post("/", response_model=Category)
 async def create_category(
     category_in: CategoryCreate,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Creates a new category for the user."""
-    return await crud.create_category(
-        session=session, category_in=category_in, user_id=current_user_id
-    )
+    try:
+        category = await db_helper.writer.run(
+            crud.create_category,
+            category_in=category_in,
+            user_id=current_user_id,
+        )
+    except IntegrityError:
+        raise name_taken(category_in.name)
+    await refresh_cached_categories(current_user_id)
+    return category
 
 
 @router.get("/{category_id}", response_model=Category)
 async def get_category(
     category_id: int,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Returns category if it belongs to the user."""
@@ -58,20 +91,21 @@ async def get_category(
 async def update_category(
     category_id: int,
     category_update: CategoryUpdate,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Updates an existing category that belongs to the user."""
-    category = await crud.get_category(
-        session=session, category_id=category_id, user_id=current_user_id
-    )
-
-    if category:
-        return await crud.update_category(
-            session=session,
-            category=category,
+    try:
+        found = await db_helper.writer.run(
+            crud.update_category,
+            category_id=category_id,
+            user_id=current_user_id,
             category_update=category_update,
         )
+    except IntegrityError:
+        raise name_taken(category_update.name)
+    if found:
+        await refresh_cached_categories(current_user_id)
+        return None
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -82,18 +116,36 @@ async def update_category(
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_category(
     category_id: int,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
-    """Deletes category that belongs to the user."""
-    category = await crud.get_category(
-        session=session,
+    """Deletes category of the user that has no financial records.
+
+    Archived records are looked for before the write, so the writer
+    does not wait for the archive files.
+    """
+    async with db_helper.read_router.session(use_primary=True) as session:
+        archived, partitions = await crud.category_in_archive(
+            session=session, category_id=category_id, user_id=current_user_id
+        )
+    found = not archived and await db_helper.writer.run(
+        crud.delete_category,
         category_id=category_id,
         user_id=current_user_id,
+        archived_partitions=partitions,
     )
+    if found:
+        await refresh_cached_categories(current_user_id)
+        return None
 
+    async with db_helper.read_router.session(use_primary=True) as session:
+        category = await crud.get_category(
+            session=session, category_id=category_id, user_id=current_user_id
+        )
     if category:
-        return await crud.delete_category(session=session, category=category)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Category {category_id} has financial records",
+        )
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -1,30 +1,197 @@
+import asyncio
 from datetime import datetime
+from typing import AsyncIterator, NamedTuple
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Select,
+    func,
+    insert,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.engine import Result
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.financial_records import rollups
 from app.api.financial_records.schemas import (
     FinancialRecordCreate,
     FinancialRecordUpdate,
     FinancialRecordUpdatePartial,
+    TypeFinanceRecord,
+)
+from app.database import archive
+from app.database.models import (
+    Category,
+    FinancialRecord,
+    MonthlyRollup,
+    TypeFinanceRecord as RecordType,
+    utcnow,
+)
+from app.database.search import (
+    FTS_TABLE,
+    SEARCH_CANDIDATES,
+    financial_records_fts,
+    fts_query,
+    user_fts_query,
 )
-from app.database.models import FinancialRecord
+from app.database.versions import bump_data_version
+
+BULK_INSERT_BATCH_SIZE = 500
+EXPORT_BATCH_SIZE = 1000
+
+
+class UnknownCategoriesError(Exception):
+    """Raised when records refer to categories the user does not have."""
+
+    def __init__(self, category_ids: set[int]):
+        """Keeps the unknown category IDs, sorted, for the error message."""
+        self.category_ids = sorted(category_ids)
+        super().__init__(f"Unknown categories: {self.category_ids}")
+
+
+def _naive(value: datetime) -> datetime:
+    """Drops timezone info, as record dates are stored as naive datetimes."""
+    return value.replace(tzinfo=None)
+
+
+class RecordRow(NamedTuple):
+    """Plain read-only record with the fields of the FinancialRecord schema."""
+
+    type: RecordType
+    description: str
+    amount: float
+    date: datetime
+    category_id: int
+    id: int
+
+
+RECORD_COLUMNS = tuple(getattr(FinancialRecord, f) for f in RecordRow._fields)
+
+
+def _page_bounds(after, date_from, date_to) -> tuple:
+    """Drops timezone info from the bounds of a page of records."""
+    return (
+        after and (_naive(after[0]), after[1]),
+        date_from and _naive(date_from),
+        date_to and _naive(date_to),
+    )
+
+
+def _records_page(
+    stmt: Select,
+    user_id: int,
+    limit: int | None,
+    after: tuple[datetime, int] | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+) -> Select:
+    """Restricts query to a page of user's live records in date order."""
+    stmt = stmt.where(
+        FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
+    )
+    if date_from is not None:
+        stmt = stmt.where(FinancialRecord.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(FinancialRecord.date < date_to)
+    if after is not None:
+        stmt = stmt.where(
+            tuple_(FinancialRecord.date, FinancialRecord.id) > tuple_(*after)
+        )
+    stmt = stmt.order_by(FinancialRecord.date, FinancialRecord.id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+async def _archived_page(
+    session: AsyncSession,
+    user_id: int,
+    limit: int | None,
+    after: tuple[datetime, int] | None,
+    date_from: datetime | None,
+    date_to: datetime | None,
+) -> list[dict]:
+    """Reads the same page from user's archive, empty if none is there."""
+    paths = archive.partition_paths(
+        await archive.get_partitions(session, user_id),
+        date_from=max(
+            filter(None, [date_from, after and after[0]]), default=None
+        ),
+        date_to=date_to,
+    )
+    if not paths:
+        return []
+    return await asyncio.to_thread(
+        archive.read_records,
+        paths,
+        limit=limit,
+        after=after,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
 
 async def get_financial_records(
     session: AsyncSession,
     user_id: int,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
 ) -> list[FinancialRecord]:
-    """Retrieves all financial records for a user sorted by record ID."""
-    stmt = (
-        select(FinancialRecord)
-        .where(FinancialRecord.user_id == user_id)
-        .order_by(FinancialRecord.id)
+    """Retrieves user's financial records sorted by date and record ID.
+
+    Paging is keyset-based: ``after`` is the ``(date, id)`` of the last
+    record of the previous page, so every page is one range scan of the
+    ``(user_id, date, id)`` index however deep into the history it is.
+    ``date_from`` is inclusive and ``date_to`` is exclusive. Archived
+    records in the range are merged in.
+    """
+    page = (user_id, limit, *_page_bounds(after, date_from, date_to))
+    result: Result = await session.execute(
+        _records_page(select(FinancialRecord), *page)
     )
-    result: Result = await session.execute(stmt)
-    financial_records = result.scalars().all()
-    return list(financial_records)
+    financial_records = list(result.scalars().all())
+
+    archived = await _archived_page(session, *page)
+    if not archived:
+        return financial_records
+    financial_records += [_archived_record(row, user_id) for row in archived]
+    financial_records.sort(key=lambda record: (record.date, record.id))
+    return financial_records[:limit]
+
+
+async def get_financial_record_rows(
+    session: AsyncSession,
+    user_id: int,
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[RecordRow]:
+    """Reads the records get_financial_records would as plain rows.
+
+    Only the schema columns are selected, with Core, so no ORM instances
+    are built or tracked by the session. Rows are ``RecordRow`` tuples,
+    or ``Row`` tuples of the same fields, and read-only.
+    """
+    page = (user_id, limit, *_page_bounds(after, date_from, date_to))
+    result: Result = await session.execute(
+        _records_page(select(*RECORD_COLUMNS), *page)
+    )
+    rows = list(result.all())
+
+    archived = await _archived_page(session, *page)
+    if not archived:
+        return rows
+    rows += [
+        RecordRow(**{**row, "type": RecordType(row["type"])})
+        for row in archived
+    ]
+    rows.sort(key=lambda row: (row.date, row.id))
+    return rows[:limit]
 
 
 async def get_financial_record(
@@ -36,6 +203,7 @@ async def get_financial_record(
     stmt = select(FinancialRecord).where(
         FinancialRecord.id == financial_record_id,
         FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
     )
     result = await session.execute(stmt)
     return result.scalars().first()
@@ -50,43 +218,542 @@ async def create_financial_record(
     financial_record = FinancialRecord(**financial_record_in.model_dump())
     financial_record.user_id = user_id
     session.add(financial_record)
+    await rollups.apply_record(session, financial_record)
+    await bump_data_version(session, user_id)
     await session.commit()
     await session.refresh(financial_record)
     return financial_record
 
 
+async def get_financial_records_changed_since(
+    session: AsyncSession,
+    user_id: int,
+    since: datetime,
+) -> list[FinancialRecord]:
+    """Retrieves user's records, deleted ones too, changed after since."""
+    stmt = (
+        select(FinancialRecord)
+        .where(
+            FinancialRecord.user_id == user_id,
+            FinancialRecord.updated_at > since,
+        )
+        .order_by(FinancialRecord.updated_at, FinancialRecord.id)
+    )
+    result: Result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def get_last_change(
+    session: AsyncSession, user_id: int
+) -> datetime | None:
+    """Returns when user's records or categories last changed."""
+    last_changes = [
+        select(func.max(model.updated_at))
+        .where(model.user_id == user_id)
+        .scalar_subquery()
+        for model in (FinancialRecord, Category)
+    ]
+    result = await session.execute(select(*last_changes))
+    return max(filter(None, result.one()), default=None)
+
+
+async def get_unknown_category_ids(
+    session: AsyncSession,
+    category_ids: set[int],
+    user_id: int,
+) -> set[int]:
+    """Returns IDs from the given set that are not user's categories."""
+    stmt = select(Category.id).where(
+        Category.id.in_(category_ids),
+        Category.user_id == user_id,
+        Category.deleted_at.is_(None),
+    )
+    result: Result = await session.execute(stmt)
+    return category_ids - set(result.scalars().all())
+
+
+async def create_financial_records_bulk(
+    session: AsyncSession,
+    financial_records_in: list[FinancialRecordCreate],
+    user_id: int,
+    batch_size: int = BULK_INSERT_BATCH_SIZE,
+) -> list[int]:
+    """Inserts many records in one transaction and returns their IDs.
+
+    All category IDs are checked against the user in one query of the
+    same transaction, and ``UnknownCategoriesError`` is raised before any
+    insert if one is not theirs. Rows are sent as executemany batches of
+    ``batch_size``, so the whole import costs one commit instead of one
+    commit per record.
+    """
+    unknown_category_ids = await get_unknown_category_ids(
+        session,
+        category_ids={r.category_id for r in financial_records_in},
+        user_id=user_id,
+    )
+    if unknown_category_ids:
+        raise UnknownCategoriesError(unknown_category_ids)
+    rows = [
+        {**financial_record_in.model_dump(), "user_id": user_id}
+        for financial_record_in in financial_records_in
+    ]
+    stmt = insert(FinancialRecord.__table__).returning(
+        FinancialRecord.id, sort_by_parameter_order=True
+    )
+    ids = []
+    for start in range(0, len(rows), batch_size):
+        end = start + batch_size
+        result = await session.execute(stmt, rows[start:end])
+        ids.extend(result.scalars().all())
+    await rollups.apply_rows(session, rows)
+    await bump_data_version(session, user_id)
+    await session.commit()
+    return ids
+
+
+RETURNED_COLUMNS = (
+    FinancialRecord.user_id,
+    FinancialRecord.category_id,
+    FinancialRecord.type,
+    FinancialRecord.date,
+    FinancialRecord.amount,
+)
+
+
+async def _update_financial_record(
+    session: AsyncSession,
+    financial_record_id: int,
+    user_id: int,
+    values: dict,
+) -> bool:
+    """Updates user's record in one statement, False if there is none.
+
+    Ownership is part of the ``WHERE`` clause and the new values come
+    back with ``RETURNING``, so no record is loaded into the session.
+    """
+    owned = (
+        FinancialRecord.id == financial_record_id,
+        FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
+    )
+    if not values:
+        result = await session.execute(
+            select(FinancialRecord.id).where(*owned)
+        )
+        return result.first() is not None
+
+    values = {
+        name: _naive(value) if isinstance(value, datetime) else value
+        for name, value in values.items()
+    }
+    await rollups.remove_stored_record(session, financial_record_id, user_id)
+    result = await session.execute(
+        update(FinancialRecord.__table__)
+        .where(*owned)
+        .values(**values)
+        .returning(*RETURNED_COLUMNS)
+    )
+    row = result.first()
+    if row is None:
+        return False
+    await rollups.apply_rollup_delta(
+        session,
+        user_id=row.user_id,
+        category_id=row.category_id,
+        record_type=row.type,
+        date=row.date,
+        amount=row.amount,
+        count=1,
+    )
+    await bump_data_version(session, user_id)
+    await session.commit()
+    return True
+
+
 async def update_financial_record(
     session: AsyncSession,
-    financial_record: FinancialRecord,
+    financial_record_id: int,
+    user_id: int,
     financial_record_update: FinancialRecordUpdate,
-) -> FinancialRecord:
-    """Updates all fields of financial record."""
-    for name, value in financial_record_update.model_dump().items():
-        if isinstance(value, datetime):
-            value = value.replace(tzinfo=None)
-        setattr(financial_record, name, value)
-    await session.commit()
-    return financial_record
+) -> bool:
+    """Updates all fields of user's record, False if there is none."""
+    return await _update_financial_record(
+        session,
+        financial_record_id,
+        user_id,
+        financial_record_update.model_dump(),
+    )
 
 
 async def update_financial_record_partial(
     session: AsyncSession,
-    financial_record: FinancialRecord,
+    financial_record_id: int,
+    user_id: int,
     financial_record_update: FinancialRecordUpdatePartial,
-) -> FinancialRecord:
-    """Updates only specified fields of financial record."""
-    for name, value in financial_record_update.model_dump(
-        exclude_unset=True
-    ).items():
-        setattr(financial_record, name, value)
-    await session.commit()
-    return financial_record
+) -> bool:
+    """Updates only specified fields of user's record, False if none."""
+    return await _update_financial_record(
+        session,
+        financial_record_id,
+        user_id,
+        financial_record_update.model_dump(exclude_unset=True),
+    )
 
 
 async def delete_financial_record(
     session: AsyncSession,
-    financial_record: FinancialRecord,
-) -> None:
-    """Deletes financial record."""
-    await session.delete(financial_record)
+    financial_record_id: int,
+    user_id: int,
+) -> bool:
+    """Deletes user's record in one statement, False if there is none.
+
+    The row is kept as a tombstone, so clients syncing changes learn
+    about the deletion.
+    """
+    result = await session.execute(
+        update(FinancialRecord.__table__)
+        .where(
+            FinancialRecord.id == financial_record_id,
+            FinancialRecord.user_id == user_id,
+            FinancialRecord.deleted_at.is_(None),
+        )
+        .values(deleted_at=utcnow())
+        .returning(*RETURNED_COLUMNS)
+    )
+    row = result.first()
+    if row is None:
+        return False
+    await rollups.apply_rollup_delta(
+        session,
+        user_id=row.user_id,
+        category_id=row.category_id,
+        record_type=row.type,
+        date=row.date,
+        amount=-row.amount,
+        count=-1,
+    )
+    await bump_data_version(session, user_id)
     await session.commit()
+    return True
+
+
+async def get_archived_record(
+    session: AsyncSession,
+    financial_record_id: int,
+    user_id: int,
+) -> FinancialRecord | None:
+    """Fetches user's record by ID from the archive, if it was moved there.
+
+    The record is built from its archived row and is not in the session.
+    """
+    partitions = await archive.get_partitions(session, user_id)
+    if not partitions:
+        return None
+    row = await asyncio.to_thread(
+        archive.read_record,
+        archive.partition_paths(partitions),
+        financial_record_id,
+    )
+    if row is None:
+        return None
+    return _archived_record(row, user_id)
+
+
+def _archived_record(row: dict, user_id: int) -> FinancialRecord:
+    """Builds a transient record from a row read from the archive."""
+    return FinancialRecord(
+        **{**row, "type": RecordType(row["type"])}, user_id=user_id
+    )
+
+
+def _filter_records(
+    stmt: Select,
+    user_id: int,
+    date_from: datetime | None,
+    date_to: datetime | None,
+    category_ids: list[int] | None,
+) -> Select:
+    """Restricts query to user's records matching the filters."""
+    stmt = stmt.where(
+        FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
+    )
+    if date_from is not None:
+        stmt = stmt.where(FinancialRecord.date >= _naive(date_from))
+    if date_to is not None:
+        stmt = stmt.where(FinancialRecord.date < _naive(date_to))
+    if category_ids:
+        stmt = stmt.where(FinancialRecord.category_id.in_(category_ids))
+    return stmt
+
+
+async def search_financial_records(
+    session: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int,
+    record_type: TypeFinanceRecord | None = None,
+    category_ids: list[int] | None = None,
+    amount_min: float | None = None,
+    amount_max: float | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[FinancialRecord]:
+    """Finds user's records whose descriptions match the query words.
+
+    Matches are ranked by BM25, best first. To bound the cost of common
+    words, only the newest ``SEARCH_CANDIDATES`` of the user's matching
+    records that pass the other filters are ranked. They are picked
+    from the user's index entries alone, and ranked by a second match
+    of the words within the candidates' ID range, which keeps the
+    user's ID out of BM25's pass over every hit of every term. Archived
+    records are not indexed, so they are never found.
+    """
+    match = fts_query(query)
+    if match is None:
+        return []
+    candidates = _filter_records(
+        select(FinancialRecord.id)
+        .join(
+            financial_records_fts,
+            financial_records_fts.c.rowid == FinancialRecord.id,
+        )
+        .where(
+            financial_records_fts.c[FTS_TABLE].match(
+                user_fts_query(match, user_id)
+            )
+        ),
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+        category_ids=category_ids,
+    )
+    if record_type is not None:
+        candidates = candidates.where(FinancialRecord.type == record_type)
+    if amount_min is not None:
+        candidates = candidates.where(FinancialRecord.amount >= amount_min)
+    if amount_max is not None:
+        candidates = candidates.where(FinancialRecord.amount <= amount_max)
+    candidates = (
+        candidates.order_by(financial_records_fts.c.rowid.desc())
+        .limit(SEARCH_CANDIDATES)
+        .cte("candidates")
+    )
+    # Materialized, so the ranking match runs once, not once per candidate.
+    ranked = (
+        select(
+            financial_records_fts.c.rowid.label("id"),
+            financial_records_fts.c.rank,
+        )
+        .where(
+            financial_records_fts.c[FTS_TABLE].match(match),
+            financial_records_fts.c.rowid.between(
+                select(func.min(candidates.c.id)).scalar_subquery(),
+                select(func.max(candidates.c.id)).scalar_subquery(),
+            ),
+        )
+        .cte("ranked")
+        .prefix_with("MATERIALIZED")
+    )
+    stmt = (
+        select(FinancialRecord)
+        .join(candidates, candidates.c.id == FinancialRecord.id)
+        .join(ranked, ranked.c.id == candidates.c.id)
+        .order_by(ranked.c.rank, FinancialRecord.id)
+        .limit(limit)
+    )
+    result: Result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def get_financial_summary(
+    session: AsyncSession,
+    user_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_ids: list[int] | None = None,
+) -> dict:
+    """Aggregates user's records by type, category and day with GROUP BY.
+
+    The result size depends on the number of groups, not on the number
+    of records. ``first_date`` and ``last_date`` bound all user's records
+    regardless of the filters. Totals of archived records are added.
+    """
+    filters = dict(
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+        category_ids=category_ids,
+    )
+    amount = func.sum(FinancialRecord.amount).label("amount")
+    count = func.count(FinancialRecord.id).label("count")
+    day = func.date(FinancialRecord.date).label("day")
+
+    bounds_stmt = select(
+        func.min(FinancialRecord.date), func.max(FinancialRecord.date)
+    ).where(
+        FinancialRecord.user_id == user_id,
+        FinancialRecord.deleted_at.is_(None),
+    )
+    by_type_stmt = _filter_records(
+        select(FinancialRecord.type, amount, count), **filters
+    ).group_by(FinancialRecord.type)
+    by_category_stmt = (
+        _filter_records(
+            select(
+                FinancialRecord.category_id,
+                FinancialRecord.type,
+                amount,
+                count,
+            ),
+            **filters,
+        )
+        .group_by(FinancialRecord.category_id, FinancialRecord.type)
+        .order_by(FinancialRecord.category_id)
+    )
+    by_day_stmt = (
+        _filter_records(select(day, FinancialRecord.type, amount), **filters)
+        .group_by(day, FinancialRecord.type)
+        .order_by(day)
+    )
+
+    first_date, last_date = (await session.execute(bounds_stmt)).one()
+    by_type = (await session.execute(by_type_stmt)).mappings().all()
+    by_category = (await session.execute(by_category_stmt)).mappings().all()
+    by_day = (await session.execute(by_day_stmt)).mappings().all()
+
+    partitions = await archive.get_partitions(session, user_id)
+    if partitions:
+        first_date = min(
+            filter(None, [first_date, *(p.first_date for p in partitions)])
+        )
+        last_date = max(
+            filter(None, [last_date, *(p.last_date for p in partitions)])
+        )
+        date_from = date_from and _naive(date_from)
+        date_to = date_to and _naive(date_to)
+        paths = archive.partition_paths(partitions, date_from, date_to)
+        if paths:
+            archived = await asyncio.to_thread(
+                archive.summarize, paths, date_from, date_to, category_ids
+            )
+            by_type = archive.merge_totals(
+                by_type, archived["by_type"], ["type"]
+            )
+            by_category = archive.merge_totals(
+                by_category, archived["by_category"], ["category_id", "type"]
+            )
+            by_day = archive.merge_totals(
+                by_day, archived["by_day"], ["day", "type"]
+            )
+
+    daily_amounts: dict = {}
+    for row in by_day:
+        daily_amounts.setdefault(row["type"], []).append(row["amount"])
+    daily_average = [
+        {"type": record_type, "amount": sum(amounts) / len(amounts)}
+        for record_type, amounts in daily_amounts.items()
+    ]
+
+    return {
+        "first_date": first_date,
+        "last_date": last_date,
+        "by_type": by_type,
+        "by_category": by_category,
+        "by_day": by_day,
+        "daily_average": daily_average,
+    }
+
+
+async def get_monthly_totals(
+    session: AsyncSession,
+    user_id: int,
+    month_from: str | None = None,
+    month_to: str | None = None,
+    category_ids: list[int] | None = None,
+) -> list[MonthlyRollup]:
+    """Reads user's monthly totals per category and type from rollups.
+
+    ``month_from`` and ``month_to`` are inclusive ``YYYY-MM`` bounds.
+    """
+    stmt = select(MonthlyRollup).where(
+        MonthlyRollup.user_id == user_id,
+        MonthlyRollup.count > 0,
+    )
+    if month_from is not None:
+        stmt = stmt.where(MonthlyRollup.month >= month_from)
+    if month_to is not None:
+        stmt = stmt.where(MonthlyRollup.month <= month_to)
+    if category_ids:
+        stmt = stmt.where(MonthlyRollup.category_id.in_(category_ids))
+    stmt = stmt.order_by(MonthlyRollup.month, MonthlyRollup.category_id)
+    result: Result = await session.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def stream_financial_records(
+    session: AsyncSession,
+    user_id: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_ids: list[int] | None = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[list]:
+    """Streams user's records with category names in date order.
+
+    Rows are read from a server-side cursor and yielded in batches of
+    ``batch_size``, so the whole history is never loaded at once.
+    Archived records are merged in, also a batch at a time.
+    """
+    date_from = date_from and _naive(date_from)
+    date_to = date_to and _naive(date_to)
+    paths = archive.partition_paths(
+        await archive.get_partitions(session, user_id), date_from, date_to
+    )
+    if paths:
+        result = await session.execute(
+            select(Category.id, Category.name).where(
+                Category.user_id == user_id
+            )
+        )
+        archived_batches = archive.iter_rows(
+            paths,
+            dict(result.all()),
+            batch_size,
+            date_from=date_from,
+            date_to=date_to,
+            category_ids=category_ids,
+        )
+
+    stmt = _filter_records(
+        select(
+            FinancialRecord.id,
+            FinancialRecord.date,
+            FinancialRecord.type,
+            FinancialRecord.category_id,
+            Category.name.label("category_name"),
+            FinancialRecord.description,
+            FinancialRecord.amount,
+        ).join(Category, Category.id == FinancialRecord.category_id),
+        user_id=user_id,
+        date_from=date_from,
+        date_to=date_to,
+        category_ids=category_ids,
+    ).order_by(FinancialRecord.date, FinancialRecord.id)
+    result = await session.stream(stmt.execution_options(yield_per=batch_size))
+    if not paths:
+        async for partition in result.partitions():
+            yield partition
+        return
+
+    async def read_archived():
+        while batch := await asyncio.to_thread(next, archived_batches, None):
+            yield batch
+
+    async for batch in archive.merge_sorted_batches(
+        result.partitions(),
+        read_archived(),
+        key=lambda row: (row.date, row.id),
+        batch_size=batch_size,
+    ):
+        yield batch
@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+from typing import AsyncContextManager, AsyncIterator, Callable
+
+import msgpack
+import pyarrow as pa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.financial_records import crud
+from app.api.financial_records.encoders import (
+    ARROW_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+)
+
+EXPORT_COLUMNS = (
+    "id",
+    "date",
+    "type",
+    "category_id",
+    "category_name",
+    "description",
+    "amount",
+)
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "arrow": ARROW_MEDIA_TYPE,
+    "msgpack": MSGPACK_MEDIA_TYPE,
+}
+# Formats by media type, in the order they are offered for Accept.
+EXPORT_FORMATS = {
+    media_type: export_format
+    for export_format, media_type in EXPORT_MEDIA_TYPES.items()
+}
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("date", pa.timestamp("us")),
+        ("type", pa.string()),
+        ("category_id", pa.int64()),
+        ("category_name", pa.string()),
+        ("description", pa.string()),
+        ("amount", pa.float64()),
+    ]
+)
+# End-of-stream marker of the Arrow IPC stream format.
+ARROW_END = b"\xff\xff\xff\xff\x00\x00\x00\x00"
+
+
+def _row_values(row) -> list:
+    """Converts exported row to plain JSON/CSV friendly values."""
+    return [
+        row.id,
+        row.date.isoformat(),
+        getattr(row.type, "value", row.type),
+        row.category_id,
+        row.category_name,
+        row.description,
+        row.amount,
+    ]
+
+
+def format_csv(rows: list, header: bool = False) -> str:
+    """Formats a batch of exported rows as CSV lines."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_row_values(row) for row in rows)
+    return output.getvalue()
+
+
+def format_ndjson(rows: list, header: bool = False) -> str:
+    """Formats a batch of exported rows as JSON lines."""
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row)))) + "\n"
+        for row in rows
+    )
+
+
+def format_arrow(rows: list, header: bool = False) -> bytes:
+    """Formats a batch of exported rows as an Arrow IPC stream message.
+
+    The header is the schema message. Each batch becomes a record batch
+    message, so the stream is built without holding all the rows.
+    """
+    if header:
+        return EXPORT_SCHEMA.serialize().to_pybytes()
+    if not rows:
+        return b""
+    columns = {
+        column: [getattr(row, column) for row in rows]
+        for column in EXPORT_COLUMNS
+    }
+    columns["type"] = [
+        getattr(value, "value", value) for value in columns["type"]
+    ]
+    batch = pa.RecordBatch.from_pydict(columns, schema=EXPORT_SCHEMA)
+    return batch.serialize().to_pybytes()
+
+
+def format_msgpack(rows: list, header: bool = False) -> bytes:
+    """Formats a batch of exported rows as a sequence of MessagePack maps.
+
+    Maps hold the values NDJSON lines do, one map per row.
+    """
+    return b"".join(
+        msgpack.packb(dict(zip(EXPORT_COLUMNS, _row_values(row))))
+        for row in rows
+    )
+
+
+FORMATTERS: dict[str, Callable[..., str | bytes]] = {
+    "csv": format_csv,
+    "ndjson": format_ndjson,
+    "arrow": format_arrow,
+    "msgpack": format_msgpack,
+}
+# Formats with a header before the rows, and their end markers.
+HEADERS = {"csv", "arrow"}
+TRAILERS = {"arrow": ARROW_END}
+
+
+async def stream_export(
+    session_factory: Callable[[], AsyncContextManager[AsyncSession]],
+    export_format: str,
+    user_id: int,
+    **filters,
+) -> AsyncIterator[str | bytes]:
+    """Yields user's records in the export format batch by batch.
+
+    The generator owns its session, as it outlives the request handler,
+    and only one batch of rows is held in memory at a time.
+    """
+    formatter = FORMATTERS[export_format]
+    if export_format in HEADERS:
+        yield formatter([], header=True)
+    async with session_factory() as session:
+        async for rows in crud.stream_financial_records(
+            session, user_id=user_id, **filters
+        ):
+            yield formatter(rows)
+    if export_format in TRAILERS:
+        yield TRAILERS[export_format]
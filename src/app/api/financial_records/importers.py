@@ -0,0 +1,259 @@
+import codecs
+import csv
+import io
+import json
+import re
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from typing import IO, AsyncIterator, Callable, Iterator
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import FinancialRecordCreate
+from app.database.writer import WriteQueue
+
+IMPORT_CHUNK_SIZE = 1000
+READ_BLOCK_SIZE = 64 * 1024
+MAX_ERROR_LENGTH = 200
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+_OFX_DATE = re.compile(r"\d{8}(\d{6})?")
+
+
+def detect_format(filename: str | None) -> str | None:
+    """Returns ``csv`` or ``ofx`` judging by statement file extension."""
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "csv":
+        return "csv"
+    if extension in ("ofx", "qfx"):
+        return "ofx"
+    return None
+
+
+async def spool_upload(file: UploadFile) -> IO[bytes]:
+    """Copies upload into a private temp file block by block.
+
+    The upload is closed once the endpoint returns, while the import keeps
+    reading it from the streaming response, so it needs its own copy.
+    """
+    spooled = tempfile.TemporaryFile()
+    while block := await file.read(READ_BLOCK_SIZE):
+        spooled.write(block)
+    spooled.seek(0)
+    return spooled
+
+
+def iter_csv_rows(stream: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    """Yields ``(line, row)`` pairs of a CSV statement one at a time."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {
+                (key or "").strip().lower(): value
+                for key, value in row.items()
+            }
+    finally:
+        text.detach()
+
+
+def iter_ofx_transactions(stream: IO[bytes]) -> Iterator[tuple[int, dict]]:
+    """Yields ``(number, transaction)`` pairs of an OFX statement.
+
+    The file is tokenized in fixed-size blocks, so both SGML and XML
+    flavours work whether or not transactions are split across lines.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    transaction = None
+    number = 0
+    while True:
+        block = stream.read(READ_BLOCK_SIZE)
+        buffer += decoder.decode(block, final=not block)
+        cut = max(buffer.rfind("<"), 0) if block else len(buffer)
+        for closing, tag, value in _OFX_TAG.findall(buffer[:cut]):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if not closing:
+                    transaction = {}
+                elif transaction is not None:
+                    number += 1
+                    yield number, transaction
+                    transaction = None
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+        buffer = buffer[cut:]
+        if not block:
+            return
+
+
+def _parse_ofx_date(value: str) -> datetime:
+    """Parses OFX ``YYYYMMDD[HHMMSS][.XXX][TZ]`` date, dropping the zone."""
+    match = _OFX_DATE.match(value)
+    if not match:
+        raise ValueError(f"Invalid date '{value}'")
+    digits = match.group(0)
+    return datetime.strptime(
+        digits, "%Y%m%d%H%M%S" if len(digits) == 14 else "%Y%m%d"
+    )
+
+
+def csv_row_to_record(
+    row: dict,
+    categories: dict[str, int],
+    default_category_id: int | None,
+) -> FinancialRecordCreate:
+    """Maps CSV row to a record; negative amounts without type are expenses.
+
+    Expected columns are ``date`` and ``amount``, with optional ``type``,
+    ``description`` and ``category`` (name) or ``category_id``.
+    """
+    amount = float(row["amount"])
+    record_type = (row.get("type") or "").strip().lower()
+    if not record_type:
+        record_type = "expense" if amount < 0 else "income"
+
+    category_id = default_category_id
+    if row.get("category"):
+        category_id = categories.get(row["category"].strip().lower())
+        if category_id is None:
+            raise ValueError(f"Unknown category '{row['category']}'")
+    elif row.get("category_id"):
+        category_id = int(row["category_id"])
+        if category_id not in categories.values():
+            raise ValueError(f"Unknown category {category_id}")
+    if category_id is None:
+        raise ValueError("Category is not specified")
+
+    return FinancialRecordCreate(
+        type=record_type,
+        description=(row.get("description") or "").strip(),
+        amount=abs(amount),
+        date=datetime.fromisoformat(row["date"].strip()),
+        category_id=category_id,
+    )
+
+
+def ofx_transaction_to_record(
+    transaction: dict,
+    default_category_id: int,
+) -> FinancialRecordCreate:
+    """Maps OFX transaction to a record filed under the default category."""
+    amount = float(transaction["TRNAMT"])
+    return FinancialRecordCreate(
+        type="expense" if amount < 0 else "income",
+        description=transaction.get("NAME") or transaction.get("MEMO") or "",
+        amount=abs(amount),
+        date=_parse_ofx_date(transaction["DTPOSTED"]),
+        category_id=default_category_id,
+    )
+
+
+def _row_error(row: int, error: Exception) -> dict:
+    """Describes why a statement row was rejected."""
+    if isinstance(error, KeyError):
+        message = f"Missing field {error}"
+    elif isinstance(error, ValidationError):
+        message = "; ".join(e["msg"] for e in error.errors())
+    else:
+        message = str(error)
+    return {"row": row, "error": message[:MAX_ERROR_LENGTH]}
+
+
+async def _flush_chunk(
+    writer: WriteQueue,
+    user_id: int,
+    chunk: list[FinancialRecordCreate],
+    errors: list[dict],
+    progress: dict,
+    started: float,
+    event: str,
+) -> dict:
+    """Inserts parsed chunk and returns progress report, emptying buffers."""
+    if chunk:
+        ids = await writer.run(
+            crud.create_financial_records_bulk, chunk, user_id=user_id
+        )
+        progress["inserted"] += len(ids)
+    elapsed = time.perf_counter() - started
+    report = {
+        "event": event,
+        **progress,
+        "errors": list(errors),
+        "rows_per_second": (
+            round(progress["rows"] / elapsed, 1) if elapsed else 0.0
+        ),
+    }
+    chunk.clear()
+    errors.clear()
+    return report
+
+
+async def import_statement(
+    writer: WriteQueue,
+    stream: IO[bytes],
+    statement_format: str,
+    user_id: int,
+    categories: dict[str, int],
+    default_category_id: int | None,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+) -> AsyncIterator[dict]:
+    """Imports statement rows in chunks, yielding a progress event for each.
+
+    Only one chunk of parsed records and its row errors are held at a
+    time, so memory stays flat whatever the statement size. Each chunk is
+    one write queue operation; the final event has ``"event": "done"``.
+    """
+    rows: Iterator[tuple[int, dict]]
+    to_record: Callable[[dict], FinancialRecordCreate]
+    if statement_format == "ofx":
+        rows = iter_ofx_transactions(stream)
+        to_record = partial(
+            ofx_transaction_to_record,
+            default_category_id=default_category_id,
+        )
+    else:
+        rows = iter_csv_rows(stream)
+        to_record = partial(
+            csv_row_to_record,
+            categories=categories,
+            default_category_id=default_category_id,
+        )
+
+    started = time.perf_counter()
+    progress = {"rows": 0, "inserted": 0, "failed": 0}
+    chunk: list[FinancialRecordCreate] = []
+    errors: list[dict] = []
+    for row_number, raw in rows:
+        progress["rows"] += 1
+        try:
+            chunk.append(to_record(raw))
+        except (KeyError, ValueError) as e:
+            progress["failed"] += 1
+            errors.append(_row_error(row_number, e))
+        if progress["rows"] % chunk_size == 0:
+            yield await _flush_chunk(
+                writer, user_id, chunk, errors, progress, started, "progress"
+            )
+    yield await _flush_chunk(
+        writer, user_id, chunk, errors, progress, started, "done"
+    )
+
+
+async def stream_import_ndjson(
+    writer: WriteQueue,
+    spooled: IO[bytes],
+    **kwargs,
+) -> AsyncIterator[str]:
+    """Serializes import progress as NDJSON and removes the spooled file."""
+    try:
+        async for event in import_statement(writer, spooled, **kwargs):
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+    finally:
+        spooled.close()
@@ -0,0 +1,42 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def encode_cursor(date: datetime, record_id: int) -> str:
+    """Encodes keyset position of a record into an opaque page cursor."""
+    raw = f"{date.isoformat()}|{record_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decodes page cursor back into the ``(date, id)`` keyset position."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date, record_id = raw.split("|")
+        return datetime.fromisoformat(date), int(record_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def encode_changes_cursor(updated_at: datetime) -> str:
+    """Encodes time of the last seen change into an opaque sync cursor."""
+    return base64.urlsafe_b64encode(updated_at.isoformat().encode()).decode()
+
+
+def decode_changes_cursor(cursor: str) -> datetime:
+    """Decodes sync cursor back into the time of the last seen change."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        return datetime.fromisoformat(raw)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
@@ -0,0 +1,183 @@
+import asyncio
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import archive
+from app.database.models import (
+    ArchivedPartition,
+    FinancialRecord,
+    MonthlyRollup,
+    TypeFinanceRecord,
+)
+
+
+def month_of(date: datetime) -> str:
+    """Returns the ``YYYY-MM`` rollup month of a record date."""
+    return date.strftime("%Y-%m")
+
+
+ROLLUP_COLUMNS = ["user_id", "category_id", "type", "month", "amount", "count"]
+
+_UPSERT_SQL = """
+INSERT INTO monthlyrollups (user_id, category_id, type, month, amount, count)
+{source}
+ON CONFLICT (user_id, category_id, type, month) DO UPDATE SET
+    amount = amount + excluded.amount,
+    count = count + excluded.count
+"""
+
+_DELTA_VALUES = """
+VALUES (:user_id, :category_id, :type, :month, :amount, :count)"""
+
+_STORED_RECORD_DELTAS = """
+SELECT user_id, category_id, type, strftime('%Y-%m', date), -amount, -1
+FROM financialrecords
+WHERE id = :financial_record_id AND user_id = :user_id
+    AND deleted_at IS NULL"""
+
+# Written as text: SQLAlchemy cannot cache compiled ON CONFLICT DO UPDATE
+# constructs, and compiling them took most of the time of a record write.
+UPSERT_DELTA = text(_UPSERT_SQL.format(source=_DELTA_VALUES)).bindparams(
+    bindparam("type", type_=MonthlyRollup.__table__.c.type.type)
+)
+REMOVE_STORED_RECORD = text(_UPSERT_SQL.format(source=_STORED_RECORD_DELTAS))
+
+
+async def apply_rollup_delta(
+    session: AsyncSession,
+    user_id: int,
+    category_id: int,
+    record_type: TypeFinanceRecord | str,
+    date: datetime,
+    amount: float,
+    count: int,
+) -> None:
+    """Adds amount and count deltas to the matching monthly rollup row."""
+    await session.execute(
+        UPSERT_DELTA,
+        {
+            "user_id": user_id,
+            "category_id": category_id,
+            "type": record_type,
+            "month": month_of(date),
+            "amount": amount,
+            "count": count,
+        },
+    )
+
+
+async def apply_record(
+    session: AsyncSession,
+    financial_record: FinancialRecord,
+    sign: int = 1,
+) -> None:
+    """Adds record to its rollup, or removes it from there with sign=-1."""
+    await apply_rollup_delta(
+        session,
+        user_id=financial_record.user_id,
+        category_id=financial_record.category_id,
+        record_type=financial_record.type,
+        date=financial_record.date,
+        amount=sign * financial_record.amount,
+        count=sign,
+    )
+
+
+async def remove_stored_record(
+    session: AsyncSession,
+    financial_record_id: int,
+    user_id: int,
+) -> None:
+    """Subtracts user's record, as stored, from its rollup.
+
+    The old values are read by the upsert itself, so the record does not
+    have to be loaded before it is updated; a record of another user
+    matches no row and changes nothing.
+    """
+    await session.execute(
+        REMOVE_STORED_RECORD,
+        {"financial_record_id": financial_record_id, "user_id": user_id},
+    )
+
+
+async def apply_rows(session: AsyncSession, rows: list[dict]) -> None:
+    """Adds inserted record rows to rollups with one upsert per month."""
+    deltas: dict[tuple, dict] = {}
+    for row in rows:
+        key = (
+            row["user_id"],
+            row["category_id"],
+            row["type"],
+            month_of(row["date"]),
+        )
+        delta = deltas.setdefault(
+            key,
+            dict(zip(("user_id", "category_id", "type", "month"), key)),
+        )
+        delta["amount"] = delta.get("amount", 0.0) + row["amount"]
+        delta["count"] = delta.get("count", 0) + 1
+    if deltas:
+        await session.execute(UPSERT_DELTA, list(deltas.values()))
+
+
+async def rebuild_rollups(session: AsyncSession) -> None:
+    """Repopulates all monthly rollups from records and their archives.
+
+    Archived records are no longer in the records table, so their
+    months are aggregated from each user's Parquet files and added on.
+    """
+    month = func.strftime("%Y-%m", FinancialRecord.date)
+    totals = (
+        select(
+            FinancialRecord.user_id,
+            FinancialRecord.category_id,
+            FinancialRecord.type,
+            month,
+            func.sum(FinancialRecord.amount),
+            func.count(FinancialRecord.id),
+        )
+        .where(FinancialRecord.deleted_at.is_(None))
+        .group_by(
+            FinancialRecord.user_id,
+            FinancialRecord.category_id,
+            FinancialRecord.type,
+            month,
+        )
+    )
+    await session.execute(delete(MonthlyRollup))
+    await session.execute(
+        insert(MonthlyRollup).from_select(ROLLUP_COLUMNS, totals)
+    )
+    result = await session.execute(
+        select(ArchivedPartition).order_by(
+            ArchivedPartition.user_id, ArchivedPartition.id
+        )
+    )
+    partitions: dict[int, list[ArchivedPartition]] = {}
+    for partition in result.scalars().all():
+        partitions.setdefault(partition.user_id, []).append(partition)
+    for user_id, user_partitions in partitions.items():
+        archived = await asyncio.to_thread(
+            archive.monthly_totals, archive.partition_paths(user_partitions)
+        )
+        if archived:
+            await session.execute(
+                UPSERT_DELTA,
+                [{**row, "user_id": user_id} for row in archived],
+            )
+    await session.commit()
+
+
+async def main() -> None:
+    """Rebuilds monthly rollups of the configured database."""
+    from app.database.db_helper import db_helper
+
+    async with db_helper.session_factory() as session:
+        await rebuild_rollups(session)
+    await db_helper.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
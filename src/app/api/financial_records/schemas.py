@@ -1,8 +1,10 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
 
 from pydantic import BaseModel, ConfigDict
 
+from app.api.categories.schemas import Category
+
 
 class TypeFinanceRecord(str, Enum):
     """Possible types of financial records."""
@@ -35,6 +37,12 @@ class FinancialRecord(FinancialRecordBase):
     id: int
 
 
+class FinancialRecordBulkCreated(BaseModel):
+    """IDs of financial records created by a bulk request, in input order."""
+
+    ids: list[int]
+
+
 class FinancialRecordUpdate(FinancialRecordCreate):
     """Schema for full update of a financial record."""
 
@@ -49,3 +57,69 @@ class FinancialRecordUpdatePartial(FinancialRecordCreate):
     amount: float | None = None
     date: datetime | None = None
     category_id: int | None = None
+
+
+class FinancialChanges(BaseModel):
+    """User's records and categories changed since a sync cursor.
+
+    Items are ordered by the time of their change; ``cursor`` is passed
+    as ``since`` to get the changes that follow.
+    """
+
+    records: list[FinancialRecord]
+    deleted_record_ids: list[int]
+    categories: list[Category]
+    deleted_category_ids: list[int]
+    cursor: str
+
+
+class TypeTotal(BaseModel):
+    """Total amount and number of records of one type."""
+
+    type: TypeFinanceRecord
+    amount: float
+    count: int
+
+
+class CategoryTotal(TypeTotal):
+    """Total amount and number of records of one type in a category."""
+
+    category_id: int
+
+
+class DailyTotal(BaseModel):
+    """Total amount of records of one type on a single day."""
+
+    day: date
+    type: TypeFinanceRecord
+    amount: float
+
+
+class DailyAverage(BaseModel):
+    """Average daily total of records of one type."""
+
+    type: TypeFinanceRecord
+    amount: float
+
+
+class FinancialSummary(BaseModel):
+    """Aggregated totals of user's financial records for the dashboard."""
+
+    first_date: datetime | None = None
+    last_date: datetime | None = None
+    by_type: list[TypeTotal]
+    by_category: list[CategoryTotal]
+    by_day: list[DailyTotal]
+    daily_average: list[DailyAverage]
+
+
+class MonthlyTotal(BaseModel):
+    """Total of user's records of one type in a category for a month."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    month: str
+    category_id: int
+    type: TypeFinanceRecord
+    amount: float
+    count: int
@@ -1,17 +1,42 @@
+from typing import Sequence
+
 import jwt
-from fastapi import Depends, HTTPException, Request, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.financial_records.encoders import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+)
+from app.api.users.claims_cache import claims_cache
 from app.api.users.crud import get_user_by_username
 from app.api.users.utils import decode_jwt
+from app.database.sharding import current_user_id
+from app.database.versions import (
+    data_version_etag,
+    etag_matches,
+    get_data_version,
+)
 from src.app.database.db_helper import db_helper
 
+# Media types of record lists, by server preference, with ETag variants.
+RECORD_MEDIA_TYPES = {
+    JSON_MEDIA_TYPE: "",
+    ARROW_MEDIA_TYPE: "arrow",
+    MSGPACK_MEDIA_TYPE: "msgpack",
+}
+
 
 async def get_current_user(
     request: Request,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
 ):
-    """Authenticates user by validating JWT access token from cookies."""
+    """Authenticates user by validating JWT access token from cookies.
+
+    Verified tokens of existing users are cached, so repeated requests
+    skip the signature check and the user lookup.
+    """
     token = request.cookies.get("access_token")
 
     if not token:
@@ -20,6 +45,11 @@ async def get_current_user(
             detail="Not authenticated",
         )
 
+    cached = claims_cache.get(token)
+    if cached is not None:
+        current_user_id.set(cached.user_id)
+        return cached.user_id
+
     try:
         payload = decode_jwt(token)
         user_id: int = payload.get("user_id")
@@ -38,6 +68,8 @@ async def get_current_user(
                 detail="User not found",
             )
 
+        claims_cache.put(token, user_id, username, payload.get("exp"))
+        current_user_id.set(user_id)
         return user_id
 
     except jwt.InvalidTokenError:
@@ -45,3 +77,106 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate token",
         )
+
+
+async def check_data_version(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+) -> None:
+    """Answers 304 when the client's copy of user's data is current.
+
+    The strong ETag is made of the user's data version, which every
+    change of records and categories bumps, so the check reads a single
+    row. Otherwise the ETag is sent along with the response.
+    """
+    await _check_version(request, response, session, current_user_id)
+
+
+async def negotiate_records_format(
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+) -> str:
+    """Picks media type of records by Accept, then checks data version.
+
+    Answers 406 if no type of RECORD_MEDIA_TYPES is acceptable. Each
+    type has its own ETag and ``Vary: Accept`` is sent, so clients and
+    caches keep the formats apart.
+    """
+    media_type = negotiate_media_type(
+        request.headers.get("Accept"), list(RECORD_MEDIA_TYPES)
+    )
+    if media_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail="Records are available as "
+            f"{', '.join(RECORD_MEDIA_TYPES)}",
+        )
+    await _check_version(
+        request,
+        response,
+        session,
+        current_user_id,
+        variant=RECORD_MEDIA_TYPES[media_type],
+        headers={"Vary": "Accept"},
+    )
+    return media_type
+
+
+async def _check_version(
+    request: Request,
+    response: Response,
+    session: AsyncSession,
+    user_id: int,
+    variant: str = "",
+    headers: dict[str, str] | None = None,
+) -> None:
+    """Answers 304 for a current ETag, or sets it on the response."""
+    version = await get_data_version(session, user_id)
+    headers = {
+        "ETag": data_version_etag(user_id, version, variant),
+        "Cache-Control": "private, no-cache",
+        **(headers or {}),
+    }
+    if etag_matches(request.headers.get("If-None-Match"), headers["ETag"]):
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers=headers
+        )
+    response.headers.update(headers)
+
+
+def negotiate_media_type(
+    accept: str | None, media_types: Sequence[str]
+) -> str | None:
+    """Returns the media type the Accept header prefers, None if none fits.
+
+    Each type gets the quality of its most specific matching range, and
+    ties go to the earlier type. Without Accept the first type is used.
+    """
+    if not accept or not accept.strip():
+        return media_types[0]
+    ranges = {}
+    for item in accept.split(","):
+        media_range, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_range.lower()] = quality
+
+    best, best_quality = None, 0.0
+    for media_type in media_types:
+        kind = media_type.split("/")[0]
+        for media_range in (media_type, f"{kind}/*", "*/*"):
+            if media_range in ranges:
+                if ranges[media_range] > best_quality:
+                    best, best_quality = media_type, ranges[media_range]
+                break
+    return best
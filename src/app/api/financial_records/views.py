@@ -1,4 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+from datetime import datetime
+from functools import partial
+from typing import Annotated, Literal
+
+from annotated_types import MaxLen, MinLen
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Form,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
 from reportlab.lib.pagesizes import letter
@@ -8,56 +23,394 @@ from reportlab.lib import colors
 from starlette import status
 import io
 
+from src.app.api.categories import crud as categories_crud
 from src.app.database.db_helper import db_helper
-from . import crud
+from src.app.database.routing import reads_from_primary
+from . import crud, exporters, importers
+from .encoders import ROW_ENCODERS, encode_records, encoded_response
 from .schemas import (
+    FinancialChanges,
     FinancialRecord,
+    FinancialRecordBulkCreated,
     FinancialRecordCreate,
     FinancialRecordUpdate,
     FinancialRecordUpdatePartial,
+    FinancialSummary,
+    MonthlyTotal,
+    TypeFinanceRecord,
+)
+from .pagination import (
+    EPOCH,
+    decode_changes_cursor,
+    decode_cursor,
+    encode_changes_cursor,
+    encode_cursor,
+)
+from .utils import (
+    check_data_version,
+    get_current_user,
+    negotiate_media_type,
+    negotiate_records_format,
 )
-from .utils import get_current_user
 
 router = APIRouter(prefix="/financial_records", tags=["Financial Records"])
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_SEARCH_QUERY_LENGTH = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_BULK_RECORDS = 10000
+MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
 
-@router.get("/", response_model=list[FinancialRecord])
+@router.get(
+    "/",
+    response_model=list[FinancialRecord],
+    responses={
+        status.HTTP_200_OK: {
+            "content": {media_type: {} for media_type in ROW_ENCODERS}
+        }
+    },
+)
 async def get_financial_records(
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    media_type: str = Depends(negotiate_records_format),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Retrieves a page of financial records belonging to the user.
+
+    Records are ordered by date. When more records follow, the cursor of
+    the next page is returned in the ``X-Next-Cursor`` header. Rows are
+    read without the ORM and encoded straight to JSON, or to Arrow IPC
+    or MessagePack when Accept asks for them.
+    """
+    financial_records = await crud.get_financial_record_rows(
+        session=session,
+        user_id=current_user_id,
+        limit=limit + 1,
+        after=decode_cursor(cursor) if cursor else None,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    if len(financial_records) > limit:
+        financial_records = financial_records[:limit]
+        last_record = financial_records[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            last_record.date, last_record.id
+        )
+    return encoded_response(
+        ROW_ENCODERS[media_type](financial_records), response, media_type
+    )
+
+
+@router.get(
+    "/search",
+    response_model=list[FinancialRecord],
+    dependencies=[Depends(check_data_version)],
+)
+async def search_financial_records(
+    response: Response,
+    q: str = Query(min_length=1, max_length=MAX_SEARCH_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    record_type: TypeFinanceRecord | None = Query(None, alias="type"),
+    category_id: list[int] | None = Query(None),
+    amount_min: float | None = None,
+    amount_max: float | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
-    """Retrieves all financial records belonging to the user."""
-    return await crud.get_financial_records(
+    """Searches descriptions of user's records, best matches first.
+
+    Every word of ``q`` has to match the start of a word of the
+    description. The other parameters narrow the matches down.
+    """
+    financial_records = await crud.search_financial_records(
         session=session,
         user_id=current_user_id,
+        query=q,
+        limit=limit,
+        record_type=record_type,
+        category_ids=category_id,
+        amount_min=amount_min,
+        amount_max=amount_max,
+        date_from=date_from,
+        date_to=date_to,
+    )
+    return encoded_response(encode_records(financial_records), response)
+
+
+@router.get("/changes", response_model=FinancialChanges)
+async def get_changes(
+    since: str | None = None,
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Returns user's records and categories changed since the cursor.
+
+    Deleted items are reported by ID. Without ``since`` nothing is
+    returned but the current cursor, to be taken before a full load.
+    """
+    if since is None:
+        last_change = await crud.get_last_change(
+            session=session, user_id=current_user_id
+        )
+        return FinancialChanges(
+            records=[],
+            deleted_record_ids=[],
+            categories=[],
+            deleted_category_ids=[],
+            cursor=encode_changes_cursor(last_change or EPOCH),
+        )
+
+    since_time = decode_changes_cursor(since)
+    financial_records = await crud.get_financial_records_changed_since(
+        session=session, user_id=current_user_id, since=since_time
+    )
+    categories = await categories_crud.get_categories_changed_since(
+        session=session, user_id=current_user_id, since=since_time
+    )
+    last_change = max(
+        (item.updated_at for item in (*financial_records, *categories)),
+        default=since_time,
+    )
+    return FinancialChanges(
+        records=[r for r in financial_records if r.deleted_at is None],
+        deleted_record_ids=[
+            r.id for r in financial_records if r.deleted_at is not None
+        ],
+        categories=[c for c in categories if c.deleted_at is None],
+        deleted_category_ids=[
+            c.id for c in categories if c.deleted_at is not None
+        ],
+        cursor=encode_changes_cursor(last_change),
+    )
+
+
+@router.get(
+    "/summary",
+    response_model=FinancialSummary,
+    dependencies=[Depends(check_data_version)],
+)
+async def get_financial_summary(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_id: list[int] | None = Query(None),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Returns totals of user's records aggregated in the database."""
+    return await crud.get_financial_summary(
+        session=session,
+        user_id=current_user_id,
+        date_from=date_from,
+        date_to=date_to,
+        category_ids=category_id,
+    )
+
+
+@router.get(
+    "/summary/monthly",
+    response_model=list[MonthlyTotal],
+    dependencies=[Depends(check_data_version)],
+)
+async def get_monthly_totals(
+    month_from: str | None = Query(None, pattern=MONTH_PATTERN),
+    month_to: str | None = Query(None, pattern=MONTH_PATTERN),
+    category_id: list[int] | None = Query(None),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Returns user's monthly totals per category from the rollup table."""
+    return await crud.get_monthly_totals(
+        session=session,
+        user_id=current_user_id,
+        month_from=month_from,
+        month_to=month_to,
+        category_ids=category_id,
+    )
+
+
+@router.get("/export")
+async def export_financial_records(
+    request: Request,
+    export_format: Literal["csv", "ndjson", "arrow", "msgpack"] | None = Query(
+        None, alias="format"
+    ),
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_id: list[int] | None = Query(None),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Streams user's records in date order as a file.
+
+    The file is CSV, NDJSON, Arrow IPC or MessagePack. Without
+    ``format`` it is picked by Accept, and any type gets CSV. Rows are
+    sent as they are read from the database, so the first bytes go out
+    before the whole history is loaded.
+    """
+    if export_format is None:
+        media_type = negotiate_media_type(
+            request.headers.get("Accept"),
+            list(exporters.EXPORT_FORMATS),
+        )
+        if media_type is None:
+            raise HTTPException(
+                status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                detail="Records are exported as "
+                f"{', '.join(exporters.EXPORT_FORMATS)}",
+            )
+        export_format = exporters.EXPORT_FORMATS[media_type]
+    return StreamingResponse(
+        exporters.stream_export(
+            partial(
+                db_helper.read_router.session,
+                use_primary=reads_from_primary(request),
+            ),
+            export_format,
+            user_id=current_user_id,
+            date_from=date_from,
+            date_to=date_to,
+            category_ids=category_id,
+        ),
+        media_type=exporters.EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="financial_records.{export_format}"'
+            )
+        },
     )
 
 
 @router.post("/", response_model=FinancialRecord)
 async def create_financial_record(
     financial_record_in: FinancialRecordCreate,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Creates a new financial record for the user."""
-    return await crud.create_financial_record(
-        session=session,
+    return await db_helper.writer.run(
+        crud.create_financial_record,
         financial_record_in=financial_record_in,
         user_id=current_user_id,
     )
 
 
+@router.post("/bulk", response_model=FinancialRecordBulkCreated)
+async def create_financial_records_bulk(
+    financial_records_in: Annotated[
+        list[FinancialRecordCreate], MinLen(1), MaxLen(MAX_BULK_RECORDS)
+    ],
+    current_user_id: int = Depends(get_current_user),
+):
+    """Creates many financial records for the user in one transaction."""
+    try:
+        ids = await db_helper.writer.run(
+            crud.create_financial_records_bulk,
+            financial_records_in=financial_records_in,
+            user_id=current_user_id,
+        )
+    except crud.UnknownCategoriesError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
+    return FinancialRecordBulkCreated(ids=ids)
+
+
+@router.post("/import")
+async def import_financial_records(
+    file: UploadFile,
+    category_id: int | None = Form(None),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
+    current_user_id: int = Depends(get_current_user),
+):
+    """Imports a CSV or OFX bank statement in chunks.
+
+    Progress of every chunk, with the rows that could not be imported, is
+    streamed back as NDJSON. Rows without a category go to ``category_id``
+    or to the user's "Other" category.
+    """
+    statement_format = importers.detect_format(file.filename)
+    if statement_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only .csv and .ofx statements are supported",
+        )
+
+    categories = {
+        category.name.strip().lower(): category.id
+        for category in await categories_crud.get_categories(
+            session=session, user_id=current_user_id
+        )
+    }
+    if category_id is None:
+        category_id = categories.get("other")
+    elif category_id not in categories.values():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown categories: [{category_id}]",
+        )
+
+    spooled = await importers.spool_upload(file)
+    return StreamingResponse(
+        importers.stream_import_ndjson(
+            db_helper.writer,
+            spooled,
+            statement_format=statement_format,
+            user_id=current_user_id,
+            categories=categories,
+            default_category_id=category_id,
+        ),
+        media_type="application/x-ndjson",
+    )
+
+
+async def record_not_changed(
+    financial_record_id: int, user_id: int
+) -> HTTPException:
+    """Returns the error of an update or delete that found no record.
+
+    Archived records are still listed but read-only, which is answered
+    with 409 rather than 404.
+    """
+    async with db_helper.read_router.session(use_primary=True) as session:
+        archived = await crud.get_archived_record(
+            session, financial_record_id=financial_record_id, user_id=user_id
+        )
+    if archived is not None:
+        return HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Financial record {financial_record_id} is archived",
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail=f"Financial record {financial_record_id} not found",
+    )
+
+
 @router.get("/{financial_record_id}", response_model=FinancialRecord)
 async def get_financial_record(
     financial_record_id: int,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
+    session: AsyncSession = Depends(db_helper.read_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
-    """Returns financial record if it belongs to the user."""
+    """Returns financial record if it belongs to the user.
+
+    Records moved to the archive are read from there.
+    """
     financial_record = await crud.get_financial_record(
         session=session,
         financial_record_id=financial_record_id,
         user_id=current_user_id,
+    ) or await crud.get_archived_record(
+        session=session,
+        financial_record_id=financial_record_id,
+        user_id=current_user_id,
     )
     if financial_record:
         return financial_record
@@ -72,54 +425,38 @@ async def get_financial_record(
 async def update_financial_record(
     financial_record_id: int,
     financial_record_update: FinancialRecordUpdate,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Completely updates financial record that belongs to the user."""
-    financial_record = await crud.get_financial_record(
-        session=session,
+    found = await db_helper.writer.run(
+        crud.update_financial_record,
         financial_record_id=financial_record_id,
         user_id=current_user_id,
+        financial_record_update=financial_record_update,
     )
+    if found:
+        return None
 
-    if financial_record:
-        return await crud.update_financial_record(
-            session=session,
-            financial_record=financial_record,
-            financial_record_update=financial_record_update,
-        )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Financial record {financial_record_id} not found",
-    )
+    raise await record_not_changed(financial_record_id, current_user_id)
 
 
 @router.patch("/{financial_record_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def update_financial_record_partial(
     financial_record_id: int,
     financial_record_update: FinancialRecordUpdatePartial,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Partially updates financial record that belongs to the user."""
-    financial_record = await crud.get_financial_record(
-        session=session,
+    found = await db_helper.writer.run(
+        crud.update_financial_record_partial,
         financial_record_id=financial_record_id,
         user_id=current_user_id,
+        financial_record_update=financial_record_update,
     )
+    if found:
+        return None
 
-    if financial_record:
-        return await crud.update_financial_record_partial(
-            session=session,
-            financial_record=financial_record,
-            financial_record_update=financial_record_update,
-        )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Financial record {financial_record_id} not found",
-    )
+    raise await record_not_changed(financial_record_id, current_user_id)
 
 
 @router.delete(
@@ -127,25 +464,18 @@ async def update_financial_record_partial(
 )
 async def delete_financial_record(
     financial_record_id: int,
-    session: AsyncSession = Depends(db_helper.scoped_session_dependency),
     current_user_id: int = Depends(get_current_user),
 ):
     """Deletes financial record that belongs to the user."""
-    financial_record = await crud.get_financial_record(
-        session=session,
+    found = await db_helper.writer.run(
+        crud.delete_financial_record,
         financial_record_id=financial_record_id,
         user_id=current_user_id,
     )
+    if found:
+        return None
 
-    if financial_record:
-        return await crud.delete_financial_record(
-            session=session, financial_record=financial_record
-        )
-
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Financial record {financial_record_id} not found",
-    )
+    raise await record_not_changed(financial_record_id, current_user_id)
 
 
 @router.post("/generate-pdf/")
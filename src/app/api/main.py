@@ -1,19 +1,35 @@
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.users.jwt_signer import get_signer
+from app.api.users.password_pool import password_pool
+from app.redis.cache import cache
+from app.redis.redis_helper import redis_helper
 from src.app.api.categories.views import router as categories_router
 from src.app.api.financial_records.views import (
     router as financial_records_router,
 )
+from src.app.api.metrics import router as metrics_router
 from src.app.api.users.views import router as user_router
+from src.app.database.db_helper import db_helper
+from src.app.database.routing import stick_to_primary
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Parse the JWT keys once, before the first request needs them.
+    get_signer()
+    redis_helper.connect()
+    await cache.start()
+    db_helper.writer.start()
     yield
+    await db_helper.writer.stop()
+    password_pool.shutdown()
+    await cache.stop()
+    await redis_helper.close()
 
 
 app = FastAPI(lifespan=lifespan, debug=True)
@@ -27,9 +43,23 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    """Sends client's reads to the primary for a while after it writes."""
+    response = await call_next(request)
+    if (
+        db_helper.read_router.replicas
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        stick_to_primary(response, db_helper.read_your_writes_seconds)
+    return response
+
+
 app.include_router(user_router)
 app.include_router(financial_records_router)
 app.include_router(categories_router)
+app.include_router(metrics_router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from app.api.users.claims_cache import claims_cache
+from app.api.users.password_pool import password_pool
+from app.redis.cache import cache
+from app.redis.redis_helper import redis_helper
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics")
+async def get_metrics() -> dict:
+    """Returns counters of this worker's caches, pools and Redis client."""
+    return {
+        "claims_cache": claims_cache.snapshot(),
+        "password_pool": password_pool.snapshot(),
+        "redis": redis_helper.snapshot(),
+        "cache": cache.snapshot(),
+    }
@@ -0,0 +1,129 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import event
+
+from app.config import settings
+from app.database.models import User
+
+
+class CachedClaims(NamedTuple):
+    """Claims of a verified token whose user was found."""
+
+    user_id: int
+    username: str
+    expires_at: float
+
+
+class ClaimsCache:
+    """Bounded LRU cache of verified access tokens.
+
+    Entries are keyed by the token's digest, so tokens are not kept in
+    memory, and live for ``ttl`` seconds at most, never past the token's
+    own expiry. The cache is per process: logout and user deletion drop
+    entries here, and other workers forget them within ``ttl``.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        """Creates an empty cache of up to maxsize tokens."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, CachedClaims] = OrderedDict()
+        self._user_keys: dict[int, set[bytes]] = {}
+
+    @staticmethod
+    def _key(token: str | bytes) -> bytes:
+        """Returns the digest the token is cached under."""
+        if isinstance(token, str):
+            token = token.encode()
+        return hashlib.blake2b(token, digest_size=16).digest()
+
+    def get(self, token: str | bytes) -> CachedClaims | None:
+        """Returns cached claims of the token, counting hits and misses."""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None or entry.expires_at <= time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(
+        self,
+        token: str | bytes,
+        user_id: int,
+        username: str,
+        exp: float | None = None,
+    ) -> None:
+        """Caches claims of a verified token of an existing user.
+
+        ``exp`` is the token's expiry as a Unix timestamp.
+        """
+        if self.maxsize <= 0:
+            return
+        now = time.monotonic()
+        expires_at = now + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, now + exp - time.time())
+        key = self._key(token)
+        self._remove(key)
+        self._entries[key] = CachedClaims(user_id, username, expires_at)
+        self._user_keys.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.maxsize:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate(self, token: str | bytes) -> None:
+        """Forgets the token, e.g. on logout."""
+        self._remove(self._key(token))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Forgets all tokens of the user."""
+        for key in self._user_keys.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Forgets all tokens."""
+        self._entries.clear()
+        self._user_keys.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        """Returns size and hit counters of the cache, e.g. for metrics."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        """Returns the number of cached tokens."""
+        return len(self._entries)
+
+    def _remove(self, key: bytes) -> None:
+        """Drops the entry of the key, and the key from its user's set."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._user_keys.get(entry.user_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._user_keys[entry.user_id]
+
+
+claims_cache = ClaimsCache(
+    maxsize=settings.claims_cache.maxsize,
+    ttl=settings.claims_cache.ttl_seconds,
+)
+
+
+@event.listens_for(User, "after_delete")
+def _forget_deleted_user(mapper, connection, target: User) -> None:
+    """Drops cached tokens of a user deleted through the ORM."""
+    claims_cache.invalidate_user(target.id)
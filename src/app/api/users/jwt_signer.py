@@ -0,0 +1,118 @@
+from functools import cache
+from pathlib import Path
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from cryptography.hazmat.primitives.serialization import (
+    load_pem_private_key,
+    load_pem_public_key,
+)
+
+from app.config import AuthJWT, settings
+
+HEADER_CACHE_SIZE = 64
+
+ALGORITHMS = {
+    rsa.RSAPublicKey: "RS256",
+    ec.EllipticCurvePublicKey: "ES256",
+    ed25519.Ed25519PublicKey: "EdDSA",
+}
+
+
+def key_algorithm(public_key) -> str:
+    """Returns the JWT algorithm that goes with the public key."""
+    for key_type, algorithm in ALGORITHMS.items():
+        if isinstance(public_key, key_type):
+            if algorithm == "ES256" and public_key.curve.name != "secp256r1":
+                break
+            return algorithm
+    raise ValueError(f"Unsupported JWT key: {type(public_key).__name__}")
+
+
+class JWTSigner:
+    """Signs and verifies tokens with parsed keys.
+
+    Tokens are signed with the current key, whose ID goes into the ``kid``
+    header. They are verified with the key named by their ``kid`` and
+    only with that key's algorithm, so keys can be rotated by adding the
+    new key and keeping the old public keys until their tokens expire.
+    Tokens without ``kid`` are verified with the current key.
+    """
+
+    def __init__(self, private_key, key_id: str, public_keys: dict):
+        self.private_key = private_key
+        self.key_id = key_id
+        self.algorithm = key_algorithm(private_key.public_key())
+        self.public_keys = {
+            kid: (key, key_algorithm(key)) for kid, key in public_keys.items()
+        }
+        self.public_keys.setdefault(
+            key_id, (private_key.public_key(), self.algorithm)
+        )
+        self._header_keys: dict[str, tuple] = {}
+
+    @classmethod
+    def from_settings(cls, config: AuthJWT) -> "JWTSigner":
+        """Reads and parses the keys of the configuration."""
+        private_key = load_pem_private_key(
+            config.private_key_path.read_bytes(), password=None
+        )
+        paths: dict[str, Path] = {
+            **config.public_key_paths,
+            config.key_id: config.public_key_path,
+        }
+        signer = cls(
+            private_key,
+            config.key_id,
+            {
+                kid: load_pem_public_key(path.read_bytes())
+                for kid, path in paths.items()
+            },
+        )
+        if signer.algorithm != config.algorithm:
+            raise ValueError(
+                f"JWT key is for {signer.algorithm}, "
+                f"not {config.algorithm}"
+            )
+        return signer
+
+    def encode(self, payload: dict) -> str:
+        """Signs the payload with the current key."""
+        return jwt.encode(
+            payload,
+            self.private_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.key_id},
+        )
+
+    def decode(self, token: str | bytes) -> dict:
+        """Verifies the token with the key named by its ``kid``."""
+        public_key, algorithm = self._verification_key(token)
+        return jwt.decode(token, public_key, algorithms=[algorithm])
+
+    def _verification_key(self, token: str | bytes) -> tuple:
+        """Looks up the key of the token's header.
+
+        All tokens of a key share the header segment, so the key is
+        remembered by it instead of parsing the header every time.
+        """
+        if isinstance(token, bytes):
+            token = token.decode()
+        header = token.partition(".")[0]
+        entry = self._header_keys.get(header)
+        if entry is not None:
+            return entry
+        kid = jwt.get_unverified_header(token).get("kid", self.key_id)
+        try:
+            entry = self.public_keys[kid]
+        except (KeyError, TypeError):
+            raise jwt.InvalidTokenError(f"Unknown JWT key ID: {kid!r}")
+        if len(self._header_keys) < HEADER_CACHE_SIZE:
+            self._header_keys[header] = entry
+        return entry
+
+
+@cache
+def get_signer() -> JWTSigner:
+    """Returns the signer of the configured keys, parsed on first use."""
+    return JWTSigner.from_settings(settings.auth_jwt)
@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import suppress
+from typing import Any, Callable
+
+from app.config import settings
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the password pool has no room for another call."""
+
+
+class PasswordPool:
+    """Runs password hashing in a bounded thread pool.
+
+    bcrypt releases the GIL, so hashing in threads keeps the event loop
+    serving other requests. At most ``max_workers`` calls run at once and
+    ``max_queue`` more wait for a thread; further calls are rejected
+    instead of piling up behind a login burst.
+
+    A call stays in flight until its thread is done with it, even if the
+    caller gave up waiting. ``failed`` counts calls that raised or were
+    cancelled before they started.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        """Creates a pool whose threads are started on first use."""
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of admitted calls waiting for a thread."""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        """Runs ``function(*args)`` in the pool and returns its result."""
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise PasswordPoolSaturated
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password",
+            )
+        loop = asyncio.get_running_loop()
+        job = self._executor.submit(function, *args)
+        self.in_flight += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        job.add_done_callback(
+            lambda job: self._call_soon(loop, self._finished, job)
+        )
+        return await asyncio.wrap_future(job)
+
+    @staticmethod
+    def _call_soon(loop: asyncio.AbstractEventLoop, callback, *args):
+        """Schedules callback on the loop from a worker thread."""
+        with suppress(RuntimeError):  # The loop is already closed.
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _finished(self, job: Future) -> None:
+        """Counts a call its thread is done with, or that never started."""
+        self.in_flight -= 1
+        if job.cancelled() or job.exception() is not None:
+            self.failed += 1
+        else:
+            self.completed += 1
+
+    def snapshot(self) -> dict[str, int]:
+        """Returns the limits and counters of the pool, e.g. for metrics."""
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        """Waits for running calls and stops the threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_pool = PasswordPool(
+    max_workers=settings.password_pool.max_workers,
+    max_queue=settings.password_pool.max_queue,
+)
@@ -1,26 +1,103 @@
-from datetime import timedelta
+import time
 
 from app.redis.redis_helper import redis_helper
 
+MAX_FAILED_ATTEMPTS = 5
+FAILED_ATTEMPTS_TTL = 300
+LOCK_TTL = 300
+LOCKED = -1
+LOCAL_THROTTLE_PURGE_SIZE = 1024
 
-async def increment_failed_attempts(username: str) -> int:
-    """Tracks failed login attempts with automatic 5-min counter expiration."""
-    key = f"failed_attempts:{username}"
-    attempts = await redis_helper.redis_client.incr(key)
-    if attempts == 1:
-        await redis_helper.redis_client.expire(key, 300)
-    return attempts
+# KEYS: failed attempts counter, lock flag.
+# ARGV: max failed attempts, counter TTL, lock TTL.
+# Returns LOCKED when the account is already locked, otherwise the number
+# of failed attempts including this one, locking the account at the limit.
+FAILED_ATTEMPT_SCRIPT = """
+if redis.call("EXISTS", KEYS[2]) == 1 then
+    return -1
+end
+local attempts = redis.call("INCR", KEYS[1])
+if attempts == 1 then
+    redis.call("EXPIRE", KEYS[1], ARGV[2])
+end
+if attempts >= tonumber(ARGV[1]) then
+    redis.call("SET", KEYS[2], "true", "EX", ARGV[3])
+end
+return attempts
+"""
 
 
-async def lock_account(username: str) -> None:
-    """Temporarily locks user account after repeated failed login attempts."""
-    await redis_helper.redis_client.set(
-        f"locked:{username}", "true", ex=timedelta(minutes=5)
+class LocalThrottle:
+    """Process-local copy of the throttling script for Redis outages.
+
+    Counters and locks expire like their Redis keys. Each worker counts
+    on its own, so the limit is per process while Redis is down.
+    """
+
+    def __init__(self):
+        self.attempts: dict[str, tuple[int, float]] = {}
+        self.locks: dict[str, float] = {}
+        self._purge_at = LOCAL_THROTTLE_PURGE_SIZE
+
+    def is_locked(self, username: str) -> bool:
+        """Checks if account is locked in this process."""
+        return self.locks.get(username, 0) > time.monotonic()
+
+    def record_failed_attempt(self, username: str) -> int:
+        """Counts a failed login like FAILED_ATTEMPT_SCRIPT does."""
+        now = time.monotonic()
+        if self.is_locked(username):
+            return LOCKED
+        attempts, expires_at = self.attempts.get(username, (0, 0))
+        if expires_at <= now:
+            attempts, expires_at = 0, now + FAILED_ATTEMPTS_TTL
+            if len(self.attempts) >= self._purge_at:
+                self._purge(now)
+        attempts += 1
+        self.attempts[username] = (attempts, expires_at)
+        if attempts >= MAX_FAILED_ATTEMPTS:
+            self.locks[username] = now + LOCK_TTL
+        return attempts
+
+    def _purge(self, now: float) -> None:
+        """Drops expired counters and locks."""
+        self.attempts = {k: v for k, v in self.attempts.items() if v[1] > now}
+        self.locks = {k: v for k, v in self.locks.items() if v > now}
+        self._purge_at = max(LOCAL_THROTTLE_PURGE_SIZE, 2 * len(self.attempts))
+
+
+local_throttle = LocalThrottle()
+
+
+async def record_failed_attempt(username: str) -> int:
+    """Counts a failed login and locks the account at the limit atomically.
+
+    Returns the number of failed attempts in the 5-min window, or LOCKED
+    if a concurrent attempt has already locked the account. Counts in
+    this process while Redis is unavailable.
+    """
+
+    async def run_script(client):
+        script = redis_helper.script(client, FAILED_ATTEMPT_SCRIPT)
+        return await script(
+            keys=[f"failed_attempts:{username}", f"locked:{username}"],
+            args=[MAX_FAILED_ATTEMPTS, FAILED_ATTEMPTS_TTL, LOCK_TTL],
+        )
+
+    return await redis_helper.execute(
+        run_script, lambda: local_throttle.record_failed_attempt(username)
     )
 
 
 async def is_account_locked(username: str) -> bool:
-    """Checks if account is currently locked."""
-    return (
-        await redis_helper.redis_client.get(f"locked:{username}") is not None
+    """Checks if account is currently locked.
+
+    Locks made in this process during a Redis outage count as well.
+    """
+    if local_throttle.is_locked(username):
+        return True
+    return bool(
+        await redis_helper.execute(
+            lambda client: client.exists(f"locked:{username}"), lambda: False
+        )
     )
@@ -1,17 +1,16 @@
 from datetime import datetime, timedelta
 
 import bcrypt
-import jwt
 
+from app.api.users.jwt_signer import JWTSigner, get_signer
 from app.config import settings
 
 
 def encode_jwt(
     payload: dict,
-    private_key: str = settings.auth_jwt.private_key_path.read_text(),
-    algorithm: str = settings.auth_jwt.algorithm,
     expire_minutes: int = settings.auth_jwt.access_token_expire_minutes,
     expire_timedelta: timedelta | None = None,
+    signer: JWTSigner | None = None,
 ) -> str:
     """Encodes JWT token."""
     to_encode = payload.copy()
@@ -24,26 +23,15 @@ def encode_jwt(
         exp=expire,
         iat=now,
     )
-    encoded = jwt.encode(
-        to_encode,
-        private_key,
-        algorithm=algorithm,
-    )
-    return encoded
+    return (signer or get_signer()).encode(to_encode)
 
 
 def decode_jwt(
     token: str | bytes,
-    public_key: str = settings.auth_jwt.public_key_path.read_text(),
-    algorithm: str = settings.auth_jwt.algorithm,
+    signer: JWTSigner | None = None,
 ) -> dict:
     """Decodes and verifies JWT token."""
-    decoded = jwt.decode(
-        token,
-        public_key,
-        algorithms=[algorithm],
-    )
-    return decoded
+    return (signer or get_signer()).decode(token)
 
 
 def hash_password(
@@ -1,20 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    status,
+    Request,
+    Response,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.categories.crud import invalidate_categories
 from app.api.users import crud
+from app.api.users.claims_cache import claims_cache
 from app.api.users.crud import get_user_by_username
+from app.api.users.password_pool import PasswordPoolSaturated, password_pool
 from app.api.users.redis_utils import (
+    LOCKED,
     is_account_locked,
-    increment_failed_attempts,
-    lock_account,
+    record_failed_attempt,
 )
 from app.api.users.schemas import UserRegister, UserCreate, LoginRequest
 from app.api.users.utils import hash_password, validate_password, encode_jwt
+from app.config import settings
 from src.app.database.db_helper import db_helper
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
+async def run_in_password_pool(function, *args):
+    """Runs password hashing off the event loop, 503 when saturated."""
+    try:
+        return await password_pool.run(function, *args)
+    except PasswordPoolSaturated:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many sign-ins in progress. Try again later.",
+            headers={
+                "Retry-After": str(settings.password_pool.retry_after_seconds)
+            },
+        )
+
+
 @router.post("/register/")
 async def register_user(
     user_in: UserRegister,
@@ -26,12 +51,16 @@ async def register_user(
     if existing_users:
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    hashed_password = hash_password(user_in.password)
+    hashed_password = await run_in_password_pool(
+        hash_password, user_in.password
+    )
 
     new_user = UserCreate(
         username=user_in.username, hashed_password=hashed_password
     )
-    await crud.create_user(session, new_user)
+    user = await db_helper.writer.run(crud.create_user, new_user)
+    # A user of a reused ID must not see the categories cached for it.
+    await invalidate_categories(user.id)
 
     return {"message": "You successfully registered!"}
 
@@ -45,20 +74,22 @@ async def login_user(
     """Authenticates user credentials."""
     user = await crud.get_user_by_username(session, login_data.username)
 
+    locked = HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Account temporarily locked due to "
+        "too many failed login attempts. Try again later.",
+    )
+    # Checked before the password on purpose: locked accounts are refused
+    # even with the right password, without spending a bcrypt hash on
+    # them. A failed login then makes a second round trip to record it.
     if await is_account_locked(login_data.username):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Account temporarily locked due to "
-            "too many failed login attempts. Try again later.",
-        )
+        raise locked
 
-    if not user or not validate_password(
-        login_data.password, user.hashed_password
+    if not user or not await run_in_password_pool(
+        validate_password, login_data.password, user.hashed_password
     ):
-        attempts = await increment_failed_attempts(login_data.username)
-
-        if attempts >= 5:
-            await lock_account(login_data.username)
+        if await record_failed_attempt(login_data.username) == LOCKED:
+            raise locked
 
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -81,7 +112,10 @@ async def login_user(
 
 
 @router.post("/logout/")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
     """Terminates user session."""
+    token = request.cookies.get("access_token")
+    if token:
+        claims_cache.invalidate(token)
     response.delete_cookie("access_token")
     return {"message": "Logged out"}
@@ -1,33 +1,138 @@
-from pydantic_settings import BaseSettings
+import os
+from typing import Literal
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
 
 class AuthJWT(BaseSettings):
-    """JWT authentication configuration."""
+    """JWT authentication configuration.
+
+    Tokens are signed with the key pair ``key_id`` using ``algorithm``
+    (RS256, ES256 or EdDSA, matching the key type). ``public_key_paths``
+    maps IDs of previous keys to their public keys, so their tokens stay
+    valid after rotation.
+    """
 
     private_key_path: Path = BASE_DIR / "certs/jwt-private.pem"
     public_key_path: Path = BASE_DIR / "certs/jwt-public.pem"
+    public_key_paths: dict[str, Path] = {}
+    key_id: str = "1"
     cert_path: Path = BASE_DIR / "certs/cert.pem"
-    algorithm: str = "RS256"
+    algorithm: Literal["RS256", "ES256", "EdDSA"] = "RS256"
     access_token_expire_minutes: int = 10080
 
 
+class ClaimsCacheSettings(BaseSettings):
+    """In-process cache of verified access tokens.
+
+    Values can be overridden with ``CLAIMS_CACHE_*`` variables; a
+    ``maxsize`` of 0 disables the cache.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="claims_cache_")
+
+    maxsize: int = 10000
+    ttl_seconds: float = 60.0
+
+
+class PasswordPoolSettings(BaseSettings):
+    """Thread pool hashing and checking passwords off the event loop.
+
+    By default one core is left to the event loop. Values can be
+    overridden with ``PASSWORD_POOL_*`` variables.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="password_pool_")
+
+    max_workers: int = max(1, (os.cpu_count() or 2) - 1)
+    max_queue: int = 32
+    retry_after_seconds: int = 1
+
+
+class SqlitePragmas(BaseSettings):
+    """SQLite tuning profile applied to every new database connection.
+
+    Each field is set with ``PRAGMA <name> = <value>``; ``None`` keeps the
+    SQLite default. Values can be overridden with ``SQLITE_*`` variables.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="sqlite_")
+
+    journal_mode: str | None = "WAL"
+    synchronous: str | None = "NORMAL"
+    cache_size: int | None = -64000
+    mmap_size: int | None = 256 * 1024 * 1024
+    temp_store: str | None = "MEMORY"
+    busy_timeout: int | None = 5000
+
+    def statements(self) -> list[str]:
+        """Returns PRAGMA statements of the fields that are set."""
+        return [
+            f"PRAGMA {name} = {value}"
+            for name, value in self.model_dump().items()
+            if value is not None
+        ]
+
+
 class DbSettings(BaseSettings):
     """Database connection configuration."""
 
     db_url: str = f"sqlite+aiosqlite:///{BASE_DIR}/db.sqlite3"
     db_echo: bool = False
+    sqlite_pragmas: SqlitePragmas = SqlitePragmas()
+    db_replica_urls: list[str] = []
+    db_replica_selection: Literal["round_robin", "least_busy"] = "round_robin"
+    db_read_your_writes_seconds: float = 5.0
+    db_shard_urls: list[str] = []
+
+
+class ArchiveSettings(BaseSettings):
+    """Cold storage of old financial records in Parquet files."""
+
+    model_config = SettingsConfigDict(env_prefix="archive_")
+
+    dir: Path = BASE_DIR / "archive"
+    after_days: int = 730
+    partition_size: int = 100000
+
+
+class CacheSettings(BaseSettings):
+    """Two-tier read cache: per-worker memory (L1) over Redis (L2).
+
+    Values can be overridden with ``CACHE_*`` variables; an
+    ``l1_maxsize`` of 0 leaves only the Redis tier.
+    """
+
+    model_config = SettingsConfigDict(env_prefix="cache_")
+
+    l1_maxsize: int = 10000
+    l1_ttl_seconds: float = 30.0
+    l2_ttl_seconds: int = 300
+    key_prefix: str = "cache:"
+    channel: str = "cache:invalidate"
+    resubscribe_seconds: float = 1.0
 
 
 class RedisSettings(BaseSettings):
-    """Redis server connection settings."""
+    """Redis server connection settings.
+
+    Commands wait at most ``socket_timeout`` seconds for a connection
+    from the pool and for the answer. After ``breaker_failure_threshold``
+    failures in a row, Redis is not called for ``breaker_reset_seconds``.
+    """
 
     host: str = "localhost"
     port: int = 6379
     db: int = 0
     decode_responses: bool = True
+    max_connections: int = 50
+    socket_timeout: float = 0.25
+    socket_connect_timeout: float = 0.25
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 10.0
 
 
 class APIEndpoints(BaseSettings):
@@ -71,8 +176,12 @@ class Settings(BaseSettings):
 
     api_endpoints: APIEndpoints = APIEndpoints()
     auth_jwt: AuthJWT = AuthJWT()
+    claims_cache: ClaimsCacheSettings = ClaimsCacheSettings()
+    password_pool: PasswordPoolSettings = PasswordPoolSettings()
     db: DbSettings = DbSettings()
+    archive: ArchiveSettings = ArchiveSettings()
     redis: RedisSettings = RedisSettings()
+    cache: CacheSettings = CacheSettings()
 
 
 settings = Settings()
@@ -0,0 +1,493 @@
+import asyncio
+import heapq
+import uuid
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, NamedTuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Select, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.database.models import ArchivedPartition, FinancialRecord
+from app.database.sharding import ShardedWriteQueue
+from app.database.writer import WriteQueue
+
+ARCHIVE_SCHEMA = pa.schema(
+    [
+        ("id", pa.int64()),
+        ("type", pa.string()),
+        ("description", pa.string()),
+        ("amount", pa.float64()),
+        ("date", pa.timestamp("us")),
+        ("category_id", pa.int64()),
+    ]
+)
+ARCHIVE_ROW_GROUP_SIZE = 10000
+ARCHIVE_COMPRESSION = "zstd"
+ARCHIVE_ATTEMPTS = 3
+
+
+class ArchivedRow(NamedTuple):
+    """Archived record in the shape of an exported row."""
+
+    id: int
+    date: datetime
+    type: str
+    category_id: int
+    category_name: str | None
+    description: str
+    amount: float
+
+
+def _archivable(user_id: int, cutoff: datetime, limit: int) -> Select:
+    """Selects IDs of user's oldest live records dated before cutoff."""
+    table = FinancialRecord.__table__
+    return (
+        select(table.c.id)
+        .where(
+            table.c.user_id == user_id,
+            table.c.deleted_at.is_(None),
+            table.c.date < cutoff,
+        )
+        .order_by(table.c.date, table.c.id)
+        .limit(limit)
+    )
+
+
+def _write_partition(rows: list, path: Path) -> None:
+    """Writes records to a Parquet file that appears only when complete."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.tmp")
+    columns = list(zip(*rows))[: len(ARCHIVE_SCHEMA)]
+    columns[1] = [getattr(value, "value", value) for value in columns[1]]
+    try:
+        pq.write_table(
+            pa.Table.from_arrays(
+                [pa.array(c, f.type) for c, f in zip(columns, ARCHIVE_SCHEMA)],
+                schema=ARCHIVE_SCHEMA,
+            ),
+            temporary,
+            row_group_size=ARCHIVE_ROW_GROUP_SIZE,
+            compression=ARCHIVE_COMPRESSION,
+        )
+        temporary.replace(path)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+
+
+async def _move_partition(
+    session: AsyncSession,
+    user_id: int,
+    cutoff: datetime,
+    versions: list[tuple[int, datetime]],
+    path: str,
+    first_date: datetime,
+    last_date: datetime,
+) -> bool:
+    """Lists a written file and deletes its records from the hot table.
+
+    ``versions`` are the ``(id, updated_at)`` of the records in the file.
+    If they are no longer the ones to archive, nothing is changed and
+    False is returned.
+    """
+    table = FinancialRecord.__table__
+    archived = _archivable(user_id, cutoff, len(versions))
+    result = await session.execute(
+        select(table.c.id, table.c.updated_at)
+        .where(table.c.id.in_(archived))
+        .order_by(table.c.date, table.c.id)
+    )
+    if list(map(tuple, result.all())) != versions:
+        return False
+    session.add(
+        ArchivedPartition(
+            user_id=user_id,
+            path=path,
+            records=len(versions),
+            first_date=first_date,
+            last_date=last_date,
+        )
+    )
+    await session.execute(delete(table).where(table.c.id.in_(archived)))
+    await session.commit()
+    return True
+
+
+async def archive_records(
+    session_factory: async_sessionmaker[AsyncSession],
+    writer: WriteQueue | ShardedWriteQueue,
+    user_id: int,
+    cutoff: datetime,
+    limit: int,
+    archive_dir: Path | None = None,
+) -> int:
+    """Moves up to limit of user's records dated before cutoff to Parquet.
+
+    The oldest records are written to a new file in a thread, so the
+    writer only lists the file and deletes the records. If any of them
+    changed meanwhile, or the write fails, the file is removed; changed
+    records are read again up to ``ARCHIVE_ATTEMPTS`` times. Soft-deleted
+    records stay for syncing. Returns the number of archived records.
+    """
+    archive_dir = archive_dir or settings.archive.dir
+    table = FinancialRecord.__table__
+    for _ in range(ARCHIVE_ATTEMPTS):
+        async with session_factory() as session:
+            result = await session.execute(
+                select(
+                    table.c.id,
+                    table.c.type,
+                    table.c.description,
+                    table.c.amount,
+                    table.c.date,
+                    table.c.category_id,
+                    table.c.updated_at,
+                )
+                .where(table.c.id.in_(_archivable(user_id, cutoff, limit)))
+                .order_by(table.c.date, table.c.id)
+            )
+            rows = result.all()
+        if not rows:
+            return 0
+
+        relative_path = Path(str(user_id)) / f"{uuid.uuid4().hex}.parquet"
+        path = archive_dir / relative_path
+        await asyncio.to_thread(_write_partition, rows, path)
+        try:
+            moved = await writer.run(
+                _move_partition,
+                user_id=user_id,
+                cutoff=cutoff,
+                versions=[(row.id, row.updated_at) for row in rows],
+                path=relative_path.as_posix(),
+                first_date=rows[0].date,
+                last_date=rows[-1].date,
+            )
+        except Exception:
+            path.unlink(missing_ok=True)
+            raise
+        if moved:
+            return len(rows)
+        path.unlink(missing_ok=True)
+    return 0
+
+
+async def get_partitions(
+    session: AsyncSession, user_id: int
+) -> list[ArchivedPartition]:
+    """Lists user's archived partitions in the order they were made."""
+    result = await session.execute(
+        select(ArchivedPartition)
+        .where(ArchivedPartition.user_id == user_id)
+        .order_by(ArchivedPartition.id)
+    )
+    return list(result.scalars().all())
+
+
+def partition_paths(
+    partitions: list[ArchivedPartition],
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    archive_dir: Path | None = None,
+) -> list[str]:
+    """Returns files of partitions that can hold records in the range."""
+    archive_dir = archive_dir or settings.archive.dir
+    return [
+        str(archive_dir / partition.path)
+        for partition in partitions
+        if (date_from is None or partition.last_date >= date_from)
+        and (date_to is None or partition.first_date < date_to)
+    ]
+
+
+def _filter(
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_ids: list[int] | None = None,
+    after: tuple[datetime, int] | None = None,
+) -> ds.Expression:
+    """Builds the dataset filter matching the reads of the hot table."""
+    date = pc.field("date")
+    expression = pc.scalar(True)
+    if date_from is not None:
+        expression &= date >= pa.scalar(date_from, pa.timestamp("us"))
+    if date_to is not None:
+        expression &= date < pa.scalar(date_to, pa.timestamp("us"))
+    if category_ids:
+        expression &= pc.field("category_id").isin(category_ids)
+    if after is not None:
+        after_date = pa.scalar(after[0], pa.timestamp("us"))
+        expression &= (date > after_date) | (
+            (date == after_date) & (pc.field("id") > after[1])
+        )
+    return expression
+
+
+def _dataset(paths: list[str]) -> ds.Dataset:
+    return ds.dataset(paths, schema=ARCHIVE_SCHEMA, format="parquet")
+
+
+def _batches(
+    path: str,
+    expression: ds.Expression,
+    batch_size: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> Iterator[pa.RecordBatch]:
+    """Reads a file's matching rows in their stored order.
+
+    Row groups are read one at a time, and those whose date statistics
+    are outside the range are skipped.
+    """
+    parquet = pq.ParquetFile(path)
+    date_column = ARCHIVE_SCHEMA.get_field_index("date")
+    for index in range(parquet.num_row_groups):
+        dates = parquet.metadata.row_group(index).column(date_column)
+        if dates.statistics is not None and dates.statistics.has_min_max:
+            if date_from is not None and dates.statistics.max < date_from:
+                continue
+            if date_to is not None and dates.statistics.min >= date_to:
+                continue
+        table = parquet.read_row_group(index).filter(expression)
+        yield from table.to_batches(max_chunksize=batch_size)
+
+
+def read_records(
+    paths: list[str],
+    limit: int | None = None,
+    after: tuple[datetime, int] | None = None,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+) -> list[dict]:
+    """Reads archived records sorted by date and ID, like the list query.
+
+    Files are sorted on write, so only their first ``limit`` matching
+    rows are read.
+    """
+    expression = _filter(date_from, date_to, after=after)
+    batches = []
+    for path in paths:
+        read = 0
+        for batch in _batches(
+            path,
+            expression,
+            limit or ARCHIVE_ROW_GROUP_SIZE,
+            date_from=max(
+                filter(None, [date_from, after and after[0]]), default=None
+            ),
+            date_to=date_to,
+        ):
+            batches.append(batch)
+            read += batch.num_rows
+            if limit is not None and read >= limit:
+                break
+    if not batches:
+        return []
+    table = pa.Table.from_batches(batches, schema=ARCHIVE_SCHEMA)
+    table = table.sort_by([("date", "ascending"), ("id", "ascending")])
+    if limit is not None:
+        table = table.slice(0, limit)
+    return table.to_pylist()
+
+
+def read_record(paths: list[str], record_id: int) -> dict | None:
+    """Reads the archived record of the ID from any of the files."""
+    rows = (
+        _dataset(paths)
+        .to_table(filter=pc.field("id") == record_id)
+        .to_pylist()
+    )
+    return rows[0] if rows else None
+
+
+def uses_category(paths: list[str], category_id: int) -> bool:
+    """Tells whether any record in the files belongs to the category."""
+    return (
+        _dataset(paths).count_rows(
+            filter=pc.field("category_id") == category_id
+        )
+        > 0
+    )
+
+
+def summarize(
+    paths: list[str],
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_ids: list[int] | None = None,
+) -> dict[str, list[dict]]:
+    """Aggregates archived records by type, category and day."""
+    table = _dataset(paths).to_table(
+        columns=["type", "category_id", "amount", "date"],
+        filter=_filter(date_from, date_to, category_ids),
+    )
+    table = table.append_column(
+        "day", pc.strftime(table["date"], format="%Y-%m-%d")
+    )
+    aggregates = [("amount", "sum"), ("amount", "count")]
+    names = {"amount_sum": "amount", "amount_count": "count"}
+
+    def group_by(keys: list[str], with_count: bool = True) -> list[dict]:
+        grouped = table.group_by(keys).aggregate(
+            aggregates if with_count else aggregates[:1]
+        )
+        return [
+            {names.get(key, key): value for key, value in row.items()}
+            for row in grouped.to_pylist()
+        ]
+
+    return {
+        "by_type": group_by(["type"]),
+        "by_category": group_by(["category_id", "type"]),
+        "by_day": group_by(["day", "type"], with_count=False),
+    }
+
+
+def monthly_totals(paths: list[str]) -> list[dict]:
+    """Aggregates archived records by category, type and month."""
+    table = _dataset(paths).to_table(
+        columns=["type", "category_id", "amount", "date"]
+    )
+    table = table.append_column(
+        "month", pc.strftime(table["date"], format="%Y-%m")
+    )
+    grouped = table.group_by(["category_id", "type", "month"]).aggregate(
+        [("amount", "sum"), ("amount", "count")]
+    )
+    names = {"amount_sum": "amount", "amount_count": "count"}
+    return [
+        {names.get(key, key): value for key, value in row.items()}
+        for row in grouped.to_pylist()
+    ]
+
+
+def merge_totals(
+    rows: list, archived: list[dict], keys: list[str]
+) -> list[dict]:
+    """Adds archived totals to the hot ones with the same keys.
+
+    Rows are sorted by the typed key values, like ``ORDER BY`` of the hot
+    totals.
+    """
+    merged: dict[tuple, dict] = {}
+    for row in [*rows, *archived]:
+        row = dict(row)
+        row["type"] = getattr(row["type"], "value", row["type"])
+        key = tuple(row[k] for k in keys)
+        if key not in merged:
+            merged[key] = row
+            continue
+        for total in ("amount", "count"):
+            if total in row:
+                merged[key][total] += row[total]
+    return [merged[key] for key in sorted(merged)]
+
+
+def iter_rows(
+    paths: list[str],
+    category_names: dict[int, str],
+    batch_size: int,
+    date_from: datetime | None = None,
+    date_to: datetime | None = None,
+    category_ids: list[int] | None = None,
+) -> Iterator[list[ArchivedRow]]:
+    """Yields archived rows of all files in date order, batch by batch.
+
+    Every file is sorted on write, so the files are read one batch at a
+    time each and merged.
+    """
+    expression = _filter(date_from, date_to, category_ids)
+
+    def file_rows(path: str) -> Iterator[list[ArchivedRow]]:
+        for batch in _batches(
+            path, expression, batch_size, date_from, date_to
+        ):
+            columns = batch.to_pydict()
+            yield list(
+                map(
+                    ArchivedRow._make,
+                    zip(
+                        columns["id"],
+                        columns["date"],
+                        columns["type"],
+                        columns["category_id"],
+                        map(category_names.get, columns["category_id"]),
+                        columns["description"],
+                        columns["amount"],
+                    ),
+                )
+            )
+
+    if len(paths) == 1:
+        yield from file_rows(paths[0])
+        return
+
+    batch = []
+    for row in heapq.merge(
+        *(chain.from_iterable(file_rows(path)) for path in paths),
+        key=lambda row: (row.date, row.id),
+    ):
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def merge_sorted_batches(
+    left: AsyncIterator[list],
+    right: AsyncIterator[list],
+    key: Callable,
+    batch_size: int,
+) -> AsyncIterator[list]:
+    """Merges two streams of sorted batches into one of sorted batches.
+
+    A batch that ends before the other side's next row is taken whole,
+    so rows are compared one by one only where the streams interleave.
+    """
+
+    async def next_batch(batches: AsyncIterator[list]) -> list:
+        async for batch in batches:
+            if batch:
+                return batch
+        return []
+
+    merged = []
+    left_batch, right_batch = await next_batch(left), await next_batch(right)
+    while left_batch and right_batch:
+        if key(left_batch[-1]) <= key(right_batch[0]):
+            merged += left_batch
+            left_batch = await next_batch(left)
+        elif key(right_batch[-1]) < key(left_batch[0]):
+            merged += right_batch
+            right_batch = await next_batch(right)
+        else:
+            rows = sorted(left_batch + right_batch, key=key)
+            pivot = min(key(left_batch[-1]), key(right_batch[-1]))
+            done = [row for row in rows if key(row) <= pivot]
+            merged += done
+            left_batch = [r for r in left_batch if key(r) > pivot]
+            right_batch = [r for r in right_batch if key(r) > pivot]
+            left_batch = left_batch or await next_batch(left)
+            right_batch = right_batch or await next_batch(right)
+        while len(merged) >= batch_size:
+            yield merged[:batch_size]
+            merged = merged[batch_size:]
+
+    for batch, batches in ((left_batch, left), (right_batch, right)):
+        while batch:
+            merged += batch
+            while len(merged) >= batch_size:
+                yield merged[:batch_size]
+                merged = merged[batch_size:]
+            batch = await next_batch(batches)
+    if merged:
+        yield merged
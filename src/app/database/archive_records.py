@@ -0,0 +1,68 @@
+"""Moves financial records older than the cutoff to Parquet partitions.
+
+Usage: poetry run python -m app.database.archive_records
+    [--older-than-days N] [--partition-size N]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database.archive import archive_records
+from app.database.db_helper import db_helper
+from app.database.models import User, utcnow
+from app.database.sharding import current_user_id
+
+
+async def archive_user(
+    user_id: int, cutoff: datetime, partition_size: int
+) -> int:
+    """Archives user's old records partition by partition."""
+    token = current_user_id.set(user_id)
+    try:
+        total = 0
+        while archived := await archive_records(
+            db_helper.session_factory,
+            db_helper.writer,
+            user_id=user_id,
+            cutoff=cutoff,
+            limit=partition_size,
+        ):
+            total += archived
+        return total
+    finally:
+        current_user_id.reset(token)
+
+
+async def archive_all(older_than_days: int, partition_size: int) -> None:
+    """Archives old records of every user, deleting through the writer."""
+    cutoff = utcnow() - timedelta(days=older_than_days)
+    async with db_helper.session_factory() as session:
+        user_ids = (await session.execute(select(User.id))).scalars().all()
+    try:
+        for user_id in user_ids:
+            archived = await archive_user(user_id, cutoff, partition_size)
+            if archived:
+                print(f"user {user_id}: archived {archived} records")
+    finally:
+        await db_helper.dispose()
+
+
+def main() -> None:
+    """Archives records older than the cutoff of every user."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.archive.after_days
+    )
+    parser.add_argument(
+        "--partition-size", type=int, default=settings.archive.partition_size
+    )
+    args = parser.parse_args()
+    asyncio.run(archive_all(args.older_than_days, args.partition_size))
+
+
+if __name__ == "__main__":
+    main()
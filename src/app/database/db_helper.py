@@ -7,21 +7,195 @@ from sqlalchemy.ext.asyncio import (
 
 from asyncio import current_task
 
-from app.config import settings
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from fastapi import Request
+
+from app.config import SqlitePragmas, settings
+from app.database.routing import ReadRouter, ReplicaSelection
+from app.database.routing import reads_from_primary
+from app.database.sharding import (
+    PRIMARY_SHARD,
+    ShardedWriteQueue,
+    UserShardedSession,
+)
+from app.database.writer import WriteQueue
 
 
 class DatabaseHelper:
     """Helper class to manage database connections and sessions."""
 
-    def __init__(self, url: str, echo: bool = False):
-        self.engine = create_async_engine(url=url, echo=echo)
-        self.session_factory = async_sessionmaker(
-            bind=self.engine,
+    def __init__(
+        self,
+        url: str,
+        echo: bool = False,
+        sqlite_pragmas: SqlitePragmas | None = None,
+        replica_urls: list[str] | None = None,
+        replica_selection: ReplicaSelection = "round_robin",
+        read_your_writes_seconds: float = 5.0,
+        shard_urls: list[str] | None = None,
+    ):
+        if replica_urls and shard_urls:
+            raise ValueError("Read replicas cannot be used with sharding")
+        pragmas = sqlite_pragmas.statements() if sqlite_pragmas else []
+        read_pragmas = pragmas + ["PRAGMA query_only = ON"]
+        shard_urls = shard_urls or []
+
+        self.engine = self._create_engine(url, echo, pragmas)
+        self.shard_engines = [
+            self._create_engine(shard_url, echo, pragmas)
+            for shard_url in shard_urls
+        ]
+        self.session_factory = self._create_session_factory(
+            self.engine, self.shard_engines
+        )
+
+        self.read_engine = self._create_engine(url, echo, read_pragmas)
+        self.read_shard_engines = [
+            self._create_engine(shard_url, echo, read_pragmas)
+            for shard_url in shard_urls
+        ]
+        self.read_session_factory = self._create_session_factory(
+            self.read_engine, self.read_shard_engines
+        )
+        self.replica_engines = [
+            self._create_engine(replica_url, echo, read_pragmas)
+            for replica_url in replica_urls or []
+        ]
+        self.read_router = ReadRouter(
+            self.read_session_factory,
+            [self._create_session_factory(e) for e in self.replica_engines],
+            selection=replica_selection,
+        )
+        self.read_your_writes_seconds = read_your_writes_seconds
+
+        self.write_engine = self._create_write_engine(url, echo, pragmas)
+        # With shards, every writer queue has single-connection engines of
+        # its own, so no queue waits for a connection another one holds.
+        self.queue_engines: list[AsyncEngine] = []
+        if not shard_urls:
+            self.writer = WriteQueue(
+                self._create_session_factory(self.write_engine)
+            )
+        else:
+            queues = {}
+            for shard_id in [PRIMARY_SHARD, *map(str, range(len(shard_urls)))]:
+                if shard_id == PRIMARY_SHARD:
+                    engine, info = self.write_engine, {}
+                else:
+                    engine = self._create_write_engine(url, echo, pragmas)
+                    info = {"shard_id": shard_id}
+                    self.queue_engines.append(engine)
+                shard_engines = [
+                    self._create_write_engine(shard_url, echo, pragmas)
+                    for shard_url in shard_urls
+                ]
+                self.queue_engines += shard_engines
+                queues[shard_id] = WriteQueue(
+                    self._create_session_factory(
+                        engine, shard_engines, info=info
+                    )
+                )
+            self.writer = ShardedWriteQueue(queues)
+
+    @classmethod
+    def _create_engine(
+        cls, url: str, echo: bool, pragmas: list[str], **kwargs
+    ) -> AsyncEngine:
+        """Creates engine that runs the PRAGMAs on every SQLite connection."""
+        engine = create_async_engine(url=url, echo=echo, **kwargs)
+        if pragmas and engine.dialect.name == "sqlite":
+            event.listen(
+                engine.sync_engine, "connect", cls._pragma_listener(pragmas)
+            )
+        return engine
+
+    @classmethod
+    def _create_write_engine(
+        cls, url: str, echo: bool, pragmas: list[str]
+    ) -> AsyncEngine:
+        """Creates single-connection engine for the writer task."""
+        engine = cls._create_engine(
+            url, echo, pragmas, pool_size=1, max_overflow=0
+        )
+        if engine.dialect.name == "sqlite":
+            event.listen(
+                engine.sync_engine,
+                "connect",
+                cls._disable_driver_transactions,
+            )
+            event.listen(engine.sync_engine, "begin", cls._begin_immediate)
+        return engine
+
+    @staticmethod
+    def _create_session_factory(
+        engine: AsyncEngine,
+        shard_engines: list[AsyncEngine] | None = None,
+        **kwargs,
+    ) -> async_sessionmaker:
+        """Creates factory of sessions bound to the engine.
+
+        With shard engines, sessions keep users on the engine and route
+        users' data to the shard engines.
+        """
+        if shard_engines:
+            kwargs.update(
+                sync_session_class=UserShardedSession,
+                shard_count=len(shard_engines),
+                shards={
+                    PRIMARY_SHARD: engine.sync_engine,
+                    **{
+                        str(i): shard_engine.sync_engine
+                        for i, shard_engine in enumerate(shard_engines)
+                    },
+                },
+            )
+        else:
+            kwargs["bind"] = engine
+        return async_sessionmaker(
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
+            **kwargs,
         )
 
+    @staticmethod
+    def _pragma_listener(statements: list[str]):
+        """Builds connect event handler running the tuning PRAGMAs."""
+
+        def set_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.close()
+
+        return set_pragmas
+
+    @staticmethod
+    def _disable_driver_transactions(dbapi_connection, connection_record):
+        """Leaves transactions to SQLAlchemy, so savepoints nest properly."""
+        dbapi_connection.isolation_level = None
+
+    @staticmethod
+    def _begin_immediate(connection):
+        """Takes the write lock when the transaction starts, not mid-way."""
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    async def dispose(self) -> None:
+        """Stops the writer and closes connections of every engine."""
+        await self.writer.stop()
+        for engine in (
+            self.engine,
+            self.read_engine,
+            self.write_engine,
+            *self.replica_engines,
+            *self.shard_engines,
+            *self.read_shard_engines,
+            *self.queue_engines,
+        ):
+            await engine.dispose()
+
     def get_scoped_session(self):
         session = async_scoped_session(
             session_factory=self.session_factory, scopefunc=current_task
@@ -33,6 +207,13 @@ class DatabaseHelper:
             yield session
             await session.close()
 
+    async def read_session_dependency(self, request: Request) -> AsyncSession:
+        """Yields read-only session, on the primary after recent writes."""
+        async with self.read_router.session(
+            use_primary=reads_from_primary(request)
+        ) as session:
+            yield session
+
     async def scoped_session_dependency(self) -> AsyncSession:
         session = self.get_scoped_session()
         yield session
@@ -42,4 +223,9 @@ class DatabaseHelper:
 db_helper = DatabaseHelper(
     url=settings.db.db_url,
     echo=settings.db.db_echo,
+    sqlite_pragmas=settings.db.sqlite_pragmas,
+    replica_urls=settings.db.db_replica_urls,
+    replica_selection=settings.db.db_replica_selection,
+    read_your_writes_seconds=settings.db.db_read_your_writes_seconds,
+    shard_urls=settings.db.db_shard_urls,
 )
@@ -0,0 +1,59 @@
+"""Runs Alembic migrations on the primary database and every shard.
+
+Usage: poetry run python -m app.database.migrate_shards [upgrade|downgrade]
+    [revision]
+"""
+
+import argparse
+import asyncio
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import BASE_DIR, settings
+from app.database.sharding import reserve_id_range
+
+
+def database_urls() -> list[str]:
+    """Returns URLs of the primary database followed by the shards."""
+    return [settings.db.db_url, *settings.db.db_shard_urls]
+
+
+def migrate(url: str, action: str, revision: str) -> None:
+    """Upgrades or downgrades one database to the revision."""
+    config = Config(str(BASE_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BASE_DIR / "alembic"))
+    config.attributes["db_url"] = url
+    getattr(command, action)(config, revision)
+
+
+async def reserve_ids(url: str, shard_id: str) -> None:
+    """Reserves the shard's range of category and record IDs."""
+    engine = create_async_engine(url)
+    async with engine.begin() as connection:
+        await connection.run_sync(reserve_id_range, shard_id)
+    await engine.dispose()
+
+
+def main() -> None:
+    """Migrates the primary database and every shard in turn."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "action",
+        nargs="?",
+        default="upgrade",
+        choices=["upgrade", "downgrade"],
+    )
+    parser.add_argument("revision", nargs="?", default="head")
+    args = parser.parse_args()
+    for url in database_urls():
+        print(f"{args.action} {url} to {args.revision}")
+        migrate(url, args.action, args.revision)
+    if (args.action, args.revision) == ("upgrade", "head"):
+        for shard_id, url in enumerate(settings.db.db_shard_urls):
+            asyncio.run(reserve_ids(url, str(shard_id)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
 import datetime
 from enum import Enum as PyEnum
 
-from sqlalchemy import Enum, Float, DateTime, ForeignKey, String
+from sqlalchemy import (
+    Enum,
+    Float,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    event,
+    func,
+)
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -10,6 +20,13 @@ from sqlalchemy.orm import (
     relationship,
 )
 
+from .search import FTS_DDL
+
+
+def utcnow() -> datetime.datetime:
+    """Returns current UTC time as the naive datetime stored in SQLite."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
 
 class TypeFinanceRecord(PyEnum):
     """Enumeration of financial record types."""
@@ -34,8 +51,16 @@ class Category(Base):
     """A financial category for grouping records."""
 
     __tablename__ = "categories"
+    __table_args__ = (
+        Index("ix_categories_user_id_updated_at", "user_id", "updated_at"),
+        {"sqlite_autoincrement": True},
+    )
 
     name: Mapped[str] = mapped_column(String(30))
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow
+    )
+    deleted_at: Mapped[datetime.datetime | None] = mapped_column(DateTime)
 
     financial_records: Mapped[list["FinancialRecord"]] = relationship(
         back_populates="category"
@@ -47,6 +72,17 @@ class Category(Base):
     user: Mapped["User"] = relationship(back_populates="categories")
 
 
+# Names of live categories are unique per user regardless of case, so a
+# tombstoned category does not keep its name from being used again.
+Index(
+    "uq_categories_user_id_lower_name",
+    Category.user_id,
+    func.lower(Category.name),
+    unique=True,
+    sqlite_where=Category.deleted_at.is_(None),
+)
+
+
 class User(Base):
     """A user of the finance tracking system."""
 
@@ -62,6 +98,21 @@ class User(Base):
 class FinancialRecord(Base):
     """A single financial transaction record."""
 
+    __table_args__ = (
+        Index(
+            "ix_financialrecords_user_id_date_id",
+            "user_id",
+            "date",
+            "id",
+        ),
+        Index(
+            "ix_financialrecords_user_id_updated_at",
+            "user_id",
+            "updated_at",
+        ),
+        {"sqlite_autoincrement": True},
+    )
+
     type: Mapped[TypeFinanceRecord] = mapped_column(
         Enum(
             TypeFinanceRecord,
@@ -72,6 +123,10 @@ class FinancialRecord(Base):
     description: Mapped[str] = mapped_column()
     amount: Mapped[float] = mapped_column(Float)
     date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    updated_at: Mapped[datetime.datetime] = mapped_column(
+        DateTime, default=utcnow, onupdate=utcnow
+    )
+    deleted_at: Mapped[datetime.datetime | None] = mapped_column(DateTime)
     user_id: Mapped[int] = mapped_column(
         ForeignKey("users.id"), nullable=False
     )
@@ -80,3 +135,61 @@ class FinancialRecord(Base):
     category: Mapped["Category"] = relationship(
         back_populates="financial_records"
     )
+
+
+for statement in FTS_DDL:
+    event.listen(
+        FinancialRecord.__table__,
+        "after_create",
+        statement.execute_if(dialect="sqlite"),
+    )
+
+
+class MonthlyRollup(Base):
+    """Monthly totals of user's records of one type in one category."""
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id",
+            "category_id",
+            "type",
+            "month",
+            name="uq_monthlyrollups_user_category_type_month",
+        ),
+    )
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False
+    )
+    category_id: Mapped[int] = mapped_column(ForeignKey("categories.id"))
+    type: Mapped[TypeFinanceRecord] = mapped_column(
+        Enum(
+            TypeFinanceRecord,
+            name="typefinancerecord",
+        ),
+        nullable=False,
+    )
+    month: Mapped[str] = mapped_column(String(7))
+    amount: Mapped[float] = mapped_column(Float, default=0.0)
+    count: Mapped[int] = mapped_column(default=0)
+
+
+class DataVersion(Base):
+    """Version of user's records and categories, bumped by every change."""
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), unique=True, nullable=False
+    )
+    version: Mapped[int] = mapped_column(default=0)
+
+
+class ArchivedPartition(Base):
+    """Parquet file of user's old records moved out of the hot table."""
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), nullable=False, index=True
+    )
+    path: Mapped[str] = mapped_column()
+    records: Mapped[int] = mapped_column()
+    first_date: Mapped[datetime.datetime] = mapped_column(DateTime)
+    last_date: Mapped[datetime.datetime] = mapped_column(DateTime)
@@ -0,0 +1,81 @@
+import math
+import time
+from contextlib import asynccontextmanager
+from itertools import count
+from typing import AsyncIterator, Literal
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+ReplicaSelection = Literal["round_robin", "least_busy"]
+
+
+class ReadRouter:
+    """Spreads read-only sessions over replica databases.
+
+    Replicas are picked in turn (``round_robin``) or by the fewest open
+    sessions (``least_busy``). Without replicas, or when the caller has
+    to see its own recent writes, sessions go to the primary.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        replicas: list[async_sessionmaker[AsyncSession]],
+        selection: ReplicaSelection = "round_robin",
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.selection = selection
+        self.in_flight = [0] * len(replicas)
+        self._turns = count()
+
+    def choose(self, use_primary: bool = False) -> int | None:
+        """Returns index of the replica to read from, None for primary."""
+        if use_primary or not self.replicas:
+            return None
+        if self.selection == "least_busy":
+            return min(
+                range(len(self.replicas)), key=self.in_flight.__getitem__
+            )
+        return next(self._turns) % len(self.replicas)
+
+    @asynccontextmanager
+    async def session(
+        self, use_primary: bool = False
+    ) -> AsyncIterator[AsyncSession]:
+        """Opens read-only session on the chosen database."""
+        index = self.choose(use_primary)
+        if index is None:
+            async with self.primary() as session:
+                yield session
+            return
+
+        self.in_flight[index] += 1
+        try:
+            async with self.replicas[index]() as session:
+                yield session
+        finally:
+            self.in_flight[index] -= 1
+
+
+def stick_to_primary(response: Response, seconds: float) -> None:
+    """Makes client's reads go to the primary for the next seconds."""
+    response.set_cookie(
+        key=READ_PRIMARY_COOKIE,
+        value=str(time.time() + seconds),
+        httponly=True,
+        max_age=math.ceil(seconds),
+        samesite="lax",
+        secure=True,
+    )
+
+
+def reads_from_primary(request: Request) -> bool:
+    """Tells whether client wrote recently and must read the primary."""
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
@@ -0,0 +1,74 @@
+import re
+
+from sqlalchemy import DDL, column, table
+
+FTS_TABLE = "financialrecords_fts"
+SEARCH_CANDIDATES = 1000
+
+# External content index of live records' descriptions. Triggers keep it
+# in sync with every write, including soft deletes and undeletes. Prefix
+# indexes serve short prefix queries without merging every term's hits.
+# The owner's ID is indexed too, so a query can visit the hits of one
+# user instead of everyone's.
+FTS_DDL = [
+    DDL("""
+CREATE VIRTUAL TABLE financialrecords_fts USING fts5(
+    description,
+    user_id,
+    content='financialrecords',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3 4'
+)
+"""),
+    DDL("""
+CREATE TRIGGER financialrecords_fts_insert
+AFTER INSERT ON financialrecords WHEN new.deleted_at IS NULL BEGIN
+    INSERT INTO financialrecords_fts (rowid, description, user_id)
+    VALUES (new.id, new.description, new.user_id);
+END
+"""),
+    DDL("""
+CREATE TRIGGER financialrecords_fts_delete
+AFTER DELETE ON financialrecords WHEN old.deleted_at IS NULL BEGIN
+    INSERT INTO financialrecords_fts
+        (financialrecords_fts, rowid, description, user_id)
+    VALUES ('delete', old.id, old.description, old.user_id);
+END
+"""),
+    DDL("""
+CREATE TRIGGER financialrecords_fts_update
+AFTER UPDATE OF description, deleted_at ON financialrecords BEGIN
+    INSERT INTO financialrecords_fts
+        (financialrecords_fts, rowid, description, user_id)
+    SELECT 'delete', old.id, old.description, old.user_id
+    WHERE old.deleted_at IS NULL;
+    INSERT INTO financialrecords_fts (rowid, description, user_id)
+    SELECT new.id, new.description, new.user_id
+    WHERE new.deleted_at IS NULL;
+END
+"""),
+]
+
+financial_records_fts = table(
+    FTS_TABLE, column("rowid"), column("rank"), column(FTS_TABLE)
+)
+
+
+def fts_query(text: str) -> str | None:
+    """Turns user's text into an FTS5 query matching all words' prefixes.
+
+    Words are quoted, so FTS5 operators in the text are searched for as
+    plain words. Returns None when the text has no words.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return "description : ({})".format(
+        " ".join(f'"{word}"*' for word in words)
+    )
+
+
+def user_fts_query(match: str, user_id: int) -> str:
+    """Narrows an FTS5 query down to the records of one user."""
+    return f'user_id : "{user_id}" AND {match}'
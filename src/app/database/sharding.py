@@ -0,0 +1,168 @@
+import zlib
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import Connection, text
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import ORMExecuteState
+
+from app.database.models import User
+from app.database.writer import WriteQueue
+
+PRIMARY_SHARD = "primary"
+# IDs of a shard's rows start at (shard number + 1) << SHARD_ID_BITS, so
+# they are unique across shards and tell which shard a row was made on.
+SHARD_ID_BITS = 40
+SHARDED_ID_TABLES = ("categories", "financialrecords")
+
+current_user_id: ContextVar[int | None] = ContextVar(
+    "current_user_id", default=None
+)
+
+
+def shard_for(user_id: int, shard_count: int) -> str:
+    """Maps user ID to a shard name with a stable hash."""
+    return str(zlib.crc32(str(user_id).encode()) % shard_count)
+
+
+def reserve_id_range(connection: Connection, shard_id: str) -> None:
+    """Makes new categories and records of the shard take its own IDs.
+
+    SQLite continues AUTOINCREMENT tables after the ID kept in
+    ``sqlite_sequence``, so it is raised to the start of the shard's
+    range. IDs already past it are left alone.
+    """
+    first_id = (int(shard_id) + 1) << SHARD_ID_BITS
+    for table in SHARDED_ID_TABLES:
+        last_id = connection.execute(
+            text("SELECT seq FROM sqlite_sequence WHERE name = :table"),
+            {"table": table},
+        ).scalar()
+        if last_id is None:
+            connection.execute(
+                text(
+                    "INSERT INTO sqlite_sequence (name, seq) "
+                    "VALUES (:table, :seq)"
+                ),
+                {"table": table, "seq": first_id - 1},
+            )
+        elif last_id < first_id - 1:
+            connection.execute(
+                text(
+                    "UPDATE sqlite_sequence SET seq = :seq "
+                    "WHERE name = :table"
+                ),
+                {"table": table, "seq": first_id - 1},
+            )
+
+
+class UserShardedSession(ShardedSession):
+    """Session that keeps users on the primary and their data on shards.
+
+    The shard of a user's rows is taken from the instance ``user_id`` on
+    flush, otherwise from ``info["shard_id"]`` of a shard writer's session
+    or from the authenticated user of the request. Statements without any
+    of these, like maintenance jobs, run on every shard.
+    """
+
+    def __init__(self, shard_count: int, **kwargs):
+        self.shard_count = shard_count
+        super().__init__(
+            shard_chooser=self._choose_shard,
+            identity_chooser=self._choose_identity_shards,
+            execute_chooser=self._choose_execute_shards,
+            **kwargs,
+        )
+
+    def _context_shard(self) -> str | None:
+        """Returns shard of the writer session or of the request's user."""
+        if "shard_id" in self.info:
+            return self.info["shard_id"]
+        user_id = current_user_id.get()
+        if user_id is None:
+            return None
+        return shard_for(user_id, self.shard_count)
+
+    def _choose_shard(self, mapper, instance, clause=None) -> str:
+        """Picks shard for an instance being flushed."""
+        if mapper is not None and mapper.class_ is User:
+            return PRIMARY_SHARD
+        user_id = getattr(instance, "user_id", None)
+        if user_id is not None:
+            return shard_for(user_id, self.shard_count)
+        shard_id = self._context_shard()
+        if shard_id is None:
+            raise ValueError(f"Cannot choose shard for {instance!r}")
+        return shard_id
+
+    def _choose_identity_shards(
+        self, mapper, primary_key, *, lazy_loaded_from, **kwargs
+    ) -> list[str]:
+        """Picks shards to look an instance up by primary key."""
+        if mapper.class_ is User:
+            return [PRIMARY_SHARD]
+        if lazy_loaded_from is not None:
+            return [lazy_loaded_from.identity_token]
+        return self._shards_in_context()
+
+    def _choose_execute_shards(
+        self, orm_context: ORMExecuteState
+    ) -> list[str]:
+        """Picks shards to run a statement on."""
+        mapper = orm_context.bind_mapper
+        if mapper is not None and mapper.class_ is User:
+            return [PRIMARY_SHARD]
+        return self._shards_in_context()
+
+    def _shards_in_context(self) -> list[str]:
+        """Returns current user's shard, or every shard without a user."""
+        shard_id = self._context_shard()
+        if shard_id is not None:
+            return [shard_id]
+        return [str(i) for i in range(self.shard_count)]
+
+
+class ShardedWriteQueue:
+    """Sends every write to the queue of the current user's shard.
+
+    Each shard file has a writer task of its own, so writes of users on
+    different shards commit in parallel. Writes outside a user context,
+    like registration, go to the primary's queue.
+    """
+
+    def __init__(self, queues: dict[str, WriteQueue]):
+        self.queues = queues
+        self.shard_count = len(queues) - 1
+
+    @property
+    def batches(self) -> int:
+        return sum(queue.batches for queue in self.queues.values())
+
+    @property
+    def operations(self) -> int:
+        return sum(queue.operations for queue in self.queues.values())
+
+    def start(self) -> None:
+        """Starts writer tasks of all shards."""
+        for queue in self.queues.values():
+            queue.start()
+
+    async def stop(self) -> None:
+        """Drains and stops writer tasks of all shards."""
+        for queue in self.queues.values():
+            await queue.stop()
+
+    async def run(
+        self,
+        operation: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Queues operation on the current user's shard writer."""
+        user_id = current_user_id.get()
+        shard_id = (
+            PRIMARY_SHARD
+            if user_id is None
+            else shard_for(user_id, self.shard_count)
+        )
+        return await self.queues[shard_id].run(operation, *args, **kwargs)
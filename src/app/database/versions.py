@@ -0,0 +1,41 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database.models import DataVersion
+
+# Written as text, as SQLAlchemy cannot cache ON CONFLICT DO UPDATE.
+BUMP_VERSION = text("""
+INSERT INTO dataversions (user_id, version) VALUES (:user_id, 1)
+ON CONFLICT (user_id) DO UPDATE SET version = version + 1
+""")
+
+
+async def bump_data_version(session: AsyncSession, user_id: int) -> None:
+    """Increments version of user's data in the caller's transaction."""
+    await session.execute(BUMP_VERSION, {"user_id": user_id})
+
+
+async def get_data_version(session: AsyncSession, user_id: int) -> int:
+    """Returns version of user's data, 0 if it has never changed."""
+    result = await session.execute(
+        select(DataVersion.version).where(DataVersion.user_id == user_id)
+    )
+    return result.scalar() or 0
+
+
+def data_version_etag(user_id: int, version: int, variant: str = "") -> str:
+    """Builds strong ETag of user's data at the version.
+
+    Each ``variant``, e.g. a binary format of the same data, gets its own
+    ETag, as strong ETags are per representation.
+    """
+    suffix = f".{variant}" if variant else ""
+    return f'"{user_id}.{version}{suffix}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Tells whether an If-None-Match header lists the ETag."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
@@ -0,0 +1,118 @@
+import asyncio
+from contextlib import suppress
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+WRITE_BATCH_SIZE = 100
+
+
+class _BatchSession:
+    """Session proxy that turns commits of queued operations into flushes.
+
+    CRUD functions commit on their own; inside a group commit the writer
+    commits once for the whole batch instead.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    def __getattr__(self, name: str):
+        return getattr(self._session, name)
+
+    async def commit(self) -> None:
+        await self._session.flush()
+
+
+class WriteQueue:
+    """Runs all database writes one after another in a single task.
+
+    Operations queued while a transaction is in progress are committed
+    together in the next one (group commit), so a burst of writes shares
+    one lock acquisition and one fsync. Each operation runs in its own
+    savepoint, and its exception is raised to its caller only.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_batch_size: int = WRITE_BATCH_SIZE,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.operations = 0
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Starts the writer task in the running event loop."""
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Waits for queued operations and stops the writer task."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run(
+        self,
+        operation: Callable[..., Awaitable[Any]],
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Queues ``operation(session, *args, **kwargs)``, returns result."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, args, kwargs, future))
+        return await future
+
+    async def _run(self) -> None:
+        """Takes every queued operation as a batch and commits it."""
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._commit_batch(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit_batch(self, batch: list) -> None:
+        """Runs operations in one transaction and resolves their futures."""
+        outcomes = []
+        try:
+            async with self.session_factory() as session:
+                async with session.begin():
+                    batch_session = _BatchSession(session)
+                    for operation, args, kwargs, future in batch:
+                        if future.done():
+                            continue
+                        try:
+                            async with session.begin_nested():
+                                result = await operation(
+                                    batch_session, *args, **kwargs
+                                )
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+                        else:
+                            outcomes.append((future, result, None))
+        except Exception as e:
+            outcomes = [(item[-1], None, e) for item in batch]
+
+        self.batches += 1
+        self.operations += len(outcomes)
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
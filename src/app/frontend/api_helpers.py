@@ -1,6 +1,8 @@
 import ssl
 
 import httpx
+import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
 from app.config import settings
@@ -13,20 +15,155 @@ if "client" not in st.session_state:
 
 client = st.session_state.client
 
+RECORDS_PAGE_SIZE = 1000
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def cached_get(url, params=None):
+    """Sends GET that revalidates the last response with If-None-Match.
+
+    When the server answers 304, the cached response is returned instead,
+    so unchanged data is neither resent nor parsed again on the server.
+    """
+    cache = st.session_state.setdefault("etag_cache", {})
+    key = str(httpx.URL(url, params=params))
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached.headers["ETag"]} if cached else None
+    response = client.get(url, params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return cached
+    if response.status_code == 200 and "ETag" in response.headers:
+        cache[key] = response
+    return response
+
 
 def get_data():
-    """Retrieves all financial records."""
+    """Retrieves all financial records, following the page cursors."""
+    records = []
+    params = {"limit": RECORDS_PAGE_SIZE}
+    try:
+        while True:
+            response = cached_get(
+                settings.api_endpoints.financial_records_url, params=params
+            )
+            if response.status_code != 200:
+                st.error("Error getting data")
+                return []
+            records.extend(response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                return records
+            params = {"limit": RECORDS_PAGE_SIZE, "cursor": cursor}
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return []
+
+
+def get_changes(since=None):
+    """Retrieves records and categories changed since the sync cursor.
+
+    Without ``since`` only the current cursor is returned.
+    """
+    params = {"since": since} if since else None
     try:
-        response = client.get(settings.api_endpoints.financial_records_url)
+        response = client.get(
+            f"{settings.api_endpoints.financial_records_url}changes",
+            params=params,
+        )
         if response.status_code == 200:
             return response.json()
-        else:
-            st.error("Error getting data")
+        st.error("Error getting changes")
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return None
+
+
+def search_records(query, params=None):
+    """Retrieves records whose descriptions match the query, best first."""
+    try:
+        response = cached_get(
+            f"{settings.api_endpoints.financial_records_url}search",
+            params={**(params or {}), "q": query},
+        )
+        if response.status_code == 200:
+            return response.json()
+        st.error("Error searching records")
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return []
+
+
+def get_summary(params=None):
+    """Retrieves totals of financial records aggregated by the server."""
+    try:
+        response = cached_get(
+            f"{settings.api_endpoints.financial_records_url}summary",
+            params=params,
+        )
+        if response.status_code == 200:
+            return response.json()
+        st.error("Error getting summary")
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return None
+
+
+def get_monthly_totals(params=None):
+    """Retrieves monthly totals per category maintained by the server."""
+    try:
+        response = cached_get(
+            f"{settings.api_endpoints.financial_records_url}summary/monthly",
+            params=params,
+        )
+        if response.status_code == 200:
+            return response.json()
+        st.error("Error getting monthly totals")
     except httpx.RequestError as e:
         st.error(f"Connection error: {e}")
     return []
 
 
+def export_records(output, params=None, export_format="csv"):
+    """Streams records exported by the server into a binary file object."""
+    try:
+        with client.stream(
+            "GET",
+            f"{settings.api_endpoints.financial_records_url}export",
+            params={**(params or {}), "format": export_format},
+        ) as response:
+            if response.status_code != 200:
+                st.error("Error exporting records")
+                return False
+            for chunk in response.iter_bytes():
+                output.write(chunk)
+        return True
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return False
+
+
+def get_records_frame(params=None):
+    """Loads records exported by the server into a data frame.
+
+    Records are asked for as an Arrow stream, whose typed columns become
+    the frame without parsing each value, mostly without copying.
+    """
+    try:
+        response = client.get(
+            f"{settings.api_endpoints.financial_records_url}export",
+            params=params,
+            headers={"Accept": ARROW_MEDIA_TYPE},
+        )
+        if response.status_code != 200:
+            st.error("Error loading records")
+            return pd.DataFrame()
+        table = pa.ipc.open_stream(response.content).read_all()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+    except httpx.RequestError as e:
+        st.error(f"Connection error: {e}")
+    return pd.DataFrame()
+
+
 def create_record(data):
     """Creates a new financial record."""
     try:
@@ -40,11 +177,13 @@ def create_record(data):
 
 
 def delete_record(record_id):
-    """Deletes a financial record by its ID."""
+    """Deletes a financial record by its ID, archived ones are kept."""
     try:
         response = client.delete(
             f"{settings.api_endpoints.financial_records_url}{record_id}"
         )
+        if response.status_code == 409:
+            st.error(response.json().get("detail"))
         return response.status_code == 204
     except httpx.RequestError as e:
         st.error(f"Failed to delete record: {e}")
@@ -52,12 +191,14 @@ def delete_record(record_id):
 
 
 def update_record(record_id, data):
-    """Updates an existing financial record."""
+    """Updates an existing financial record, unless it is archived."""
     try:
         response = client.put(
             f"{settings.api_endpoints.financial_records_url}{record_id}",
             json=data,
         )
+        if response.status_code == 409:
+            st.error(response.json().get("detail"))
         return response.status_code == 204
     except httpx.RequestError as e:
         st.error(f"Failed to update record: {e}")
@@ -86,7 +227,7 @@ def logout_user():
 def get_categories():
     """Retrieves all categories."""
     try:
-        response = client.get(settings.api_endpoints.categories_url)
+        response = cached_get(settings.api_endpoints.categories_url)
         if response.status_code == 200:
             return response.json()
         else:
@@ -98,36 +239,35 @@ def get_categories():
 
 
 def create_category(data):
-    """Creates a new category."""
+    """Creates a new category, the API rejects names already taken."""
     try:
-        existing_categories = get_categories()
         category_name = data.get("name", "").strip()
         if not category_name:
             st.error("The name of a category cannot be empty")
             return None
-        for category in existing_categories:
-            if category.get("name").strip().lower() == category_name.lower():
-                st.error(
-                    f"Category with name '{category_name}' already exists"
-                )
-                return None
         data["name"] = category_name.capitalize()
         response = client.post(
             settings.api_endpoints.categories_url, json=data
         )
         if response.status_code == 200:
             return response.json()
+        if response.status_code == 409:
+            st.error(response.json().get("detail"))
     except httpx.RequestError as e:
         st.error(f"Failed to create category: {e}")
         return None
 
 
 def delete_category(category_id: int):
-    """Deletes a category by its ID."""
+    """Deletes a category by its ID, the API keeps categories in use."""
     try:
         response = client.delete(
             f"{settings.api_endpoints.categories_url}{category_id}"
         )
+        if response.status_code == 409:
+            st.error(response.json().get("detail"))
+        elif response.status_code != 204:
+            st.error("Failed to delete category")
         return response.status_code == 204
     except httpx.RequestError as e:
         st.error(f"Failed to delete category: {e}")
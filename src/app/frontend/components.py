@@ -1,5 +1,5 @@
-import io
-from datetime import datetime
+import tempfile
+from datetime import datetime, timedelta
 
 import pandas as pd
 import plotly.express as px
@@ -12,7 +12,14 @@ from app.frontend.api_helpers import (
     create_category,
     delete_category,
 )
-from app.frontend.api_helpers import generate_pdf_report
+from app.frontend.api_helpers import (
+    export_records,
+    generate_pdf_report,
+    get_monthly_totals,
+    get_records_frame,
+    get_summary,
+    search_records,
+)
 
 
 def render_create_form():
@@ -174,9 +181,14 @@ def render_edit_form(record):
 def render_records():
     """Displays all financial records in a tabular layout."""
     st.header("All financial records")
-    records = st.session_state.records
+    query = st.text_input("Search descriptions").strip()
+    records = search_records(query) if query else st.session_state.records
     if not records:
-        st.info("There are no financial records.")
+        st.info(
+            "No records match the search."
+            if query
+            else "There are no financial records."
+        )
         return
     category_map = {c["id"]: c["name"] for c in st.session_state.categories}
     st.markdown("---")
@@ -250,8 +262,6 @@ def render_categories():
                     ]
                     st.session_state.refresh_records = True
                     st.rerun()
-                else:
-                    st.error("Failed to delete category (may be in use)")
     with st.form("create_category_form"):
         new_category_name = st.text_input("New Category Name")
         if st.form_submit_button("Add Category"):
@@ -267,61 +277,88 @@ def render_categories():
                 st.error("Category name cannot be empty")
 
 
+def filter_records(start_date, end_date, category_ids):
+    """Builds a data frame of records matching analytics filters."""
+    return get_records_frame(
+        {
+            "date_from": str(start_date),
+            "date_to": str(end_date + timedelta(days=1)),
+            "category_id": category_ids,
+        }
+    )
+
+
 def render_analytics():
-    """Renders financial analytics."""
+    """Renders financial analytics aggregated by the server."""
     st.header("Financial Analytics")
 
-    records = st.session_state.records
-    if not records:
+    bounds = get_summary()
+    if not bounds or not bounds["first_date"]:
         st.info("No records available for analysis")
         return
 
-    df = pd.DataFrame(records)
-    df["date"] = pd.to_datetime(df["date"])
-    df["amount"] = pd.to_numeric(df["amount"])
-
-    category_map = {c["id"]: c["name"] for c in st.session_state.categories}
-    df["category_name"] = df["category_id"].map(category_map)
-
     col1, col2 = st.columns(2)
     with col1:
-        start_date = st.date_input("Start date", value=df["date"].min().date())
+        start_date = st.date_input(
+            "Start date", value=pd.to_datetime(bounds["first_date"]).date()
+        )
     with col2:
-        end_date = st.date_input("End date", value=df["date"].max().date())
-
-    mask = (df["date"] >= pd.to_datetime(start_date)) & (
-        df["date"] <= pd.to_datetime(end_date)
-    )
-    filtered_df = df.loc[mask]
+        end_date = st.date_input(
+            "End date", value=pd.to_datetime(bounds["last_date"]).date()
+        )
 
+    category_map = {c["id"]: c["name"] for c in st.session_state.categories}
     selected_categories = st.multiselect(
         "Filter by categories",
-        options=[c["name"] for c in st.session_state.categories],
+        options=list(category_map.values()),
         default=None,
     )
+    category_ids = [
+        category_id
+        for category_id, name in category_map.items()
+        if name in selected_categories
+    ]
+
+    summary = get_summary(
+        {
+            "date_from": str(start_date),
+            "date_to": str(end_date + timedelta(days=1)),
+            "category_id": category_ids,
+        }
+    )
+    if summary is None:
+        return
 
-    if selected_categories:
-        filtered_df = filtered_df[
-            filtered_df["category_name"].isin(selected_categories)
-        ]
-
-    income_df = filtered_df[filtered_df["type"] == "income"]
-    expense_df = filtered_df[filtered_df["type"] == "expense"]
+    by_type_df = pd.DataFrame(
+        summary["by_type"], columns=["type", "amount", "count"]
+    )
+    by_category_df = pd.DataFrame(
+        summary["by_category"],
+        columns=["category_id", "type", "amount", "count"],
+    )
+    by_category_df["category_name"] = by_category_df["category_id"].map(
+        category_map
+    )
+    by_day_df = pd.DataFrame(
+        summary["by_day"], columns=["day", "type", "amount"]
+    )
+    totals = {row["type"]: row["amount"] for row in summary["by_type"]}
+    averages = {row["type"]: row["amount"] for row in summary["daily_average"]}
 
-    tab1, tab2, tab3, tab4 = st.tabs(
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
         [
             "Total Overview",
             "By Category",
             "Daily Trends",
+            "Monthly Trends",
             "Statistics",
         ]
     )
 
     with tab1:
         st.subheader("Income vs Expenses")
-        summary = filtered_df.groupby("type")["amount"].sum().reset_index()
         fig = px.pie(
-            summary,
+            by_type_df,
             values="amount",
             names="type",
             title="Income/Expense Distribution",
@@ -329,12 +366,9 @@ def render_analytics():
         st.plotly_chart(fig, use_container_width=True)
 
         st.subheader("Over Time")
-        time_df = (
-            filtered_df.groupby(["date", "type"])["amount"].sum().reset_index()
-        )
         fig = px.line(
-            time_df,
-            x="date",
+            by_day_df,
+            x="day",
             y="amount",
             color="type",
             title="Income and Expenses Over Time",
@@ -349,34 +383,22 @@ def render_analytics():
             or not st.session_state.categories
         ):
             st.warning("No categories available. Please add categories first.")
-        elif filtered_df.empty:
+        elif by_category_df.empty:
             st.warning("No records available for selected period")
         else:
-            category_map = {
-                c["id"]: c["name"] for c in st.session_state.categories
-            }
-            filtered_df["category_name"] = filtered_df["category_id"].map(
-                category_map
-            )
-
             selected_categories = st.multiselect(
                 "Select categories to analyze",
                 options=list(category_map.values()),
                 default=list(category_map.values()),
             )
 
+            cat_df = by_category_df
             if selected_categories:
-                filtered_df = filtered_df[
-                    filtered_df["category_name"].isin(selected_categories)
+                cat_df = cat_df[
+                    cat_df["category_name"].isin(selected_categories)
                 ]
 
             st.markdown("### Income vs Expenses by Category")
-            cat_df = (
-                filtered_df.groupby(["category_name", "type"])["amount"]
-                .sum()
-                .reset_index()
-            )
-
             if not cat_df.empty:
                 fig = px.bar(
                     cat_df,
@@ -395,12 +417,10 @@ def render_analytics():
                 st.plotly_chart(fig, use_container_width=True)
 
                 st.markdown("### Expenses Distribution")
-                expense_df = filtered_df[filtered_df["type"] == "expense"]
-                if not expense_df.empty:
+                expense_cat_df = cat_df[cat_df["type"] == "expense"]
+                if not expense_cat_df.empty:
                     fig_pie = px.pie(
-                        expense_df.groupby("category_name")["amount"]
-                        .sum()
-                        .reset_index(),
+                        expense_cat_df,
                         values="amount",
                         names="category_name",
                         title="Percentage of Expenses by Category",
@@ -413,12 +433,9 @@ def render_analytics():
 
     with tab3:
         st.subheader("Daily Trends")
-        daily_df = (
-            filtered_df.groupby(["date", "type"])["amount"].sum().reset_index()
-        )
         fig = px.bar(
-            daily_df,
-            x="date",
+            by_day_df,
+            x="day",
             y="amount",
             color="type",
             title="Daily Income and Expenses",
@@ -426,26 +443,50 @@ def render_analytics():
         st.plotly_chart(fig, use_container_width=True)
 
     with tab4:
+        st.subheader("Monthly Trends")
+        monthly_df = pd.DataFrame(
+            get_monthly_totals(
+                {
+                    "month_from": start_date.strftime("%Y-%m"),
+                    "month_to": end_date.strftime("%Y-%m"),
+                    "category_id": category_ids,
+                }
+            ),
+            columns=["month", "category_id", "type", "amount", "count"],
+        )
+        if monthly_df.empty:
+            st.info("No monthly totals for selected period")
+        else:
+            monthly_df = (
+                monthly_df.groupby(["month", "type"])["amount"]
+                .sum()
+                .reset_index()
+            )
+            fig = px.bar(
+                monthly_df,
+                x="month",
+                y="amount",
+                color="type",
+                barmode="group",
+                title="Monthly Income and Expenses",
+            )
+            st.plotly_chart(fig, use_container_width=True)
+
+    with tab5:
         st.subheader("Financial Statistics")
 
-        if not expense_df.empty:
-            avg_expense_per_day = (
-                expense_df.groupby("date")["amount"].sum().mean()
-            )
-            st.metric("Average Daily Expenses", f"{avg_expense_per_day:.2f}")
+        if "expense" in averages:
+            st.metric("Average Daily Expenses", f"{averages['expense']:.2f}")
 
-        if not income_df.empty:
-            avg_income_per_day = (
-                income_df.groupby("date")["amount"].sum().mean()
-            )
-            st.metric("Average Daily Income", f"{avg_income_per_day:.2f}")
+        if "income" in averages:
+            st.metric("Average Daily Income", f"{averages['income']:.2f}")
 
+        total_income = totals.get("income", 0.0)
+        total_expense = totals.get("expense", 0.0)
         col1, col2 = st.columns(2)
         with col1:
-            total_income = income_df["amount"].sum()
             st.metric("Total Income", f"{total_income:.2f}")
         with col2:
-            total_expense = expense_df["amount"].sum()
             st.metric("Total Expenses", f"{total_expense:.2f}")
 
         balance = total_income - total_expense
@@ -455,22 +496,16 @@ def render_analytics():
             delta_color="inverse" if balance < 0 else "normal",
         )
 
-    if not filtered_df.empty:
+    if not by_type_df.empty:
         st.markdown("---")
         col1, col2 = st.columns(2)
 
         with col1:
 
-            def prepare_enhanced_csv(df):
-                main_data = df[
-                    ["date", "type", "category_name", "description", "amount"]
-                ]
-
-                category_stats = (
-                    df.groupby(["category_name", "type"])["amount"]
-                    .agg(["sum", "count", "mean"])
-                    .reset_index()
-                )
+            def prepare_enhanced_csv():
+                category_stats = by_category_df.assign(
+                    mean=by_category_df["amount"] / by_category_df["count"]
+                )[["category_name", "type", "amount", "count", "mean"]]
                 category_stats.columns = [
                     "Category",
                     "Type",
@@ -486,38 +521,48 @@ def render_analytics():
                             "Total Expenses",
                             "Balance",
                         ],
-                        "Value": [
-                            income_df["amount"].sum(),
-                            expense_df["amount"].sum(),
-                            income_df["amount"].sum()
-                            - expense_df["amount"].sum(),
-                        ],
+                        "Value": [total_income, total_expense, balance],
                     }
                 )
 
-                output = io.StringIO()
-                output.write("Main Transactions Data\n")
-                main_data.to_csv(output, index=False)
-                output.write("\n\nCategory Statistics\n")
-                category_stats.to_csv(output, index=False)
-                output.write("\n\nSummary Statistics\n")
-                total_stats.to_csv(output, index=False)
-
-                return output.getvalue()
-
-            csv_data = prepare_enhanced_csv(filtered_df)
-            st.download_button(
-                label="Download Enhanced CSV",
-                data=csv_data,
-                file_name="financial_report_enhanced.csv",
-                mime="text/csv",
-            )
+                with tempfile.TemporaryFile() as output:
+                    output.write(b"Main Transactions Data\n")
+                    if not export_records(
+                        output,
+                        {
+                            "date_from": str(start_date),
+                            "date_to": str(end_date + timedelta(days=1)),
+                            "category_id": category_ids,
+                        },
+                    ):
+                        return None
+                    output.write(b"\n\nCategory Statistics\n")
+                    output.write(category_stats.to_csv(index=False).encode())
+                    output.write(b"\n\nSummary Statistics\n")
+                    output.write(total_stats.to_csv(index=False).encode())
+                    output.seek(0)
+                    return output.read()
+
+            if st.button("Export CSV"):
+                with st.spinner("Exporting records..."):
+                    csv_data = prepare_enhanced_csv()
+                if csv_data:
+                    st.download_button(
+                        label="Download Enhanced CSV",
+                        data=csv_data,
+                        file_name="financial_report_enhanced.csv",
+                        mime="text/csv",
+                    )
 
             with col2:
                 if st.button("Generate PDF Report"):
                     with st.spinner("Generating PDF..."):
                         try:
-                            pdf_data = generate_pdf_report(filtered_df)
+                            pdf_data = generate_pdf_report(
+                                filter_records(
+                                    start_date, end_date, category_ids
+                                )
+                            )
                             if pdf_data:
                                 st.download_button(
                                     label="Download PDF Report",
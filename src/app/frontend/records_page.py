@@ -1,7 +1,7 @@
 import streamlit as st
 
 from app.frontend.api_helpers import logout_user
-from app.frontend.api_helpers import get_data, get_categories
+from app.frontend.api_helpers import get_changes, get_data, get_categories
 from app.frontend.components import (
     render_create_form,
     render_records,
@@ -10,18 +10,62 @@ from app.frontend.components import (
 )
 
 
+def merge_changes(items, changed, deleted_ids, sort_key):
+    """Applies changed and deleted items to a list of items by their ID."""
+    by_id = {item["id"]: item for item in items}
+    for item_id in deleted_ids:
+        by_id.pop(item_id, None)
+    by_id.update((item["id"], item) for item in changed)
+    return sorted(by_id.values(), key=sort_key)
+
+
+def load_all():
+    """Loads all records and categories, with the cursor of their state.
+
+    The cursor is taken first, so changes made during the load are merged
+    again later rather than missed.
+    """
+    changes = get_changes()
+    st.session_state.changes_cursor = changes["cursor"] if changes else None
+    st.session_state.records = get_data()
+    st.session_state.categories = get_categories()
+
+
+def sync_changes():
+    """Merges records and categories changed since the last sync."""
+    cursor = st.session_state.get("changes_cursor")
+    changes = get_changes(cursor) if cursor else None
+    if changes is None:
+        load_all()
+        return
+    st.session_state.records = merge_changes(
+        st.session_state.records,
+        changes["records"],
+        changes["deleted_record_ids"],
+        sort_key=lambda record: (record["date"], record["id"]),
+    )
+    st.session_state.categories = merge_changes(
+        st.session_state.categories,
+        changes["categories"],
+        changes["deleted_category_ids"],
+        sort_key=lambda category: category["id"],
+    )
+    st.session_state.changes_cursor = changes["cursor"]
+
+
 def init_session_state():
-    """Initializes or refreshes session state for records and categories."""
-    if "records" not in st.session_state or st.session_state.get(
-        "refresh_records", False
+    """Loads records and categories once, then fetches only changes."""
+    if (
+        "records" not in st.session_state
+        or "categories" not in st.session_state
     ):
-        st.session_state.records = get_data()
-        st.session_state.refresh_records = False
-    if "categories" not in st.session_state or st.session_state.get(
-        "refresh_categories", False
+        load_all()
+    elif st.session_state.get("refresh_records") or st.session_state.get(
+        "refresh_categories"
     ):
-        st.session_state.categories = get_categories()
-        st.session_state.refresh_categories = False
+        sync_changes()
+    st.session_state.refresh_records = False
+    st.session_state.refresh_categories = False
 
 
 def render_records_page():
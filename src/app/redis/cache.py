@@ -0,0 +1,340 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import suppress
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from pydantic import TypeAdapter
+
+from app.config import CacheSettings, settings
+from app.redis.redis_helper import RedisHelper, redis_helper
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# KEYS: cached value, generation of the key.
+# ARGV: generation read before the load, value, TTL.
+# Stores the value only if the key was not invalidated since the load
+# started, so a slow load cannot put a stale value back into Redis.
+SET_IF_GENERATION_SCRIPT = """
+if (redis.call("GET", KEYS[2]) or "0") == ARGV[1] then
+    return redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+end
+return false
+"""
+
+
+class _Load:
+    """A load of one key shared by everyone asking for it meanwhile."""
+
+    def __init__(self):
+        """Creates the future the load's result is shared through."""
+        self.future = asyncio.get_running_loop().create_future()
+        self.stale = False
+
+
+class TwoTierCache:
+    """Read cache with an in-process LRU tier over a shared Redis tier.
+
+    Values are looked up in this worker's memory (L1), then in Redis
+    (L2), and only then loaded. Concurrent misses of a key in a worker
+    share one load, so a hot key never stampedes the database.
+
+    ``invalidate`` drops keys from both tiers and publishes them, and
+    every other worker listening with ``start`` drops them from its L1,
+    so a value loaded right after an invalidation stays cached. Every
+    invalidation also bumps the key's generation in Redis, and a load
+    writes to Redis only if the generation is still the one it started
+    with. L1 entries are short-lived, which bounds staleness if a
+    message is lost. While Redis is unavailable, only L1 is used.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, helper: RedisHelper, config: CacheSettings):
+        """Creates an empty cache over the helper's Redis client."""
+        self.helper = helper
+        self.config = config
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.worker_id = uuid.uuid4().hex
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._loading: dict[str, _Load] = {}
+        self._listener: asyncio.Task | None = None
+
+    async def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], Awaitable[Any]],
+        adapter: TypeAdapter | None = None,
+    ) -> Any:
+        """Returns the cached value of key, loading and caching on a miss.
+
+        With ``adapter``, loaded values are converted to its type, e.g.
+        ORM objects to schemas, and stored in Redis as its JSON; without
+        it, values have to be JSON as they are. If the caller sharing its
+        load is cancelled, the others load again rather than fail.
+        """
+        while True:
+            value = self._get_local(key)
+            if value is not _MISSING:
+                self.l1_hits += 1
+                return value
+            pending = self._loading.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending.future)
+            except asyncio.CancelledError:
+                if asyncio.current_task().cancelling():
+                    raise
+
+        pending = self._loading[key] = _Load()
+        try:
+            value = await self._load(key, load, adapter, pending)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                pending.future.cancel()
+            else:
+                pending.future.set_exception(e)
+                pending.future.exception()
+            raise
+        else:
+            pending.future.set_result(value)
+            return value
+        finally:
+            if self._loading.get(key) is pending:
+                del self._loading[key]
+
+    async def invalidate(self, *keys: str) -> None:
+        """Drops keys here, in Redis and in the L1 of every worker."""
+        self._drop(keys)
+
+        async def delete_and_publish(client):
+            """Drops the keys and bumps their generations in one go."""
+            async with client.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    # Outlives the value, so loads in progress see it.
+                    pipe.incr(self._generation_key(key))
+                    pipe.expire(
+                        self._generation_key(key), self.config.l2_ttl_seconds
+                    )
+                pipe.delete(*(self._redis_key(key) for key in keys))
+                pipe.publish(
+                    self.config.channel,
+                    json.dumps({"worker": self.worker_id, "keys": keys}),
+                )
+                await pipe.execute()
+
+        await self.helper.execute(delete_and_publish, lambda: None)
+
+    def cached(
+        self,
+        key: Callable[..., str],
+        model: Any = None,
+    ) -> Callable:
+        """Decorates an async read function to go through the cache.
+
+        ``key`` gets the function's arguments and returns the cache key;
+        ``model`` is the type of the result, used to store it in Redis::
+
+            @cache.cached(
+                key=lambda session, user_id: f"categories:{user_id}",
+                model=list[CategorySchema],
+            )
+            async def get_categories(session, user_id): ...
+
+        The undecorated function stays available as ``uncached``.
+        """
+        adapter = TypeAdapter(model) if model is not None else None
+
+        def decorator(function: Callable) -> Callable:
+            """Wraps the read function."""
+
+            @wraps(function)
+            async def wrapper(*args, **kwargs):
+                """Returns the function's cached result."""
+                return await self.get_or_load(
+                    key(*args, **kwargs),
+                    lambda: function(*args, **kwargs),
+                    adapter,
+                )
+
+            wrapper.uncached = function
+            return wrapper
+
+        return decorator
+
+    async def start(self) -> None:
+        """Starts listening for invalidations of other workers."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stops listening for invalidations."""
+        if self._listener is not None:
+            self._listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+
+    def clear(self) -> None:
+        """Drops every L1 entry of this worker."""
+        for pending in self._loading.values():
+            pending.stale = True
+        self._loading.clear()
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        """Returns the number of L1 entries."""
+        return len(self._entries)
+
+    def snapshot(self) -> dict:
+        """Returns the L1 size and the hit, miss and invalidation counts."""
+        return {
+            "size": len(self._entries),
+            "maxsize": self.config.l1_maxsize,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    async def _load(self, key, load, adapter, pending: _Load) -> Any:
+        """Reads key from Redis, or loads it and stores it in both tiers.
+
+        The key's generation is read along with the value and checked
+        again by the write to Redis.
+        """
+        redis_key = self._redis_key(key)
+        generation_key = self._generation_key(key)
+        cached, generation = await self.helper.execute(
+            lambda client: client.mget(redis_key, generation_key),
+            lambda: (None, None),
+        )
+        if cached is not None:
+            self.l2_hits += 1
+            value = (
+                adapter.validate_json(cached)
+                if adapter is not None
+                else json.loads(cached)
+            )
+        else:
+            self.misses += 1
+            value = await load()
+            if adapter is not None:
+                value = adapter.validate_python(value, from_attributes=True)
+            if not pending.stale:
+                encoded = (
+                    adapter.dump_json(value)
+                    if adapter is not None
+                    else json.dumps(value)
+                )
+
+                async def store(client):
+                    """Sets the value unless the key was invalidated."""
+                    script = self.helper.script(
+                        client, SET_IF_GENERATION_SCRIPT
+                    )
+                    return await script(
+                        keys=[redis_key, generation_key],
+                        args=[
+                            generation or 0,
+                            encoded,
+                            self.config.l2_ttl_seconds,
+                        ],
+                    )
+
+                await self.helper.execute(store, lambda: None)
+        if not pending.stale:
+            self._set_local(key, value)
+        return value
+
+    def _get_local(self, key: str) -> Any:
+        """Returns the live L1 value of key, or _MISSING."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _set_local(self, key: str, value: Any) -> None:
+        """Stores value in L1, evicting the least recently used entries."""
+        if self.config.l1_maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.config.l1_ttl_seconds
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.config.l1_maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _drop(self, keys) -> None:
+        """Drops keys from L1 and keeps loads in progress from storing."""
+        for key in keys:
+            self.invalidations += 1
+            self._entries.pop(key, None)
+            pending = self._loading.pop(key, None)
+            if pending is not None:
+                pending.stale = True
+
+    def _on_message(self, message: dict) -> None:
+        """Drops keys invalidated by another worker."""
+        if message["worker"] != self.worker_id:
+            self._drop(message["keys"])
+
+    def _redis_key(self, key: str) -> str:
+        """Returns the Redis key of the cached value of key."""
+        return f"{self.config.key_prefix}{key}"
+
+    def _generation_key(self, key: str) -> str:
+        """Returns the Redis key of the invalidation count of key."""
+        return f"{self.config.key_prefix}generation:{key}"
+
+    async def _listen(self) -> None:
+        """Drops keys published by other workers, resubscribing on errors.
+
+        Messages may be lost while disconnected, so L1 is cleared
+        whenever the subscription is made again.
+        """
+        while True:
+            client = self.helper.redis_client
+            if client is None or not self.helper.breaker.allow():
+                await asyncio.sleep(self.config.resubscribe_seconds)
+                continue
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(self.config.channel)
+                    self.helper.breaker.record_success()
+                    self.clear()
+                    while True:
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=self.config.resubscribe_seconds,
+                        )
+                        if message is not None:
+                            self._on_message(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.warning("Cache invalidation listener failed")
+                self.helper.breaker.record_failure()
+                await asyncio.sleep(self.config.resubscribe_seconds)
+
+
+cache = TwoTierCache(redis_helper, settings.cache)
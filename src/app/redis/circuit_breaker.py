@@ -0,0 +1,62 @@
+import time
+
+
+class CircuitBreaker:
+    """Stops calling a failing service for a while.
+
+    After ``failure_threshold`` failures in a row the breaker opens and
+    calls are refused for ``reset_timeout`` seconds. Then one trial call
+    is let through (half-open): its success closes the breaker, its
+    failure opens it again. A trial that never reports back is replaced
+    by another one after ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """Creates a closed breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.trips = 0
+        self._opened_at: float | None = None
+        self._trial_started: float | None = None
+
+    @property
+    def state(self) -> str:
+        """Returns "closed", "open" or "half_open"."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """Tells whether a call may be made now."""
+        state = self.state
+        if state == "closed":
+            return True
+        now = time.monotonic()
+        if state == "open" or (
+            self._trial_started is not None
+            and now - self._trial_started < self.reset_timeout
+        ):
+            return False
+        self._trial_started = now
+        return True
+
+    def record_success(self) -> None:
+        """Closes the breaker after a successful call."""
+        self.failures = 0
+        self._opened_at = None
+        self._trial_started = None
+
+    def record_failure(self) -> None:
+        """Counts a failed call, opening the breaker at the threshold."""
+        self.failures += 1
+        self._trial_started = None
+        if (
+            self._opened_at is not None
+            or self.failures >= self.failure_threshold
+        ):
+            if self.state != "open":
+                self.trips += 1
+            self._opened_at = time.monotonic()
@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from collections import defaultdict
+
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    """Counts of latencies per bucket, Prometheus style.
+
+    ``counts[i]`` holds the observations up to ``LATENCY_BUCKETS_MS[i]``
+    and above the previous bound; the last count is for slower ones.
+    """
+
+    def __init__(self):
+        """Creates a histogram without observations."""
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Adds one latency."""
+        ms = seconds * 1000
+        self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.total += 1
+        self.sum_ms += ms
+
+    def percentile(self, q: float) -> float:
+        """Returns the upper bound of the bucket holding the q-th percentile.
+
+        Latencies above the last bucket are reported as infinite.
+        """
+        rank = self.total * q / 100
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += count
+            if count and seen >= rank:
+                return float(bound)
+        return float("inf") if self.counts[-1] else 0.0
+
+
+class CommandMetrics:
+    """Latency histograms and error counts per Redis command."""
+
+    def __init__(self):
+        """Creates empty metrics."""
+        self.latency: defaultdict[str, LatencyHistogram] = defaultdict(
+            LatencyHistogram
+        )
+        self.errors: defaultdict[str, int] = defaultdict(int)
+
+    def observe(self, command: str, seconds: float, failed: bool) -> None:
+        """Records one command call."""
+        self.latency[command].observe(seconds)
+        if failed:
+            self.errors[command] += 1
+
+    def snapshot(self) -> dict:
+        """Returns calls, errors and p50/p99 per command."""
+        return {
+            command: {
+                "calls": histogram.total,
+                "errors": self.errors[command],
+                "p50_ms": histogram.percentile(50),
+                "p99_ms": histogram.percentile(99),
+            }
+            for command, histogram in sorted(self.latency.items())
+        }
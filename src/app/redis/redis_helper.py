@@ -1,21 +1,124 @@
+import time
+from typing import Any, Awaitable, Callable
+
 import redis.asyncio as redis
+from redis.commands.core import AsyncScript
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.config import RedisSettings, settings
+from app.redis.circuit_breaker import CircuitBreaker
+from app.redis.metrics import CommandMetrics
+
+
+class InstrumentedRedis(redis.Redis):
+    """Redis client recording the latency of every command."""
 
-from app.config import settings
+    metrics: CommandMetrics | None = None
+
+    async def execute_command(self, *args, **options):
+        """Runs the command, recording its latency and whether it failed."""
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = await super().execute_command(*args, **options)
+            failed = False
+            return result
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe(
+                    str(args[0]), time.perf_counter() - started, failed
+                )
 
 
 class RedisHelper:
-    """Helper class for interacting with Redis."""
+    """Helper class for interacting with Redis.
 
-    def __init__(
-        self,
-        host: str = settings.redis.host,
-        port: int = settings.redis.port,
-        db: int = settings.redis.db,
-        decode_responses: bool = settings.redis.decode_responses,
-    ):
-        self.redis_client = redis.Redis(
-            host=host, port=port, db=db, decode_responses=decode_responses
+    The client and its bounded connection pool are made by ``connect``
+    and released by ``close``, in the API's lifespan. Commands run through
+    ``execute`` are guarded by a circuit breaker: while Redis is failing
+    or too slow, the fallback answers instead.
+    """
+
+    def __init__(self, config: RedisSettings = settings.redis):
+        """Sets up metrics and the breaker, the client is made on connect."""
+        self.config = config
+        self.metrics = CommandMetrics()
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.breaker_failure_threshold,
+            reset_timeout=config.breaker_reset_seconds,
+        )
+        self.redis_client: redis.Redis | None = None
+        self._scripts: dict[str, AsyncScript] = {}
+
+    def connect(self) -> None:
+        """Creates the client with its pool unless one is already set."""
+        if self.redis_client is not None:
+            return
+        pool = redis.BlockingConnectionPool(
+            host=self.config.host,
+            port=self.config.port,
+            db=self.config.db,
+            decode_responses=self.config.decode_responses,
+            max_connections=self.config.max_connections,
+            timeout=self.config.socket_timeout,
+            socket_timeout=self.config.socket_timeout,
+            socket_connect_timeout=self.config.socket_connect_timeout,
         )
+        client = InstrumentedRedis(connection_pool=pool)
+        client.metrics = self.metrics
+        self.redis_client = client
+
+    async def close(self) -> None:
+        """Closes the client and disconnects its pool."""
+        if self.redis_client is not None:
+            await self.redis_client.aclose(close_connection_pool=True)
+            self.redis_client = None
+
+    def script(self, client: redis.Redis, source: str) -> AsyncScript:
+        """Returns the Lua source as a script, registered once per client.
+
+        The script runs by its SHA and is only sent again if Redis lost
+        it.
+        """
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not client:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+
+    async def execute(
+        self,
+        command: Callable[[redis.Redis], Awaitable[Any]],
+        fallback: Callable[[], Any],
+    ) -> Any:
+        """Returns ``command(client)``, or ``fallback()`` if Redis is down.
+
+        Connection errors and timeouts count against the breaker; other
+        errors are raised.
+        """
+        if self.redis_client is None or not self.breaker.allow():
+            return fallback()
+        try:
+            result = await command(self.redis_client)
+        except (RedisConnectionError, RedisTimeoutError):
+            self.breaker.record_failure()
+            return fallback()
+        except Exception:
+            self.breaker.record_success()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        """Returns the breaker's state and the per-command metrics."""
+        return {
+            "breaker": {
+                "state": self.breaker.state,
+                "failures": self.breaker.failures,
+                "trips": self.breaker.trips,
+            },
+            "commands": self.metrics.snapshot(),
+        }
 
 
 redis_helper = RedisHelper()
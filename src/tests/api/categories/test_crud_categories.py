@@ -1,14 +1,22 @@
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.api.categories.schemas import CategoryCreate, CategoryUpdate
+from app.api.categories import crud
+from app.api.categories.schemas import (
+    Category as CategorySchema,
+    CategoryCreate,
+    CategoryUpdate,
+)
 from app.database.models import Category
 from app.api.categories.crud import (
     get_categories,
+    invalidate_categories,
     get_category,
     create_category,
     update_category,
     delete_category,
+    get_categories_changed_since,
 )
 
 
@@ -17,6 +25,20 @@ def session():
     return AsyncMock(spec=AsyncSession)
 
 
+@pytest.fixture(autouse=True)
+def bump_data_version(mocker):
+    return mocker.patch(
+        "app.api.categories.crud.bump_data_version", AsyncMock()
+    )
+
+
+@pytest.fixture(autouse=True)
+def cache():
+    crud.cache.clear()
+    yield crud.cache
+    crud.cache.clear()
+
+
 @pytest.fixture
 def fake_category():
     return Category(id=7, name="Test", user_id=123)
@@ -33,13 +55,11 @@ def fake_category():
 @pytest.mark.asyncio
 async def test_get_categories(session, fake_category, user_id, expected_count):
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = [
-        fake_category
-    ] * expected_count
+    mock_result.all.return_value = [fake_category] * expected_count
 
     session.execute.return_value = mock_result
 
-    result = await get_categories(session, user_id=user_id)
+    result = await get_categories.uncached(session, user_id=user_id)
 
     assert len(result) == expected_count
     session.execute.assert_called_once()
@@ -58,16 +78,35 @@ async def test_get_categories_with_multiple_users(session, user_id):
     }
 
     mock_result = MagicMock()
-    mock_result.scalars.return_value.all.return_value = fake_data[user_id]
+    mock_result.all.return_value = fake_data[user_id]
     session.execute.return_value = mock_result
 
-    result = await get_categories(session, user_id=user_id)
+    result = await get_categories.uncached(session, user_id=user_id)
 
     assert result == fake_data[user_id]
-    assert all(cat.user_id == user_id for cat in result)
+    sql = str(session.execute.call_args.args[0])
+    assert sql.startswith("SELECT categories.id, categories.name \n")
+    assert "categories.user_id = " in sql
     session.execute.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_get_categories_is_cached_until_invalidated(
+    session, fake_category
+):
+    mock_result = MagicMock()
+    mock_result.all.return_value = [fake_category]
+    session.execute.return_value = mock_result
+
+    first = await get_categories(session, user_id=123)
+    second = await get_categories(session, user_id=123)
+    await invalidate_categories(123)
+    third = await get_categories(session, user_id=123)
+
+    assert first == second == third == [CategorySchema(id=7, name="Test")]
+    assert session.execute.await_count == 2
+
+
 @pytest.mark.parametrize(
     "category_id, user_id, expected_result",
     [
@@ -101,28 +140,44 @@ async def test_get_category(
     session.execute.assert_called_once()
 
 
-@pytest.mark.parametrize(
-    "update_data, expected_name",
-    [
-        ({"name": "New Name"}, "New Name"),
-        ({"name": ""}, ""),
-    ],
-)
 @pytest.mark.asyncio
-async def test_update_category(
-    session, fake_category, update_data, expected_name
-):
-    session.commit = AsyncMock()
-    category_update = CategoryUpdate(**update_data)
+async def test_get_categories_changed_since(session, fake_category):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [fake_category]
+    session.execute.return_value = mock_result
 
-    updated = await update_category(session, fake_category, category_update)
+    result = await get_categories_changed_since(
+        session, user_id=123, since=datetime(2025, 1, 1)
+    )
 
-    assert updated.name == expected_name
-    session.commit.assert_called_once()
+    assert result == [fake_category]
+    sql = str(session.execute.call_args.args[0])
+    assert "categories.updated_at >" in sql
+    assert sql.endswith("ORDER BY categories.updated_at, categories.id")
 
 
+@pytest.mark.parametrize("rowcount, expected", [(1, True), (0, False)])
 @pytest.mark.asyncio
-async def test_create_category(session):
+async def test_update_category(session, bump_data_version, rowcount, expected):
+    session.execute.return_value = MagicMock(rowcount=rowcount)
+
+    result = await update_category(
+        session,
+        category_id=7,
+        user_id=123,
+        category_update=CategoryUpdate(name="New Name"),
+    )
+
+    assert result is expected
+    stmt = str(session.execute.call_args.args[0])
+    assert stmt.startswith("UPDATE categories SET name=")
+    assert "categories.user_id = :user_id_1" in stmt
+    assert bump_data_version.await_count == int(expected)
+    assert session.commit.await_count == int(expected)
+
+
+@pytest.mark.asyncio
+async def test_create_category(session, bump_data_version):
     category_data = {"name": "Books"}
     session.refresh = AsyncMock()
     category_in = CategoryCreate(**category_data)
@@ -133,13 +188,25 @@ async def test_create_category(session):
     assert result.name == category_data["name"]
     assert result.user_id == 123
     session.add.assert_called_once()
+    bump_data_version.assert_awaited_once_with(session, 123)
     session.commit.assert_called_once()
     session.refresh.assert_called_once()
 
 
+@pytest.mark.parametrize("rowcount, expected", [(1, True), (0, False)])
 @pytest.mark.asyncio
-async def test_delete_category(session, fake_category):
-    await delete_category(session, fake_category)
-
-    session.delete.assert_awaited_once_with(fake_category)
-    session.commit.assert_awaited_once()
+async def test_delete_category(session, bump_data_version, rowcount, expected):
+    session.execute.return_value = MagicMock(rowcount=rowcount)
+
+    result = await delete_category(session, category_id=7, user_id=123)
+
+    assert result is expected
+    stmt = str(session.execute.call_args.args[0])
+    assert stmt.startswith("UPDATE categories SET updated_at=")
+    assert "deleted_at=:deleted_at" in stmt
+    assert "categories.deleted_at IS NULL" in stmt
+    assert "NOT (EXISTS (SELECT financialrecords.id" in stmt
+    assert "(SELECT count(archivedpartitions.id) AS count_1" in stmt
+    session.execute.assert_awaited_once()
+    assert bump_data_version.await_count == int(expected)
+    assert session.commit.await_count == int(expected)
@@ -9,12 +9,22 @@ from app.api.financial_records.schemas import (
     FinancialRecordUpdatePartial,
 )
 from app.api.financial_records.crud import (
+    RecordRow,
     get_financial_records,
+    get_financial_record_rows,
     get_financial_record,
     create_financial_record,
     update_financial_record,
     update_financial_record_partial,
     delete_financial_record,
+    get_financial_summary,
+    get_monthly_totals,
+    get_unknown_category_ids,
+    create_financial_records_bulk,
+    UnknownCategoriesError,
+    stream_financial_records,
+    get_financial_records_changed_since,
+    get_last_change,
 )
 
 
@@ -23,6 +33,20 @@ def session():
     return AsyncMock()
 
 
+@pytest.fixture(autouse=True)
+def bump_data_version(mocker):
+    return mocker.patch(
+        "app.api.financial_records.crud.bump_data_version", AsyncMock()
+    )
+
+
+@pytest.fixture(autouse=True)
+def get_partitions(mocker):
+    return mocker.patch(
+        "app.database.archive.get_partitions", AsyncMock(return_value=[])
+    )
+
+
 @pytest.fixture
 def fake_financial_record():
     return FinancialRecord(
@@ -61,6 +85,62 @@ async def test_get_financial_records(
     session.execute.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "kwargs, expected_sql",
+    [
+        ({}, []),
+        ({"limit": 50}, ["LIMIT"]),
+        (
+            {"after": (datetime(2025, 1, 1), 10), "limit": 50},
+            ["(financialrecords.date, financialrecords.id) >", "LIMIT"],
+        ),
+        (
+            {
+                "date_from": datetime(2025, 1, 1),
+                "date_to": datetime(2025, 2, 1),
+            },
+            ["financialrecords.date >=", "financialrecords.date <"],
+        ),
+    ],
+)
+async def test_get_financial_records_keyset(session, kwargs, expected_sql):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    session.execute.return_value = mock_result
+
+    await get_financial_records(session, user_id=123, **kwargs)
+
+    sql = str(session.execute.call_args.args[0])
+    assert "ORDER BY financialrecords.date, financialrecords.id" in sql
+    for fragment in expected_sql:
+        assert fragment in sql
+    if "limit" not in kwargs:
+        assert "LIMIT" not in sql
+
+
+@pytest.mark.asyncio
+async def test_get_financial_record_rows_selects_columns(session):
+    row = RecordRow("income", "Salary", 1000.0, datetime(2025, 1, 1), 1, 2)
+    mock_result = MagicMock()
+    mock_result.all.return_value = [row]
+    session.execute.return_value = mock_result
+
+    result = await get_financial_record_rows(
+        session, user_id=123, limit=50, after=(datetime(2025, 1, 1), 10)
+    )
+
+    assert result == [row]
+    sql = str(session.execute.call_args.args[0])
+    assert sql.startswith(
+        "SELECT financialrecords.type, financialrecords.description, "
+        "financialrecords.amount, financialrecords.date, "
+        "financialrecords.category_id, financialrecords.id \n"
+    )
+    assert "(financialrecords.date, financialrecords.id) >" in sql
+    assert "ORDER BY financialrecords.date, financialrecords.id" in sql
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("user_id", [123, 456, 789])
 async def test_get_financial_records_multiple_users(session, user_id):
@@ -135,7 +215,7 @@ async def test_get_financial_record(
 
 
 @pytest.mark.asyncio
-async def test_create_financial_record(session):
+async def test_create_financial_record(session, bump_data_version):
     session.commit = AsyncMock()
     session.refresh = AsyncMock()
     session.add = MagicMock()
@@ -158,74 +238,327 @@ async def test_create_financial_record(session):
     assert result.user_id == 42
     assert result.amount == data["amount"]
     session.add.assert_called_once()
+    session.execute.assert_awaited_once()
+    bump_data_version.assert_awaited_once_with(session, 42)
     session.commit.assert_awaited_once()
     session.refresh.assert_awaited_once()
 
 
+def returned_row(found):
+    mock_result = MagicMock()
+    mock_result.first.return_value = (
+        MagicMock(
+            user_id=123,
+            category_id=5,
+            type="income",
+            date=datetime(2025, 1, 1),
+            amount=100.0,
+        )
+        if found
+        else None
+    )
+    return mock_result
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("found", [True, False])
+async def test_update_financial_record(session, bump_data_version, found):
+    session.execute.return_value = returned_row(found)
+    update = FinancialRecordUpdate(
+        type="income",
+        description="Changed",
+        amount=500.0,
+        date=datetime(2025, 1, 1),
+        category_id=5,
+    )
+
+    result = await update_financial_record(
+        session,
+        financial_record_id=1,
+        user_id=123,
+        financial_record_update=update,
+    )
+
+    assert result is found
+    statements = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert "INSERT INTO monthlyrollups" in statements[0]
+    assert statements[1].startswith("UPDATE financialrecords")
+    assert "financialrecords.user_id = :user_id_1" in statements[1]
+    assert "RETURNING" in statements[1]
+    assert session.execute.await_count == (3 if found else 2)
+    assert bump_data_version.await_count == int(found)
+    assert session.commit.await_count == int(found)
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "update_data",
+    "partial_data, expected_set",
     [
-        {},
-        {"amount": 500.0},
-        {"description": "Changed", "amount": 123.45},
+        ({"description": "Only desc"}, "SET description="),
+        ({"amount": 1.5}, "SET amount="),
     ],
 )
-async def test_update_financial_record(
-    session, fake_financial_record, update_data
+async def test_update_financial_record_partial(
+    session, partial_data, expected_set
 ):
-    session.commit = AsyncMock()
-
-    default_data = {
-        "type": fake_financial_record.type,
-        "description": fake_financial_record.description,
-        "amount": fake_financial_record.amount,
-        "date": fake_financial_record.date,
-        "user_id": fake_financial_record.user_id,
-        "category_id": fake_financial_record.category_id,
-    }
-    default_data.update(update_data)
+    session.execute.return_value = returned_row(True)
 
-    update = FinancialRecordUpdate(**default_data)
-    updated = await update_financial_record(
-        session, fake_financial_record, update
+    result = await update_financial_record_partial(
+        session,
+        financial_record_id=1,
+        user_id=123,
+        financial_record_update=FinancialRecordUpdatePartial(**partial_data),
     )
 
-    for key, value in update_data.items():
-        assert getattr(updated, key) == value
+    assert result is True
+    update_stmt = str(session.execute.call_args_list[1].args[0])
+    assert expected_set in update_stmt
     session.commit.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize("found", [True, False])
+async def test_update_financial_record_partial_empty(session, found):
+    session.execute.return_value = MagicMock()
+    session.execute.return_value.first.return_value = (1,) if found else None
+
+    result = await update_financial_record_partial(
+        session,
+        financial_record_id=1,
+        user_id=123,
+        financial_record_update=FinancialRecordUpdatePartial(),
+    )
+
+    assert result is found
+    session.execute.assert_awaited_once()
+    assert str(session.execute.call_args.args[0]).startswith("SELECT")
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("found", [True, False])
+async def test_delete_financial_record(session, bump_data_version, found):
+    session.execute.return_value = returned_row(found)
+
+    result = await delete_financial_record(
+        session, financial_record_id=1, user_id=123
+    )
+
+    assert result is found
+    statements = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert statements[0].startswith("UPDATE financialrecords SET updated_at=")
+    assert "deleted_at=:deleted_at" in statements[0]
+    assert "financialrecords.deleted_at IS NULL" in statements[0]
+    assert "RETURNING" in statements[0]
+    if found:
+        assert "monthlyrollups" in statements[1]
+        assert session.execute.call_args.args[1]["amount"] == -100.0
+    assert session.execute.await_count == (2 if found else 1)
+    assert bump_data_version.await_count == int(found)
+    assert session.commit.await_count == int(found)
+
+
+@pytest.mark.asyncio
+async def test_get_financial_records_changed_since(
+    session, fake_financial_record
+):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = [fake_financial_record]
+    session.execute.return_value = mock_result
+
+    result = await get_financial_records_changed_since(
+        session, user_id=123, since=datetime(2025, 1, 1)
+    )
+
+    assert result == [fake_financial_record]
+    sql = str(session.execute.call_args.args[0])
+    assert "financialrecords.updated_at >" in sql
+    assert "deleted_at IS NULL" not in sql
+    assert sql.endswith(
+        "ORDER BY financialrecords.updated_at, financialrecords.id"
+    )
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
-    "partial_data",
+    "last_changes, expected",
     [
-        {},
-        {"description": "Only desc"},
-        {"description": "Desc", "type": "expense"},
+        ((None, None), None),
+        ((None, datetime(2025, 1, 1)), datetime(2025, 1, 1)),
+        ((datetime(2025, 2, 1), datetime(2025, 1, 1)), datetime(2025, 2, 1)),
     ],
 )
-async def test_update_financial_record_partial(
-    session, fake_financial_record, partial_data
+async def test_get_last_change(session, last_changes, expected):
+    session.execute.return_value = MagicMock()
+    session.execute.return_value.one.return_value = last_changes
+
+    assert await get_last_change(session, user_id=123) == expected
+    sql = str(session.execute.call_args.args[0])
+    assert "max(financialrecords.updated_at)" in sql
+    assert "max(categories.updated_at)" in sql
+
+
+@pytest.mark.asyncio
+async def test_get_financial_summary(session):
+    bounds = MagicMock()
+    bounds.one.return_value = (datetime(2025, 1, 1), datetime(2025, 1, 3))
+    by_type, by_category, by_day = MagicMock(), MagicMock(), MagicMock()
+    by_type.mappings.return_value.all.return_value = [
+        {"type": "expense", "amount": 30.0, "count": 3},
+    ]
+    by_category.mappings.return_value.all.return_value = [
+        {"category_id": 1, "type": "expense", "amount": 30.0, "count": 3},
+    ]
+    by_day.mappings.return_value.all.return_value = [
+        {"day": "2025-01-01", "type": "expense", "amount": 10.0},
+        {"day": "2025-01-03", "type": "expense", "amount": 20.0},
+    ]
+    session.execute.side_effect = [bounds, by_type, by_category, by_day]
+
+    result = await get_financial_summary(
+        session, user_id=123, category_ids=[1]
+    )
+
+    assert result["first_date"] == datetime(2025, 1, 1)
+    assert result["by_type"] == by_type.mappings.return_value.all()
+    assert result["daily_average"] == [{"type": "expense", "amount": 15.0}]
+    assert session.execute.await_count == 4
+    by_day_sql = str(session.execute.call_args_list[3].args[0])
+    assert "GROUP BY date(financialrecords.date)" in by_day_sql
+    assert "financialrecords.category_id IN" in by_day_sql
+
+
+@pytest.mark.asyncio
+async def test_get_monthly_totals(session):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = []
+    session.execute.return_value = mock_result
+
+    result = await get_monthly_totals(
+        session, user_id=123, month_from="2025-01", month_to="2025-06"
+    )
+
+    assert result == []
+    sql = str(session.execute.call_args.args[0])
+    assert "FROM monthlyrollups" in sql
+    assert "monthlyrollups.month >=" in sql
+    assert "monthlyrollups.month <=" in sql
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "owned_ids, expected",
+    [
+        ([1, 2, 3], set()),
+        ([1], {2, 3}),
+        ([], {1, 2, 3}),
+    ],
+)
+async def test_get_unknown_category_ids(session, owned_ids, expected):
+    mock_result = MagicMock()
+    mock_result.scalars.return_value.all.return_value = owned_ids
+    session.execute.return_value = mock_result
+
+    result = await get_unknown_category_ids(
+        session, category_ids={1, 2, 3}, user_id=123
+    )
+
+    assert result == expected
+    session.execute.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "count, batch_size, expected_batches",
+    [
+        (1, 500, 1),
+        (5, 2, 3),
+        (4, 2, 2),
+    ],
+)
+async def test_create_financial_records_bulk(
+    session, bump_data_version, count, batch_size, expected_batches
 ):
-    session.commit = AsyncMock()
+    records_in = [
+        FinancialRecordCreate(
+            type="expense",
+            description=f"Record {i}",
+            amount=10.0,
+            date=datetime(2025, 5, 5),
+            category_id=1,
+        )
+        for i in range(count)
+    ]
+    batch_results = []
+    for start in range(0, count, batch_size):
+        mock_result = MagicMock()
+        mock_result.scalars.return_value.all.return_value = list(
+            range(start + 1, min(start + batch_size, count) + 1)
+        )
+        batch_results.append(mock_result)
+    owned_categories = MagicMock()
+    owned_categories.scalars.return_value.all.return_value = [1]
+    session.execute.side_effect = (
+        [owned_categories] + batch_results + [MagicMock()]
+    )
 
-    update = FinancialRecordUpdatePartial(**partial_data)
-    updated = await update_financial_record_partial(
-        session, fake_financial_record, update
+    ids = await create_financial_records_bulk(
+        session, records_in, user_id=42, batch_size=batch_size
     )
 
-    for key, value in partial_data.items():
-        assert getattr(updated, key) == value
+    assert ids == list(range(1, count + 1))
+    insert_calls = session.execute.call_args_list[1:][:expected_batches]
+    assert all(call.args[1][0]["user_id"] == 42 for call in insert_calls)
+    assert session.execute.await_count == expected_batches + 2
+    bump_data_version.assert_awaited_once_with(session, 42)
     session.commit.assert_awaited_once()
 
 
 @pytest.mark.asyncio
-async def test_delete_financial_record(session, fake_financial_record):
-    session.delete = AsyncMock()
-    session.commit = AsyncMock()
+async def test_create_financial_records_bulk_checks_categories(session):
+    owned_categories = MagicMock()
+    owned_categories.scalars.return_value.all.return_value = [1]
+    session.execute.return_value = owned_categories
+    records_in = [
+        FinancialRecordCreate(
+            type="expense",
+            description="Record",
+            amount=10.0,
+            date=datetime(2025, 5, 5),
+            category_id=category_id,
+        )
+        for category_id in (1, 3, 2)
+    ]
+
+    with pytest.raises(UnknownCategoriesError) as error:
+        await create_financial_records_bulk(session, records_in, user_id=42)
+
+    assert error.value.category_ids == [2, 3]
+    session.execute.assert_awaited_once()
+    session.commit.assert_not_awaited()
 
-    await delete_financial_record(session, fake_financial_record)
 
-    session.delete.assert_awaited_once_with(fake_financial_record)
-    session.commit.assert_awaited_once()
+@pytest.mark.asyncio
+async def test_stream_financial_records(session):
+    async def partitions():
+        yield [("row", 1), ("row", 2)]
+        yield [("row", 3)]
+
+    mock_result = MagicMock()
+    mock_result.partitions.side_effect = partitions
+    session.stream.return_value = mock_result
+
+    batches = [
+        batch
+        async for batch in stream_financial_records(
+            session, user_id=123, category_ids=[5], batch_size=2
+        )
+    ]
+
+    assert batches == [[("row", 1), ("row", 2)], [("row", 3)]]
+    stmt = session.stream.call_args.args[0]
+    assert stmt.get_execution_options()["yield_per"] == 2
+    sql = str(stmt)
+    assert "JOIN categories" in sql
+    assert "financialrecords.category_id IN" in sql
+    assert "ORDER BY financialrecords.date, financialrecords.id" in sql
@@ -0,0 +1,150 @@
+import json
+from datetime import datetime
+
+import msgpack
+import pyarrow as pa
+import pytest
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from app.api.financial_records.crud import RecordRow
+from app.api.financial_records.encoders import (
+    ARROW_MEDIA_TYPE,
+    RECORD_FIELDS,
+    encode_records,
+    encode_rows,
+    encode_rows_arrow,
+    encode_rows_msgpack,
+    encoded_response,
+)
+from app.api.financial_records.schemas import FinancialRecord as RecordSchema
+from app.database.models import FinancialRecord, TypeFinanceRecord
+
+
+def make_record(**fields) -> FinancialRecord:
+    return FinancialRecord(
+        **{
+            "id": 1,
+            "type": TypeFinanceRecord.expense,
+            "description": "Coffee",
+            "amount": 3.5,
+            "date": datetime(2025, 1, 1),
+            "category_id": 2,
+            "user_id": 3,
+            **fields,
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {},
+        {"type": TypeFinanceRecord.income, "amount": 1000.0},
+        {"date": datetime(2025, 5, 5, 15, 30, 12, 345678)},
+        {"date": datetime(2025, 5, 5, 15, 30, 12, 5)},
+        {"description": 'Café "Zoe"\n', "amount": 0.1 + 0.2},
+        {"amount": 1e16},
+    ],
+)
+def test_encode_records_matches_response_model(fields):
+    records = [make_record(**fields), make_record(id=2)]
+    adapter = TypeAdapter(list[RecordSchema])
+
+    expected = adapter.dump_json(
+        adapter.validate_python(records, from_attributes=True)
+    )
+
+    assert json.loads(encode_records(records)) == json.loads(expected)
+
+
+def test_encode_reads_attributes_missing_from_instance_dict():
+    class Record:
+        type = TypeFinanceRecord.income
+        description = "Salary"
+        amount = 10.0
+        date = datetime(2025, 1, 1)
+        category_id = 2
+
+        @property
+        def id(self):
+            return 5
+
+    assert json.loads(encode_records([Record()])) == [
+        {
+            "type": "income",
+            "description": "Salary",
+            "amount": 10.0,
+            "date": "2025-01-01T00:00:00",
+            "category_id": 2,
+            "id": 5,
+        }
+    ]
+
+
+def test_encode_no_records():
+    assert encode_records([]) == b"[]"
+
+
+def test_encode_rows_like_records():
+    record = make_record(date=datetime(2025, 5, 5, 15, 30, 12, 345678))
+    row = RecordRow(*(getattr(record, field) for field in RECORD_FIELDS))
+
+    assert RecordRow._fields == RECORD_FIELDS
+    assert encode_rows([row]) == encode_records([record])
+
+
+def make_row(record_id: int) -> RecordRow:
+    return RecordRow(
+        type=TypeFinanceRecord.expense,
+        description="Coffee",
+        amount=3.5,
+        date=datetime(2025, 5, 5, 15, 30, 12, record_id),
+        category_id=2,
+        id=record_id,
+    )
+
+
+def test_encode_rows_arrow():
+    rows = [make_row(1), make_row(2)]
+
+    table = pa.ipc.open_stream(encode_rows_arrow(rows)).read_all()
+
+    assert table.column_names == list(RECORD_FIELDS)
+    assert table.to_pylist() == [
+        {**row._asdict(), "type": "expense"} for row in rows
+    ]
+
+
+def test_encode_no_rows_arrow():
+    table = pa.ipc.open_stream(encode_rows_arrow([])).read_all()
+
+    assert table.num_rows == 0
+    assert table.column_names == list(RECORD_FIELDS)
+
+
+def test_encode_rows_msgpack_like_json():
+    rows = [make_row(1), make_row(2)]
+
+    assert msgpack.unpackb(encode_rows_msgpack(rows)) == json.loads(
+        encode_rows(rows)
+    )
+
+
+def test_encoded_response_keeps_headers():
+    response = Response()
+    response.headers["ETag"] = '"1-2"'
+    response.headers["X-Next-Cursor"] = "abc"
+
+    encoded = encoded_response(encode_records([make_record()]), response)
+
+    assert encoded.media_type == "application/json"
+    assert encoded.headers["ETag"] == '"1-2"'
+    assert encoded.headers["X-Next-Cursor"] == "abc"
+    assert encoded.headers["Content-Length"] == str(len(encoded.body))
+
+
+def test_encoded_response_media_type():
+    encoded = encoded_response(b"", Response(), ARROW_MEDIA_TYPE)
+
+    assert encoded.headers["Content-Type"] == ARROW_MEDIA_TYPE
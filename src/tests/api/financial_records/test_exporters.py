@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import msgpack
+import pyarrow as pa
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.api.financial_records import exporters
+from app.database.models import TypeFinanceRecord
+
+
+def make_row(record_id):
+    return SimpleNamespace(
+        id=record_id,
+        date=datetime(2025, 1, record_id),
+        type=TypeFinanceRecord.expense,
+        category_id=5,
+        category_name="Food",
+        description='Lunch, "cafe"',
+        amount=12.5,
+    )
+
+
+def test_format_csv():
+    text = exporters.format_csv([make_row(1)], header=True)
+
+    assert list(csv.reader(io.StringIO(text))) == [
+        list(exporters.EXPORT_COLUMNS),
+        ["1", "2025-01-01T00:00:00", "expense", "5", "Food"]
+        + ['Lunch, "cafe"', "12.5"],
+    ]
+
+
+def test_format_ndjson():
+    text = exporters.format_ndjson([make_row(1), make_row(2)])
+
+    rows = [json.loads(line) for line in text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2]
+    assert rows[0]["type"] == "expense"
+    assert rows[0]["date"] == "2025-01-01T00:00:00"
+
+
+def test_format_msgpack():
+    data = exporters.format_msgpack([make_row(1), make_row(2)])
+
+    rows = list(msgpack.Unpacker(io.BytesIO(data)))
+    assert [row["id"] for row in rows] == [1, 2]
+    assert rows[0]["type"] == "expense"
+    assert rows[0]["date"] == "2025-01-01T00:00:00"
+
+
+def test_format_arrow_stream():
+    rows = [make_row(1), make_row(2)]
+    data = b"".join(
+        [
+            exporters.format_arrow([], header=True),
+            exporters.format_arrow(rows),
+            exporters.format_arrow([]),
+            exporters.format_arrow([make_row(3)]),
+            exporters.ARROW_END,
+        ]
+    )
+
+    table = pa.ipc.open_stream(data).read_all()
+
+    assert table.schema == exporters.EXPORT_SCHEMA
+    assert table.column("id").to_pylist() == [1, 2, 3]
+    assert table.column("type").to_pylist() == ["expense"] * 3
+    assert table.column("date").to_pylist()[0] == datetime(2025, 1, 1)
+
+
+def test_export_formats_default_to_csv():
+    assert next(iter(exporters.EXPORT_FORMATS)) == "text/csv"
+    assert set(exporters.EXPORT_FORMATS.values()) == set(exporters.FORMATTERS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "export_format, expected_chunks",
+    [("csv", 3), ("ndjson", 2)],
+)
+async def test_stream_export(monkeypatch, export_format, expected_chunks):
+    async def stream_financial_records(session, user_id, **filters):
+        assert user_id == 42
+        assert filters == {"date_from": None}
+        yield [make_row(1), make_row(2)]
+        yield [make_row(3)]
+
+    monkeypatch.setattr(
+        exporters.crud, "stream_financial_records", stream_financial_records
+    )
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = AsyncMock()
+
+    chunks = [
+        chunk
+        async for chunk in exporters.stream_export(
+            session_factory, export_format, user_id=42, date_from=None
+        )
+    ]
+
+    assert len(chunks) == expected_chunks
+    assert "".join(chunks).count("\n") == 3 + (export_format == "csv")
+
+
+@pytest.mark.asyncio
+async def test_stream_export_arrow(monkeypatch):
+    async def stream_financial_records(session, user_id, **filters):
+        yield [make_row(1), make_row(2)]
+        yield [make_row(3)]
+
+    monkeypatch.setattr(
+        exporters.crud, "stream_financial_records", stream_financial_records
+    )
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = AsyncMock()
+
+    chunks = [
+        chunk
+        async for chunk in exporters.stream_export(
+            session_factory, "arrow", user_id=42
+        )
+    ]
+
+    assert len(chunks) == 4
+    assert pa.ipc.open_stream(b"".join(chunks)).read_all().num_rows == 3
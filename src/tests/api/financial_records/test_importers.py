@@ -0,0 +1,167 @@
+import io
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from app.api.financial_records import importers
+
+CATEGORIES = {"food": 1, "other": 2}
+
+
+@pytest.mark.parametrize(
+    "filename, expected",
+    [
+        ("statement.csv", "csv"),
+        ("STATEMENT.OFX", "ofx"),
+        ("statement.qfx", "ofx"),
+        ("statement.xlsx", None),
+        (None, None),
+    ],
+)
+def test_detect_format(filename, expected):
+    assert importers.detect_format(filename) == expected
+
+
+def test_iter_csv_rows():
+    stream = io.BytesIO(
+        "﻿Date, Amount ,Description\n"
+        "2025-01-01,-10,Coffee\n"
+        "2025-01-02,20,Refund\n".encode()
+    )
+
+    rows = list(importers.iter_csv_rows(stream))
+
+    assert rows == [
+        (2, {"date": "2025-01-01", "amount": "-10", "description": "Coffee"}),
+        (3, {"date": "2025-01-02", "amount": "20", "description": "Refund"}),
+    ]
+    assert not stream.closed
+
+
+@pytest.mark.parametrize("block_size", [7, 64 * 1024])
+def test_iter_ofx_transactions(monkeypatch, block_size):
+    monkeypatch.setattr(importers, "READ_BLOCK_SIZE", block_size)
+    stream = io.BytesIO(
+        b"OFXHEADER:100\n<OFX><BANKTRANLIST>\n"
+        b"<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20250105\n"
+        b"<TRNAMT>-12.50\n<NAME>Grocery store\n</STMTTRN>\n"
+        b"<STMTTRN><DTPOSTED>20250106093000.000[-5:EST]</DTPOSTED>"
+        b"<TRNAMT>100</TRNAMT><MEMO>Salary</MEMO></STMTTRN>"
+        b"</BANKTRANLIST></OFX>"
+    )
+
+    transactions = list(importers.iter_ofx_transactions(stream))
+
+    assert transactions == [
+        (
+            1,
+            {
+                "TRNTYPE": "DEBIT",
+                "DTPOSTED": "20250105",
+                "TRNAMT": "-12.50",
+                "NAME": "Grocery store",
+            },
+        ),
+        (
+            2,
+            {
+                "DTPOSTED": "20250106093000.000[-5:EST]",
+                "TRNAMT": "100",
+                "MEMO": "Salary",
+            },
+        ),
+    ]
+
+
+@pytest.mark.parametrize(
+    "row, expected_type, expected_category",
+    [
+        ({"date": "2025-01-01", "amount": "-10"}, "expense", 2),
+        ({"date": "2025-01-01", "amount": "10"}, "income", 2),
+        (
+            {"date": "2025-01-01", "amount": "10", "type": "Expense"},
+            "expense",
+            2,
+        ),
+        (
+            {"date": "2025-01-01", "amount": "-1", "category": " FOOD "},
+            "expense",
+            1,
+        ),
+        (
+            {"date": "2025-01-01", "amount": "-1", "category_id": "1"},
+            "expense",
+            1,
+        ),
+    ],
+)
+def test_csv_row_to_record(row, expected_type, expected_category):
+    record = importers.csv_row_to_record(row, CATEGORIES, 2)
+
+    assert record.type.value == expected_type
+    assert record.amount == abs(float(row["amount"]))
+    assert record.category_id == expected_category
+
+
+@pytest.mark.parametrize(
+    "row, default_category_id, error",
+    [
+        ({"amount": "1"}, 2, KeyError),
+        ({"date": "2025-01-01", "amount": "x"}, 2, ValueError),
+        ({"date": "yesterday", "amount": "1"}, 2, ValueError),
+        ({"date": "2025-01-01", "amount": "1", "category": "Pets"}, 2, None),
+        ({"date": "2025-01-01", "amount": "1", "category_id": "9"}, 2, None),
+        ({"date": "2025-01-01", "amount": "1"}, None, None),
+        ({"date": "2025-01-01", "amount": "1", "type": "gift"}, 2, None),
+    ],
+)
+def test_csv_row_to_record_invalid(row, default_category_id, error):
+    with pytest.raises(error or ValueError):
+        importers.csv_row_to_record(row, CATEGORIES, default_category_id)
+
+
+def test_ofx_transaction_to_record():
+    record = importers.ofx_transaction_to_record(
+        {"DTPOSTED": "20250106093000.000[-5:EST]", "TRNAMT": "-7.5"},
+        default_category_id=2,
+    )
+
+    assert record.type.value == "expense"
+    assert record.amount == 7.5
+    assert record.date == datetime(2025, 1, 6, 9, 30)
+    assert record.category_id == 2
+
+
+@pytest.mark.asyncio
+async def test_import_statement():
+    writer = MagicMock()
+    writer.run = AsyncMock(side_effect=lambda op, chunk, user_id: chunk)
+    lines = ["date,amount"] + [f"2025-01-01,{i}" for i in range(5)]
+    lines.insert(3, "2025-01-01,oops")
+    stream = io.BytesIO("\n".join(lines).encode())
+
+    events = [
+        event
+        async for event in importers.import_statement(
+            writer,
+            stream,
+            statement_format="csv",
+            user_id=42,
+            categories=CATEGORIES,
+            default_category_id=2,
+            chunk_size=4,
+        )
+    ]
+
+    assert [
+        (e["event"], e["rows"], e["inserted"], e["failed"]) for e in events
+    ] == [("progress", 4, 3, 1), ("done", 6, 5, 1)]
+    assert events[0]["errors"] == [
+        {"row": 4, "error": "could not convert string to float: 'oops'"}
+    ]
+    assert events[1]["errors"] == []
+    assert writer.run.await_count == 2
+    assert all(
+        call.args[0] is importers.crud.create_financial_records_bulk
+        for call in writer.run.call_args_list
+    )
@@ -0,0 +1,40 @@
+import pytest
+
+from app.api.financial_records.utils import negotiate_media_type
+
+MEDIA_TYPES = [
+    "application/json",
+    "application/vnd.apache.arrow.stream",
+    "application/msgpack",
+]
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, "application/json"),
+        ("", "application/json"),
+        ("*/*", "application/json"),
+        ("application/*", "application/json"),
+        ("application/msgpack", "application/msgpack"),
+        ("Application/MsgPack", "application/msgpack"),
+        (
+            "application/vnd.apache.arrow.stream, application/json;q=0.5",
+            "application/vnd.apache.arrow.stream",
+        ),
+        (
+            "application/json;q=0.5, application/msgpack",
+            "application/msgpack",
+        ),
+        (
+            "application/json;q=0, */*;q=0.1",
+            "application/vnd.apache.arrow.stream",
+        ),
+        ("application/json;q=bad, application/msgpack", "application/msgpack"),
+        ("text/html", None),
+        ("application/json;q=0", None),
+        ("text/*, application/*;q=0", None),
+    ],
+)
+def test_negotiate_media_type(accept, expected):
+    assert negotiate_media_type(accept, MEDIA_TYPES) == expected
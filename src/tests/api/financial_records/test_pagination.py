@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime
+from fastapi import HTTPException
+
+from app.api.financial_records.pagination import (
+    decode_changes_cursor,
+    decode_cursor,
+    encode_changes_cursor,
+    encode_cursor,
+)
+
+
+@pytest.mark.parametrize(
+    "date, record_id",
+    [
+        (datetime(2025, 1, 1), 1),
+        (datetime(2025, 5, 5, 15, 30, 12, 345678), 987654),
+    ],
+)
+def test_cursor_round_trip(date, record_id):
+    cursor = encode_cursor(date, record_id)
+
+    assert decode_cursor(cursor) == (date, record_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "MjAyNXwx"])
+def test_decode_invalid_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
+
+
+def test_changes_cursor_round_trip():
+    updated_at = datetime(2026, 10, 18, 11, 30, 52, 604113)
+
+    assert decode_changes_cursor(encode_changes_cursor(updated_at)) == (
+        updated_at
+    )
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "", "MjAyNXwx"])
+def test_decode_invalid_changes_cursor(cursor):
+    with pytest.raises(HTTPException) as exc_info:
+        decode_changes_cursor(cursor)
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,121 @@
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import sqlite
+
+from app.database.models import FinancialRecord
+from app.api.financial_records import rollups
+
+
+@pytest.fixture
+def session():
+    return AsyncMock()
+
+
+@pytest.fixture
+def fake_financial_record():
+    return FinancialRecord(
+        id=1,
+        type="expense",
+        description="Test record",
+        amount=40.0,
+        date=datetime(2025, 3, 14, 9, 30),
+        user_id=123,
+        category_id=5,
+    )
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        (datetime(2025, 1, 1), "2025-01"),
+        (datetime(2024, 12, 31, 23, 59), "2024-12"),
+    ],
+)
+def test_month_of(date, expected):
+    assert rollups.month_of(date) == expected
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sign", [1, -1])
+async def test_apply_record(session, fake_financial_record, sign):
+    await rollups.apply_record(session, fake_financial_record, sign=sign)
+
+    session.execute.assert_awaited_once()
+    stmt, params = session.execute.call_args.args
+    assert "ON CONFLICT" in str(stmt.compile(dialect=sqlite.dialect()))
+    assert params["month"] == "2025-03"
+    assert params["amount"] == sign * 40.0
+    assert params["count"] == sign
+
+
+@pytest.mark.asyncio
+async def test_remove_stored_record(session):
+    await rollups.remove_stored_record(
+        session, financial_record_id=1, user_id=123
+    )
+
+    session.execute.assert_awaited_once()
+    sql = str(
+        session.execute.call_args.args[0].compile(dialect=sqlite.dialect())
+    )
+    assert "INSERT INTO monthlyrollups" in sql
+    assert "FROM financialrecords" in sql
+    assert "WHERE id = ? AND user_id = ?" in sql
+    assert session.execute.call_args.args[1] == {
+        "financial_record_id": 1,
+        "user_id": 123,
+    }
+    assert "ON CONFLICT" in sql
+
+
+@pytest.mark.asyncio
+async def test_apply_rows(session):
+    rows = [
+        {
+            "user_id": 1,
+            "category_id": 2,
+            "type": "expense",
+            "date": datetime(2025, 1, day),
+            "amount": 10.0,
+        }
+        for day in (1, 2, 3)
+    ] + [
+        {
+            "user_id": 1,
+            "category_id": 2,
+            "type": "expense",
+            "date": datetime(2025, 2, 1),
+            "amount": 5.0,
+        }
+    ]
+
+    await rollups.apply_rows(session, rows)
+
+    session.execute.assert_awaited_once()
+    deltas = session.execute.call_args.args[1]
+    assert sorted((d["month"], d["amount"], d["count"]) for d in deltas) == [
+        ("2025-01", 30.0, 3),
+        ("2025-02", 5.0, 1),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_apply_rows_empty(session):
+    await rollups.apply_rows(session, [])
+
+    session.execute.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rollups(session):
+    session.execute.return_value = MagicMock()
+
+    await rollups.rebuild_rollups(session)
+
+    statements = [str(c.args[0]) for c in session.execute.call_args_list]
+    assert statements[0].startswith("DELETE FROM monthlyrollups")
+    assert statements[1].startswith("INSERT INTO monthlyrollups")
+    assert "GROUP BY" in statements[1]
+    assert "FROM archivedpartitions" in statements[2]
+    session.commit.assert_awaited_once()
@@ -0,0 +1,57 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.metrics import router
+from app.api.users.claims_cache import claims_cache
+from app.api.users.password_pool import password_pool
+from app.redis.cache import cache
+from app.redis.metrics import CommandMetrics
+from app.redis.redis_helper import redis_helper
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_metrics_report_claims_cache(client):
+    claims_cache.get("unknown token")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["claims_cache"] == claims_cache.snapshot()
+    assert claims_cache.snapshot()["misses"] >= 1
+
+
+def test_metrics_report_password_pool(client):
+    response = client.get("/metrics")
+
+    assert response.json()["password_pool"] == password_pool.snapshot()
+
+
+def test_metrics_report_redis_commands_and_breaker(client, mocker):
+    mocker.patch.object(redis_helper, "metrics", CommandMetrics())
+    redis_helper.metrics.observe("GET", 0.003, failed=False)
+
+    response = client.get("/metrics")
+
+    assert response.json()["redis"] == {
+        "breaker": {
+            "state": redis_helper.breaker.state,
+            "failures": redis_helper.breaker.failures,
+            "trips": redis_helper.breaker.trips,
+        },
+        "commands": {
+            "GET": {"calls": 1, "errors": 0, "p50_ms": 5.0, "p99_ms": 5.0}
+        },
+    }
+
+
+def test_metrics_report_read_cache(client):
+    response = client.get("/metrics")
+
+    assert response.json()["cache"] == cache.snapshot()
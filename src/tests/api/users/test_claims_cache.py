@@ -0,0 +1,105 @@
+import time
+
+import pytest
+
+from app.api.users import claims_cache as claims_cache_module
+from app.api.users.claims_cache import ClaimsCache, claims_cache
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Base, User
+
+
+@pytest.fixture
+def cache():
+    return ClaimsCache(maxsize=2, ttl=60)
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch.object(
+        claims_cache_module.time, "monotonic", side_effect=lambda: now[0]
+    )
+    return now
+
+
+def test_get_counts_hits_and_misses(cache):
+    assert cache.get("token") is None
+    cache.put("token", 1, "user")
+
+    assert cache.get("token") == (1, "user", cache.get("token").expires_at)
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.snapshot() == {
+        "size": 1,
+        "maxsize": 2,
+        "hits": 2,
+        "misses": 1,
+    }
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", 1, "a")
+    cache.put("b", 2, "b")
+    cache.get("a")
+    cache.put("c", 3, "c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert len(cache) == 2
+
+
+@pytest.mark.parametrize(
+    "exp_in, expired_after",
+    [
+        (None, 60),
+        (3600, 60),
+        (10, 10),
+    ],
+)
+def test_entries_expire(cache, clock, exp_in, expired_after):
+    exp = time.time() + exp_in if exp_in is not None else None
+    cache.put("token", 1, "user", exp)
+
+    clock[0] += expired_after - 1
+    assert cache.get("token") is not None
+    clock[0] += 2
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_invalidate(cache):
+    cache.put("a", 1, "user")
+    cache.put("b", 1, "user")
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+    cache.invalidate_user(1)
+    assert cache.get("b") is None
+    assert len(cache) == 0
+
+
+def test_disabled_with_zero_maxsize():
+    cache = ClaimsCache(maxsize=0, ttl=60)
+    cache.put("token", 1, "user")
+
+    assert cache.get("token") is None
+
+
+@pytest.mark.asyncio
+async def test_user_deletion_invalidates(tmp_path):
+    helper = DatabaseHelper(url=f"sqlite+aiosqlite:///{tmp_path / 'db'}")
+    async with helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with helper.session_factory() as session:
+        user = User(username="user", hashed_password=b"-")
+        session.add(user)
+        await session.commit()
+        claims_cache.put("token", user.id, user.username)
+
+        await session.delete(user)
+        await session.commit()
+    await helper.dispose()
+
+    assert claims_cache.get("token") is None
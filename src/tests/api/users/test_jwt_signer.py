@@ -0,0 +1,114 @@
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+from app.api.users import utils
+from app.api.users.jwt_signer import JWTSigner
+from app.config import AuthJWT
+
+PRIVATE_KEYS = {
+    "RS256": lambda: rsa.generate_private_key(65537, 2048),
+    "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+    "EdDSA": ed25519.Ed25519PrivateKey.generate,
+}
+
+
+def write_key_pair(directory, name, private_key):
+    private_path = directory / f"{name}-private.pem"
+    public_path = directory / f"{name}-public.pem"
+    private_path.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_path.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return private_path, public_path
+
+
+@pytest.mark.parametrize("algorithm", PRIVATE_KEYS)
+def test_round_trip_from_settings(tmp_path, algorithm):
+    private_path, public_path = write_key_pair(
+        tmp_path, "jwt", PRIVATE_KEYS[algorithm]()
+    )
+    signer = JWTSigner.from_settings(
+        AuthJWT(
+            private_key_path=private_path,
+            public_key_path=public_path,
+            algorithm=algorithm,
+            key_id="k1",
+        )
+    )
+
+    token = utils.encode_jwt({"sub": "user", "user_id": 1}, signer=signer)
+
+    assert jwt.get_unverified_header(token)["alg"] == algorithm
+    assert jwt.get_unverified_header(token)["kid"] == "k1"
+    assert utils.decode_jwt(token, signer=signer)["user_id"] == 1
+
+
+def test_settings_algorithm_must_match_key(tmp_path):
+    private_path, public_path = write_key_pair(
+        tmp_path, "jwt", PRIVATE_KEYS["EdDSA"]()
+    )
+
+    with pytest.raises(ValueError):
+        JWTSigner.from_settings(
+            AuthJWT(
+                private_key_path=private_path,
+                public_key_path=public_path,
+                algorithm="RS256",
+            )
+        )
+
+
+def test_rotation_by_key_id():
+    old_key, new_key = PRIVATE_KEYS["ES256"](), PRIVATE_KEYS["EdDSA"]()
+    old_signer = JWTSigner(old_key, "old", {})
+    old_token = old_signer.encode({"sub": "user"})
+    new_signer = JWTSigner(new_key, "new", {"old": old_key.public_key()})
+
+    assert new_signer.decode(old_token) == {"sub": "user"}
+    assert new_signer.decode(new_signer.encode({"sub": "a"})) == {"sub": "a"}
+    with pytest.raises(jwt.InvalidTokenError):
+        JWTSigner(new_key, "new", {}).decode(old_token)
+
+
+def test_token_without_key_id_is_verified_with_current_key():
+    key = PRIVATE_KEYS["RS256"]()
+    token = jwt.encode({"sub": "user"}, key, algorithm="RS256")
+
+    assert JWTSigner(key, "1", {}).decode(token) == {"sub": "user"}
+
+
+def test_rejects_algorithm_other_than_key_algorithm():
+    token = jwt.encode(
+        {"sub": "user"},
+        PRIVATE_KEYS["RS256"](),
+        algorithm="RS256",
+        headers={"kid": "1"},
+    )
+
+    with pytest.raises(jwt.InvalidTokenError):
+        JWTSigner(PRIVATE_KEYS["EdDSA"](), "1", {}).decode(token)
+
+
+def test_rejects_unsupported_key():
+    with pytest.raises(ValueError):
+        JWTSigner(ec.generate_private_key(ec.SECP384R1()), "1", {})
+
+
+def test_remembers_key_of_token_header(mocker):
+    signer = JWTSigner(PRIVATE_KEYS["ES256"](), "1", {})
+    tokens = [signer.encode({"user_id": i}) for i in range(3)]
+    get_header = mocker.spy(jwt, "get_unverified_header")
+
+    assert [signer.decode(token)["user_id"] for token in tokens] == [0, 1, 2]
+    assert get_header.call_count == 1
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.api.users.password_pool import PasswordPool, PasswordPoolSaturated
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordPool(max_workers=2, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_runs_in_worker_thread(pool):
+    thread = await pool.run(lambda: threading.current_thread().name)
+
+    assert thread.startswith("password")
+    assert (pool.in_flight, pool.completed) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_rejects_calls_over_workers_and_queue(pool):
+    release = threading.Event()
+    admitted = [asyncio.create_task(pool.run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    with pytest.raises(PasswordPoolSaturated):
+        await pool.run(release.wait)
+    assert (pool.in_flight, pool.queue_depth) == (3, 1)
+
+    release.set()
+    assert await asyncio.gather(*admitted) == [True] * 3
+    assert (pool.rejected, pool.completed, pool.max_queue_depth) == (1, 3, 1)
+    assert await pool.run(release.wait)
+
+
+@pytest.mark.asyncio
+async def test_propagates_errors(pool):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await pool.run(fail)
+    assert (pool.in_flight, pool.completed, pool.failed) == (0, 0, 1)
+
+
+async def wait_until_idle(pool):
+    for _ in range(100):
+        if not pool.in_flight:
+            return
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_calls_stay_in_flight_until_done(pool):
+    release = threading.Event()
+    calls = [asyncio.create_task(pool.run(release.wait)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    for call in calls:
+        call.cancel()
+    await asyncio.gather(*calls, return_exceptions=True)
+    await asyncio.sleep(0)
+    # The queued call never starts; the running ones hold their threads.
+    assert (pool.in_flight, pool.failed) == (2, 1)
+
+    release.set()
+    await wait_until_idle(pool)
+    assert (pool.in_flight, pool.completed, pool.failed) == (0, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_snapshot(pool):
+    await pool.run(lambda: None)
+
+    assert pool.snapshot() == {
+        "max_workers": 2,
+        "max_queue": 1,
+        "in_flight": 0,
+        "queue_depth": 0,
+        "max_queue_depth": 0,
+        "completed": 1,
+        "failed": 0,
+        "rejected": 0,
+    }
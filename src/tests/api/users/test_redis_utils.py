@@ -1,69 +1,98 @@
+import asyncio
+
+import fakeredis
 import pytest
-from unittest.mock import AsyncMock
-from datetime import timedelta
+from redis.exceptions import ConnectionError
+
 from app.api.users import redis_utils
+from app.redis.circuit_breaker import CircuitBreaker
 
 
-@pytest.fixture
-def mock_redis():
-    return AsyncMock()
+@pytest.fixture(autouse=True)
+def fake_redis(mocker):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    mocker.patch.object(redis_utils.redis_helper, "redis_client", client)
+    mocker.patch.object(
+        redis_utils.redis_helper, "breaker", CircuitBreaker(5, 10)
+    )
+    mocker.patch.object(
+        redis_utils, "local_throttle", redis_utils.LocalThrottle()
+    )
+    return client
 
 
-@pytest.fixture(autouse=True)
-def setup_redis_mock(mock_redis):
-    redis_utils.redis_helper.redis_client = mock_redis
-
-
-@pytest.mark.parametrize(
-    "attempts, ttl_called",
-    [
-        (1, True),
-        (2, False),
-        (5, False),
-    ],
-)
 @pytest.mark.asyncio
-async def test_increment_failed_attempts(mock_redis, attempts, ttl_called):
+async def test_record_failed_attempt_counts_within_window(fake_redis):
     username = "test_user"
-    mock_redis.incr.return_value = attempts
-
-    result = await redis_utils.increment_failed_attempts(username)
 
-    assert result == attempts
-    mock_redis.incr.assert_awaited_once_with(f"failed_attempts:{username}")
+    assert await redis_utils.record_failed_attempt(username) == 1
+    assert await redis_utils.record_failed_attempt(username) == 2
 
-    if ttl_called:
-        mock_redis.expire.assert_awaited_once_with(
-            f"failed_attempts:{username}", 300
-        )
-    else:
-        mock_redis.expire.assert_not_awaited()
+    ttl = await fake_redis.ttl(f"failed_attempts:{username}")
+    assert 0 < ttl <= redis_utils.FAILED_ATTEMPTS_TTL
+    assert not await redis_utils.is_account_locked(username)
 
 
 @pytest.mark.asyncio
-async def test_lock_account(mock_redis):
+async def test_record_failed_attempt_locks_at_limit(fake_redis):
     username = "locked_user"
 
-    await redis_utils.lock_account(username)
+    results = [
+        await redis_utils.record_failed_attempt(username)
+        for _ in range(redis_utils.MAX_FAILED_ATTEMPTS + 1)
+    ]
+
+    assert results == [1, 2, 3, 4, 5, redis_utils.LOCKED]
+    assert await redis_utils.is_account_locked(username)
+    ttl = await fake_redis.ttl(f"locked:{username}")
+    assert 0 < ttl <= redis_utils.LOCK_TTL
 
-    mock_redis.set.assert_awaited_once_with(
-        f"locked:{username}", "true", ex=timedelta(minutes=5)
+
+@pytest.mark.asyncio
+async def test_concurrent_failed_attempts_lock_once():
+    results = await asyncio.gather(
+        *[redis_utils.record_failed_attempt("user") for _ in range(20)]
     )
 
+    assert sorted(results) == [redis_utils.LOCKED] * 15 + [1, 2, 3, 4, 5]
 
-@pytest.mark.parametrize(
-    "redis_return, expected",
-    [
-        ("true", True),
-        (None, False),
-    ],
-)
+
+@pytest.mark.parametrize("locked, expected", [(True, True), (False, False)])
 @pytest.mark.asyncio
-async def test_is_account_locked(mock_redis, redis_return, expected):
-    username = "test_user"
-    mock_redis.get.return_value = redis_return
+async def test_is_account_locked(fake_redis, locked, expected):
+    if locked:
+        await fake_redis.set("locked:test_user", "true")
+
+    assert await redis_utils.is_account_locked("test_user") == expected
+
+
+@pytest.mark.asyncio
+async def test_throttles_locally_while_redis_is_down(fake_redis, mocker):
+    mocker.patch.object(
+        fake_redis, "execute_command", side_effect=ConnectionError
+    )
+
+    results = [
+        await redis_utils.record_failed_attempt("user")
+        for _ in range(redis_utils.MAX_FAILED_ATTEMPTS + 1)
+    ]
 
-    result = await redis_utils.is_account_locked(username)
+    assert results == [1, 2, 3, 4, 5, redis_utils.LOCKED]
+    assert await redis_utils.is_account_locked("user")
+    assert not await redis_utils.is_account_locked("other")
+    assert redis_utils.redis_helper.breaker.state == "open"
 
-    assert result == expected
-    mock_redis.get.assert_awaited_once_with(f"locked:{username}")
+
+def test_local_throttle_expires_counters(mocker):
+    now = [1000.0]
+    mocker.patch.object(
+        redis_utils.time, "monotonic", side_effect=lambda: now[0]
+    )
+    throttle = redis_utils.LocalThrottle()
+    for _ in range(redis_utils.MAX_FAILED_ATTEMPTS):
+        throttle.record_failed_attempt("user")
+    assert throttle.is_locked("user")
+
+    now[0] += redis_utils.LOCK_TTL
+    assert not throttle.is_locked("user")
+    assert throttle.record_failed_attempt("user") == 1
@@ -0,0 +1,37 @@
+import pytest
+import pytest_asyncio
+
+from app.config import SqlitePragmas
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Base
+from app.database.sharding import reserve_id_range
+
+
+@pytest.fixture
+def helper_options():
+    # Modules override this to apply the SQLite "pragmas" or to spread
+    # users' data over a number of "shards".
+    return {}
+
+
+@pytest_asyncio.fixture
+async def helper(tmp_path, helper_options):
+    shards = helper_options.get("shards", 0)
+    helper = DatabaseHelper(
+        url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}",
+        sqlite_pragmas=(
+            SqlitePragmas() if helper_options.get("pragmas") else None
+        ),
+        shard_urls=[
+            f"sqlite+aiosqlite:///{tmp_path / f'shard{i}.sqlite3'}"
+            for i in range(shards)
+        ],
+    )
+    for engine in (helper.engine, *helper.shard_engines):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    for shard_id, engine in enumerate(helper.shard_engines):
+        async with engine.begin() as conn:
+            await conn.run_sync(reserve_id_range, str(shard_id))
+    yield helper
+    await helper.dispose()
@@ -0,0 +1,404 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, func, select
+
+from app.api.categories import crud as categories_crud
+from app.api.financial_records import crud, rollups
+from app.api.financial_records.schemas import (
+    FinancialRecordCreate,
+    FinancialRecordUpdatePartial,
+)
+from app.database import archive
+from app.database.models import (
+    Category,
+    FinancialRecord,
+    User,
+)
+
+CUTOFF = datetime(2024, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def archive_dir(tmp_path, mocker):
+    mocker.patch.object(archive.settings.archive, "dir", tmp_path / "archive")
+    return tmp_path / "archive"
+
+
+@pytest_asyncio.fixture
+async def user(helper):
+    async with helper.session_factory() as session:
+        user = User(username="user", hashed_password=b"-")
+        session.add(user)
+        await session.flush()
+        categories = [
+            Category(name=name, user_id=user.id) for name in ("Food", "Pay")
+        ]
+        session.add_all(categories)
+        await session.commit()
+
+        start = datetime(2021, 1, 1)
+        ids = await crud.create_financial_records_bulk(
+            session,
+            [
+                FinancialRecordCreate(
+                    type="income" if i % 4 == 0 else "expense",
+                    description=f"Record {i}",
+                    amount=float(i),
+                    date=start + timedelta(days=(i * 37) % 1500),
+                    category_id=categories[i % 2].id,
+                )
+                for i in range(60)
+            ],
+            user_id=user.id,
+        )
+        await crud.delete_financial_record(session, ids[1], user.id)
+    return user.id, [c.id for c in categories]
+
+
+async def archive_all(helper, user_id, limit=20) -> int:
+    total = 0
+    while archived := await archive.archive_records(
+        helper.session_factory, helper.writer, user_id, CUTOFF, limit=limit
+    ):
+        total += archived
+    return total
+
+
+async def list_all(
+    helper, user_id, page_size=7, read=crud.get_financial_records, **filters
+) -> list:
+    records, after = [], None
+    async with helper.session_factory() as session:
+        while True:
+            page = await read(
+                session, user_id, limit=page_size, after=after, **filters
+            )
+            records += [(r.id, r.date, r.type, r.amount) for r in page]
+            if len(page) < page_size:
+                return records
+            after = (page[-1].date, page[-1].id)
+
+
+async def export_all(helper, user_id, **filters) -> list:
+    rows = []
+    async with helper.session_factory() as session:
+        async for batch in crud.stream_financial_records(
+            session, user_id, batch_size=9, **filters
+        ):
+            rows += [
+                (r.id, r.date, getattr(r.type, "value", r.type), r.amount)
+                + (r.category_name, r.description)
+                for r in batch
+            ]
+    return rows
+
+
+async def summary(helper, user_id, **filters) -> dict:
+    async with helper.session_factory() as session:
+        result = await crud.get_financial_summary(session, user_id, **filters)
+    return {
+        key: (
+            sorted(
+                (
+                    tuple(
+                        str(getattr(v, "value", v)) for v in dict(row).values()
+                    )
+                    for row in value
+                )
+            )
+            if isinstance(value, list)
+            else value
+        )
+        for key, value in result.items()
+    }
+
+
+async def monthly_totals(helper, user_id) -> list:
+    async with helper.session_factory() as session:
+        totals = await crud.get_monthly_totals(session, user_id)
+    return [
+        (t.month, t.category_id, t.type, round(t.amount, 6), t.count)
+        for t in totals
+    ]
+
+
+@pytest.mark.asyncio
+async def test_archive_moves_old_live_records(helper, user, archive_dir):
+    user_id, _ = user
+    async with helper.session_factory() as session:
+        old = await session.scalar(
+            select(func.count(FinancialRecord.id)).where(
+                FinancialRecord.date < CUTOFF,
+                FinancialRecord.deleted_at.is_(None),
+            )
+        )
+
+    assert await archive_all(helper, user_id) == old
+
+    async with helper.session_factory() as session:
+        partitions = await archive.get_partitions(session, user_id)
+        remaining = (
+            await session.execute(
+                select(FinancialRecord.date, FinancialRecord.deleted_at)
+            )
+        ).all()
+    assert [p.records for p in partitions] == [20] * (old // 20) + (
+        [old % 20] if old % 20 else []
+    )
+    assert sorted(
+        path.relative_to(archive_dir).as_posix()
+        for path in archive_dir.rglob("*")
+        if path.is_file()
+    ) == sorted(p.path for p in partitions)
+    assert not any(
+        date < CUTOFF and deleted_at is None for date, deleted_at in remaining
+    )
+
+
+@pytest.mark.asyncio
+async def test_archived_ids_are_not_reused(helper, user):
+    user_id, category_ids = user
+    async with helper.session_factory() as session:
+        last_id = await session.scalar(select(func.max(FinancialRecord.id)))
+    await archive_all(helper, user_id)
+    async with helper.session_factory() as session:
+        await session.execute(
+            delete(FinancialRecord).where(FinancialRecord.date >= CUTOFF)
+        )
+        await session.commit()
+
+        [new_id] = await crud.create_financial_records_bulk(
+            session,
+            [
+                FinancialRecordCreate(
+                    type="expense",
+                    description="New",
+                    amount=1.0,
+                    date=datetime(2025, 1, 1),
+                    category_id=category_ids[0],
+                )
+            ],
+            user_id=user_id,
+        )
+
+    assert new_id == last_id + 1
+
+
+@pytest.mark.asyncio
+async def test_failed_move_removes_the_file(helper, user, archive_dir, mocker):
+    user_id, _ = user
+    mocker.patch.object(
+        helper.writer, "run", side_effect=RuntimeError("commit failed")
+    )
+
+    with pytest.raises(RuntimeError):
+        await archive_all(helper, user_id)
+
+    assert not [path for path in archive_dir.rglob("*") if path.is_file()]
+    async with helper.session_factory() as session:
+        assert not await archive.get_partitions(session, user_id)
+
+
+@pytest.mark.asyncio
+async def test_records_changed_while_written_are_read_again(
+    helper, user, archive_dir, mocker
+):
+    user_id, _ = user
+    async with helper.session_factory() as session:
+        oldest_id = (
+            await crud.get_financial_records(session, user_id, limit=1)
+        )[0].id
+    run, edits = helper.writer.run, []
+
+    async def edit_first_then_run(fn, **kwargs):
+        if not edits:
+            edits.append(
+                await run(
+                    crud.update_financial_record_partial,
+                    financial_record_id=oldest_id,
+                    user_id=user_id,
+                    financial_record_update=FinancialRecordUpdatePartial(
+                        description="Edited"
+                    ),
+                )
+            )
+        return await run(fn, **kwargs)
+
+    mocker.patch.object(helper.writer, "run", side_effect=edit_first_then_run)
+    await archive_all(helper, user_id)
+
+    async with helper.session_factory() as session:
+        partitions = await archive.get_partitions(session, user_id)
+        record = await crud.get_archived_record(session, oldest_id, user_id)
+    assert record.description == "Edited"
+    assert len(list(archive_dir.rglob("*.parquet"))) == len(partitions)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"date_from": datetime(2022, 3, 1), "date_to": datetime(2024, 6, 1)},
+    ],
+)
+async def test_reads_merge_archived_records(helper, user, filters):
+    user_id, category_ids = user
+    export_filters = {**filters, "category_ids": category_ids[:1]}
+    rows = crud.get_financial_record_rows
+    expected = (
+        await list_all(helper, user_id, **filters),
+        await list_all(helper, user_id, read=rows, **filters),
+        await export_all(helper, user_id, **export_filters),
+        await summary(helper, user_id, **export_filters),
+    )
+    assert expected[0] == expected[1]
+
+    await archive_all(helper, user_id)
+
+    assert (
+        await list_all(helper, user_id, **filters),
+        await list_all(helper, user_id, read=rows, **filters),
+        await export_all(helper, user_id, **export_filters),
+        await summary(helper, user_id, **export_filters),
+    ) == expected
+
+
+@pytest.mark.asyncio
+async def test_rebuild_keeps_archived_months(helper, user):
+    user_id, _ = user
+    expected = await monthly_totals(helper, user_id)
+
+    await archive_all(helper, user_id)
+    async with helper.session_factory() as session:
+        await rollups.rebuild_rollups(session)
+
+    assert await monthly_totals(helper, user_id) == expected
+
+
+@pytest.mark.asyncio
+async def test_archived_records_are_read_only(helper, user):
+    user_id, _ = user
+    await archive_all(helper, user_id)
+    async with helper.session_factory() as session:
+        paths = archive.partition_paths(
+            await archive.get_partitions(session, user_id)
+        )
+        archived_id = archive.read_records(paths, limit=1)[0]["id"]
+        hot_id = await session.scalar(select(func.max(FinancialRecord.id)))
+
+        assert not await crud.delete_financial_record(
+            session, archived_id, user_id
+        )
+        record = await crud.get_archived_record(session, archived_id, user_id)
+        assert (record.id, record.user_id) == (archived_id, user_id)
+        assert record.description.startswith("Record ")
+        assert not await crud.get_archived_record(session, hot_id, user_id)
+        assert not await crud.get_archived_record(
+            session, archived_id, user_id + 1
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_finds_records_that_are_not_archived(helper, user):
+    user_id, _ = user
+    async with helper.session_factory() as session:
+        found = await crud.search_financial_records(
+            session, user_id, "record", limit=100
+        )
+    await archive_all(helper, user_id)
+
+    async with helper.session_factory() as session:
+        hot = await crud.search_financial_records(
+            session, user_id, "record", limit=100
+        )
+    assert hot
+    assert {r.id for r in hot} < {r.id for r in found}
+    assert all(r.date >= CUTOFF for r in hot)
+
+
+@pytest.mark.asyncio
+async def test_category_of_archived_records_is_kept(helper, user):
+    user_id, category_ids = user
+    async with helper.session_factory() as session:
+        old = Category(name="Old", user_id=user_id)
+        unused = Category(name="Unused", user_id=user_id)
+        session.add_all([old, unused])
+        await session.commit()
+        await crud.create_financial_records_bulk(
+            session,
+            [
+                FinancialRecordCreate(
+                    type="expense",
+                    description=description,
+                    amount=1.0,
+                    date=date,
+                    category_id=category_id,
+                )
+                for description, date, category_id in [
+                    ("Old", datetime(2020, 1, 1), old.id),
+                    ("New", datetime(2025, 1, 1), category_ids[0]),
+                ]
+            ],
+            user_id=user_id,
+        )
+    await archive_all(helper, user_id)
+
+    async with helper.session_factory() as session:
+        partitions = len(await archive.get_partitions(session, user_id))
+        assert await categories_crud.category_in_archive(
+            session, old.id, user_id
+        ) == (True, partitions)
+        assert await categories_crud.category_in_archive(
+            session, unused.id, user_id
+        ) == (False, partitions)
+        assert not await categories_crud.delete_category(
+            session, unused.id, user_id, archived_partitions=partitions - 1
+        )
+        assert await categories_crud.delete_category(
+            session, unused.id, user_id, archived_partitions=partitions
+        )
+
+
+def test_merge_totals():
+    hot = [{"type": "expense", "amount": 1.0, "count": 1}]
+    archived = [
+        {"type": "expense", "amount": 2.0, "count": 3},
+        {"type": "income", "amount": 5.0, "count": 1},
+    ]
+
+    assert archive.merge_totals(hot, archived, ["type"]) == [
+        {"type": "expense", "amount": 3.0, "count": 4},
+        {"type": "income", "amount": 5.0, "count": 1},
+    ]
+
+
+def test_merge_totals_sorts_by_typed_keys():
+    hot = [{"category_id": 10, "type": "expense", "amount": 1.0}]
+    archived = [
+        {"category_id": 2, "type": "expense", "amount": 2.0},
+        {"category_id": 10, "type": "expense", "amount": 3.0},
+    ]
+
+    merged = archive.merge_totals(hot, archived, ["category_id", "type"])
+
+    assert [row["category_id"] for row in merged] == [2, 10]
+    assert merged[1]["amount"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_merge_sorted_batches():
+    async def batches(*items):
+        for item in items:
+            yield item
+
+    merged = archive.merge_sorted_batches(
+        batches([1, 4], [6]),
+        batches([2, 3, 5], [7, 8]),
+        key=lambda row: row,
+        batch_size=3,
+    )
+
+    assert [batch async for batch in merged] == [[1, 2, 3], [4, 5, 6], [7, 8]]
@@ -0,0 +1,65 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy.exc import IntegrityError
+
+from app.api.categories import crud
+from app.api.categories.schemas import CategoryCreate, CategoryUpdate
+from app.database.models import User
+
+
+@pytest.fixture
+def helper_options():
+    return {"pragmas": True}
+
+
+@pytest_asyncio.fixture(autouse=True)
+async def users(helper):
+    async with helper.session_factory() as session:
+        session.add_all(
+            [
+                User(id=1, username="alice", hashed_password=b"-"),
+                User(id=2, username="bob", hashed_password=b"-"),
+            ]
+        )
+        await session.commit()
+
+
+async def create(helper, name, user_id=1):
+    return await helper.writer.run(
+        crud.create_category,
+        category_in=CategoryCreate(name=name),
+        user_id=user_id,
+    )
+
+
+@pytest.mark.asyncio
+async def test_names_are_unique_per_user_ignoring_case(helper):
+    food = await create(helper, "Food")
+
+    with pytest.raises(IntegrityError):
+        await create(helper, "fOOD")
+    await create(helper, "food", user_id=2)
+
+    with pytest.raises(IntegrityError):
+        await helper.writer.run(
+            crud.update_category,
+            category_id=(await create(helper, "Bar")).id,
+            user_id=1,
+            category_update=CategoryUpdate(name="FOOD"),
+        )
+    assert await helper.writer.run(
+        crud.update_category,
+        category_id=food.id,
+        user_id=1,
+        category_update=CategoryUpdate(name="FOOD"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_name_of_deleted_category_can_be_reused(helper):
+    food = await create(helper, "Food")
+    await helper.writer.run(
+        crud.delete_category, category_id=food.id, user_id=1
+    )
+
+    assert (await create(helper, "food")).id != food.id
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import text
+
+from app.config import SqlitePragmas
+from app.database.db_helper import DatabaseHelper
+
+
+def test_sqlite_pragmas_statements():
+    pragmas = SqlitePragmas(journal_mode="WAL", synchronous=None)
+
+    statements = pragmas.statements()
+
+    assert "PRAGMA journal_mode = WAL" in statements
+    assert not any("synchronous" in s for s in statements)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sqlite_pragmas, expected",
+    [
+        (SqlitePragmas(), ("wal", 1, 2, 5000)),
+        (None, ("delete", 2, 0, 5000)),
+    ],
+)
+async def test_database_helper_sets_pragmas(
+    tmp_path, sqlite_pragmas, expected
+):
+    helper = DatabaseHelper(
+        url=f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite3'}",
+        sqlite_pragmas=sqlite_pragmas,
+    )
+    try:
+        async with helper.engine.connect() as conn:
+            values = [
+                (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+                for name in (
+                    "journal_mode",
+                    "synchronous",
+                    "temp_store",
+                    "busy_timeout",
+                )
+            ]
+    finally:
+        await helper.engine.dispose()
+
+    assert tuple(values) == expected
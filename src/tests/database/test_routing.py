@@ -0,0 +1,106 @@
+import shutil
+import time
+import pytest
+from fastapi import Response
+from sqlalchemy import func, select
+from starlette.requests import Request
+from unittest.mock import MagicMock
+
+from app.config import SqlitePragmas
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Base, User
+from app.database.routing import (
+    READ_PRIMARY_COOKIE,
+    ReadRouter,
+    reads_from_primary,
+    stick_to_primary,
+)
+
+
+def make_request(cookie=None):
+    headers = []
+    if cookie is not None:
+        headers.append((b"cookie", f"{READ_PRIMARY_COOKIE}={cookie}".encode()))
+    return Request({"type": "http", "headers": headers})
+
+
+@pytest.mark.parametrize(
+    "selection, in_flight, use_primary, expected",
+    [
+        ("round_robin", [0, 0, 0], False, [0, 1, 2, 0]),
+        ("least_busy", [2, 0, 1], False, [1, 1, 1, 1]),
+        ("round_robin", [0, 0, 0], True, [None] * 4),
+    ],
+)
+def test_read_router_choose(selection, in_flight, use_primary, expected):
+    router = ReadRouter(MagicMock(), [MagicMock()] * 3, selection)
+    router.in_flight = in_flight
+
+    assert [router.choose(use_primary) for _ in range(4)] == expected
+
+
+def test_read_router_without_replicas_uses_primary():
+    assert ReadRouter(MagicMock(), []).choose() is None
+
+
+@pytest.mark.parametrize(
+    "cookie, expected",
+    [
+        (None, False),
+        ("garbage", False),
+        (str(time.time() - 1), False),
+        (str(time.time() + 60), True),
+    ],
+)
+def test_reads_from_primary(cookie, expected):
+    assert reads_from_primary(make_request(cookie)) is expected
+
+
+def test_stick_to_primary():
+    response = Response()
+
+    stick_to_primary(response, 5)
+
+    cookie = response.headers["set-cookie"]
+    assert cookie.startswith(f"{READ_PRIMARY_COOKIE}=")
+    assert "Max-Age=5" in cookie
+
+
+@pytest.mark.asyncio
+async def test_read_session_dependency_with_replicas(tmp_path):
+    primary_path = tmp_path / "primary.sqlite3"
+    helper = DatabaseHelper(url=f"sqlite+aiosqlite:///{primary_path}")
+    async with helper.engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    await helper.dispose()
+    replica_paths = [tmp_path / f"replica{i}.sqlite3" for i in range(2)]
+    for replica_path in replica_paths:
+        shutil.copy(primary_path, replica_path)
+
+    helper = DatabaseHelper(
+        url=f"sqlite+aiosqlite:///{primary_path}",
+        sqlite_pragmas=SqlitePragmas(),
+        replica_urls=[f"sqlite+aiosqlite:///{p}" for p in replica_paths],
+    )
+
+    async def add_user(session):
+        session.add(User(username="alice", hashed_password=b"-"))
+        await session.commit()
+
+    async def count_users(request):
+        dependency = helper.read_session_dependency(request)
+        session = await anext(dependency)
+        try:
+            return await session.scalar(select(func.count(User.id)))
+        finally:
+            await dependency.aclose()
+
+    try:
+        await helper.writer.run(add_user)
+        stale = await count_users(make_request())
+        fresh = await count_users(make_request(str(time.time() + 60)))
+    finally:
+        await helper.dispose()
+
+    assert (stale, fresh) == (0, 1)
+    assert helper.read_router.in_flight == [0, 0]
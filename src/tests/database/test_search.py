@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+
+from app.api.financial_records import crud
+from app.api.financial_records.schemas import (
+    FinancialRecordCreate,
+    FinancialRecordUpdatePartial,
+)
+from app.database.models import Category, User
+from app.database.search import FTS_TABLE, fts_query, user_fts_query
+
+
+@pytest_asyncio.fixture
+async def records(helper):
+    async with helper.session_factory() as session:
+        users = [User(username=name, hashed_password=b"-") for name in "ab"]
+        session.add_all(users)
+        await session.flush()
+        categories = [Category(name="Food", user_id=u.id) for u in users]
+        session.add_all(categories)
+        await session.commit()
+
+        def record(description, amount, record_type="expense", day=1, owner=0):
+            return FinancialRecordCreate(
+                type=record_type,
+                description=description,
+                amount=amount,
+                date=datetime(2025, 1, day),
+                category_id=categories[owner].id,
+            )
+
+        ids = await crud.create_financial_records_bulk(
+            session,
+            [
+                record("Coffee at Café Nero", 3.5),
+                record("coffee beans, more coffee", 12.0, day=5),
+                record("Salary", 1000.0, record_type="income"),
+            ],
+            user_id=users[0].id,
+        )
+        await crud.create_financial_records_bulk(
+            session, [record("coffee", 2.0, owner=1)], user_id=users[1].id
+        )
+    return users[0].id, ids
+
+
+async def search(helper, user_id, query, **filters):
+    async with helper.session_factory() as session:
+        found = await crud.search_financial_records(
+            session, user_id, query, limit=10, **filters
+        )
+    return [record.description for record in found]
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("coffee", 'description : ("coffee"*)'),
+        ("Café  nero", 'description : ("Café"* "nero"*)'),
+        ('coffee OR "tea', 'description : ("coffee"* "OR"* "tea"*)'),
+        ("*** ()", None),
+    ],
+)
+def test_fts_query(text, expected):
+    assert fts_query(text) == expected
+
+
+def test_user_fts_query():
+    assert (
+        user_fts_query('description : ("tea"*)', 7)
+        == 'user_id : "7" AND description : ("tea"*)'
+    )
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_matches_of_the_user_only(helper, records):
+    user_id, _ = records
+
+    assert await search(helper, user_id, "coffee") == [
+        "coffee beans, more coffee",
+        "Coffee at Café Nero",
+    ]
+    assert await search(helper, user_id, "cafe ner") == ["Coffee at Café Nero"]
+    assert await search(helper, user_id, "tea") == []
+    assert await search(helper, user_id, "()") == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "filters, expected",
+    [
+        ({"amount_min": 5}, ["coffee beans, more coffee"]),
+        ({"amount_max": 5}, ["Coffee at Café Nero"]),
+        ({"date_from": datetime(2025, 1, 2)}, ["coffee beans, more coffee"]),
+        ({"date_to": datetime(2025, 1, 2)}, ["Coffee at Café Nero"]),
+        ({"record_type": "income"}, []),
+        ({"category_ids": [0]}, []),
+    ],
+)
+async def test_search_filters(helper, records, filters, expected):
+    user_id, _ = records
+    assert await search(helper, user_id, "coffee", **filters) == expected
+
+
+@pytest.mark.asyncio
+async def test_index_follows_updates_and_deletes(helper, records):
+    user_id, ids = records
+    async with helper.session_factory() as session:
+        await crud.update_financial_record_partial(
+            session,
+            ids[0],
+            user_id,
+            FinancialRecordUpdatePartial(description="Green tea"),
+        )
+        await crud.delete_financial_record(session, ids[1], user_id)
+
+    assert await search(helper, user_id, "coffee") == []
+    assert await search(helper, user_id, "tea") == ["Green tea"]
+
+
+@pytest.mark.asyncio
+async def test_index_is_searched_for_the_users_records_only(helper, records):
+    user_id, ids = records
+    async with helper.session_factory() as session:
+        result = await session.execute(
+            text(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q"
+                " ORDER BY rowid"
+            ),
+            {"q": user_fts_query(fts_query("coffee"), user_id)},
+        )
+
+    assert list(result.scalars()) == ids[:2]
@@ -0,0 +1,107 @@
+import sqlite3
+import pytest
+from sqlalchemy import select
+
+from app.database.db_helper import DatabaseHelper
+from app.database.models import Category, User
+from app.database.sharding import (
+    SHARD_ID_BITS,
+    current_user_id,
+    shard_for,
+)
+
+
+@pytest.fixture
+def helper_options():
+    return {"shards": 2}
+
+
+def count_rows(path, table):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+
+def test_shard_for_is_stable_and_spread():
+    shards = [shard_for(user_id, 4) for user_id in range(1, 1001)]
+
+    assert shards == [shard_for(user_id, 4) for user_id in range(1, 1001)]
+    assert all(shards.count(str(i)) > 200 for i in range(4))
+
+
+def test_replicas_cannot_be_combined_with_shards():
+    with pytest.raises(ValueError):
+        DatabaseHelper(
+            url="sqlite+aiosqlite://",
+            replica_urls=["sqlite+aiosqlite://"],
+            shard_urls=["sqlite+aiosqlite://"],
+        )
+
+
+async def register(session, username):
+    user = User(username=username, hashed_password=b"-")
+    session.add(user)
+    await session.flush()
+    session.add(Category(name="Other", user_id=user.id))
+    await session.commit()
+    return user.id
+
+
+@pytest.mark.asyncio
+async def test_users_on_primary_and_their_data_on_shards(helper, tmp_path):
+    async def add_category(session, name):
+        session.add(Category(name=name, user_id=current_user_id.get()))
+        await session.commit()
+
+    async def category_names():
+        async with helper.read_session_factory() as session:
+            result = await session.execute(
+                select(Category.name).where(
+                    Category.user_id == current_user_id.get()
+                )
+            )
+            return sorted(result.scalars().all())
+
+    user_ids = [await helper.writer.run(register, f"u{i}") for i in range(4)]
+    token = current_user_id.set(user_ids[0])
+    try:
+        await helper.writer.run(add_category, "Food")
+        names = await category_names()
+    finally:
+        current_user_id.reset(token)
+
+    assert names == ["Food", "Other"]
+    assert count_rows(tmp_path / "db.sqlite3", "users") == 4
+    assert count_rows(tmp_path / "db.sqlite3", "categories") == 0
+    categories_per_shard = {
+        str(i): count_rows(tmp_path / f"shard{i}.sqlite3", "categories")
+        for i in range(2)
+    }
+    expected = {str(i): 0 for i in range(2)}
+    for user_id in user_ids:
+        expected[shard_for(user_id, 2)] += 1
+    expected[shard_for(user_ids[0], 2)] += 1
+    assert categories_per_shard == expected
+
+
+@pytest.mark.asyncio
+async def test_shards_make_ids_in_their_own_ranges(helper):
+    user_ids = [await helper.writer.run(register, f"u{i}") for i in range(4)]
+
+    async with helper.read_session_factory() as session:
+        categories = (
+            await session.execute(select(Category.user_id, Category.id))
+        ).all()
+
+    assert sorted(user_id for user_id, _ in categories) == user_ids
+    for user_id, category_id in categories:
+        shard_id = int(shard_for(user_id, 2))
+        assert category_id >> SHARD_ID_BITS == shard_id + 1
+
+
+def test_writer_queues_have_engines_of_their_own(helper):
+    engines = [
+        set(queue.session_factory.kw["shards"].values())
+        for queue in helper.writer.queues.values()
+    ]
+
+    assert sum(map(len, engines)) == len(set().union(*engines)) == 9
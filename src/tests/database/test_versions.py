@@ -0,0 +1,54 @@
+import pytest
+
+from app.database.versions import (
+    bump_data_version,
+    data_version_etag,
+    etag_matches,
+    get_data_version,
+)
+
+
+@pytest.mark.asyncio
+async def test_bump_data_version(helper):
+    async with helper.session_factory() as session:
+        assert await get_data_version(session, user_id=1) == 0
+        await bump_data_version(session, user_id=1)
+        await bump_data_version(session, user_id=1)
+        await bump_data_version(session, user_id=2)
+        await session.commit()
+
+    async with helper.session_factory() as session:
+        assert await get_data_version(session, user_id=1) == 2
+        assert await get_data_version(session, user_id=2) == 1
+
+
+@pytest.mark.asyncio
+async def test_bump_is_rolled_back_with_the_change(helper):
+    async with helper.session_factory() as session:
+        await bump_data_version(session, user_id=1)
+        await session.rollback()
+
+    async with helper.session_factory() as session:
+        assert await get_data_version(session, user_id=1) == 0
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ("", False),
+        ('"7.3"', True),
+        ('"7.2"', False),
+        ('"6.3"', False),
+        ('W/"7.3"', True),
+        ('"x", "7.3"', True),
+        ("*", True),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, data_version_etag(7, 3)) is expected
+
+
+def test_etag_of_variant():
+    assert data_version_etag(7, 3, "arrow") == '"7.3.arrow"'
+    assert not etag_matches('"7.3"', data_version_etag(7, 3, "arrow"))
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from sqlalchemy import func, select
+
+from app.database.models import User
+
+
+@pytest.fixture
+def helper_options():
+    return {"pragmas": True}
+
+
+async def add_user(session, username):
+    user = User(username=username, hashed_password=b"-")
+    session.add(user)
+    await session.commit()
+    if username.startswith("bad"):
+        raise ValueError(username)
+    return user.id
+
+
+async def count_users(helper):
+    async with helper.read_session_factory() as session:
+        return await session.scalar(select(func.count(User.id)))
+
+
+@pytest.mark.asyncio
+async def test_writer_group_commits_concurrent_operations(helper):
+    results = await asyncio.gather(
+        *[helper.writer.run(add_user, f"user{i}") for i in range(20)]
+    )
+
+    assert sorted(results) == list(range(1, 21))
+    assert await count_users(helper) == 20
+    assert helper.writer.operations == 20
+    assert helper.writer.batches < 20
+
+
+@pytest.mark.asyncio
+async def test_writer_rolls_back_only_failed_operation(helper):
+    results = await asyncio.gather(
+        helper.writer.run(add_user, "alice"),
+        helper.writer.run(add_user, "bad"),
+        helper.writer.run(add_user, "bob"),
+        return_exceptions=True,
+    )
+
+    assert isinstance(results[1], ValueError)
+    assert await count_users(helper) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_session_is_query_only(helper):
+    async with helper.read_session_factory() as session:
+        session.add(User(username="alice", hashed_password=b"-"))
+        with pytest.raises(Exception, match="readonly"):
+            await session.commit()
@@ -1,8 +1,18 @@
+import io
+
+import pyarrow as pa
 import pytest
+import streamlit as st
 from httpx import Client, Response, RequestError
 
 from src.app.frontend.api_helpers import (
+    cached_get,
     get_data,
+    get_changes,
+    get_summary,
+    search_records,
+    export_records,
+    get_records_frame,
     create_record,
     update_record,
     delete_record,
@@ -65,12 +75,188 @@ def test_get_data(mock_client, status_code, response_json, expected):
     assert result == expected
 
 
+def test_get_data_follows_cursor(mock_client):
+    first_page = [{"id": 1, "type": "income"}]
+    second_page = [{"id": 2, "type": "expense"}]
+    mock_client.get.side_effect = [
+        Response(200, json=first_page, headers={"X-Next-Cursor": "abc"}),
+        Response(200, json=second_page),
+    ]
+
+    result = get_data()
+
+    assert result == first_page + second_page
+    assert mock_client.get.call_count == 2
+    assert mock_client.get.call_args.kwargs["params"]["cursor"] == "abc"
+
+
+def test_cached_get_revalidates_with_etag(mock_client):
+    url = "https://testserver/categories/"
+    fresh = Response(200, json=[{"id": 1}], headers={"ETag": '"1.3"'})
+    mock_client.get.side_effect = [fresh, Response(304)]
+
+    first = cached_get(url)
+    second = cached_get(url)
+
+    assert first is fresh
+    assert second is fresh
+    assert mock_client.get.call_args_list[0].kwargs["headers"] is None
+    assert mock_client.get.call_args_list[1].kwargs["headers"] == {
+        "If-None-Match": '"1.3"'
+    }
+
+
+def test_cached_get_keys_cache_by_params(mock_client):
+    url = "https://testserver/financial_records/summary"
+    mock_client.get.return_value = Response(
+        200, json={}, headers={"ETag": '"1.3"'}
+    )
+
+    cached_get(url, params={"category_id": [1]})
+    cached_get(url, params={"category_id": [2]})
+
+    assert all(
+        call.kwargs["headers"] is None
+        for call in mock_client.get.call_args_list
+    )
+
+
+def test_cached_get_replaces_changed_response(mock_client):
+    url = "https://testserver/categories/"
+    changed = Response(200, json=[{"id": 2}], headers={"ETag": '"1.4"'})
+    mock_client.get.side_effect = [
+        Response(200, json=[{"id": 1}], headers={"ETag": '"1.3"'}),
+        changed,
+        Response(304),
+    ]
+
+    cached_get(url)
+    cached_get(url)
+
+    assert cached_get(url) is changed
+    assert mock_client.get.call_args.kwargs["headers"] == {
+        "If-None-Match": '"1.4"'
+    }
+
+
 def test_get_data_request_error(mock_client):
     mock_client.get.side_effect = RequestError("Connection error")
     result = get_data()
     assert result == []
 
 
+@pytest.mark.parametrize(
+    "since, expected_params",
+    [(None, None), ("abc", {"since": "abc"})],
+)
+def test_get_changes(mock_client, since, expected_params):
+    changes = {"records": [], "cursor": "def"}
+    mock_client.get.return_value = Response(200, json=changes)
+
+    assert get_changes(since) == changes
+    assert mock_client.get.call_args.args[0].endswith("changes")
+    assert mock_client.get.call_args.kwargs["params"] == expected_params
+
+
+def test_get_changes_error(mock_client):
+    mock_client.get.return_value = Response(400, json={})
+    assert get_changes("bad") is None
+
+    mock_client.get.side_effect = RequestError("Connection error")
+    assert get_changes("abc") is None
+
+
+@pytest.mark.parametrize(
+    "status_code, response_json, expected",
+    [
+        (200, {"by_type": []}, {"by_type": []}),
+        (500, None, None),
+    ],
+)
+def test_get_summary(mock_client, status_code, response_json, expected):
+    mock_client.get.return_value = Response(status_code, json=response_json)
+    result = get_summary({"category_id": [1]})
+    assert result == expected
+
+
+@pytest.mark.parametrize(
+    "status_code, response_json, expected",
+    [
+        (200, [{"id": 1}], [{"id": 1}]),
+        (500, None, []),
+    ],
+)
+def test_search_records(mock_client, status_code, response_json, expected):
+    mock_client.get.return_value = Response(status_code, json=response_json)
+    assert search_records("coffee", {"type": "expense"}) == expected
+    assert mock_client.get.call_args.kwargs["params"] == {
+        "type": "expense",
+        "q": "coffee",
+    }
+
+
+def test_search_records_request_error(mock_client):
+    mock_client.get.side_effect = RequestError("Connection error")
+    assert search_records("coffee") == []
+
+
+def test_get_summary_request_error(mock_client):
+    mock_client.get.side_effect = RequestError("Connection error")
+    assert get_summary() is None
+
+
+@pytest.mark.parametrize(
+    "status_code, expected, content",
+    [
+        (200, True, b"id,date\n1,2025-01-01\n"),
+        (500, False, b""),
+    ],
+)
+def test_export_records(mock_client, status_code, expected, content):
+    response = Response(status_code, content=b"id,date\n1,2025-01-01\n")
+    mock_client.stream.return_value.__enter__.return_value = response
+    output = io.BytesIO()
+
+    assert export_records(output, {"category_id": [1]}) is expected
+
+    assert output.getvalue() == content
+    assert mock_client.stream.call_args.kwargs["params"] == {
+        "category_id": [1],
+        "format": "csv",
+    }
+
+
+def test_export_records_request_error(mock_client):
+    mock_client.stream.side_effect = RequestError("Connection error")
+    assert export_records(io.BytesIO()) is False
+
+
+def test_get_records_frame(mock_client):
+    table = pa.table({"id": [1, 2], "amount": [1.5, 2.5]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    mock_client.get.return_value = Response(
+        200, content=sink.getvalue().to_pybytes()
+    )
+
+    df = get_records_frame({"category_id": [1]})
+
+    assert df["id"].tolist() == [1, 2]
+    assert df["amount"].dtype == "float64"
+    assert mock_client.get.call_args.kwargs["headers"] == {
+        "Accept": "application/vnd.apache.arrow.stream"
+    }
+
+
+def test_get_records_frame_error(mock_client):
+    mock_client.get.return_value = Response(500)
+    assert get_records_frame().empty
+
+    mock_client.get.side_effect = RequestError("Connection error")
+    assert get_records_frame().empty
+
+
 @pytest.mark.parametrize(
     "status_code, expected",
     [
@@ -183,37 +369,30 @@ def test_get_categories_request_error(mock_client):
     assert result == []
 
 
-def test_create_category_success(mock_client, mocker):
-    mocker.patch(
-        "src.app.frontend.api_helpers.get_categories", return_value=[]
-    )
+def test_create_category_success(mock_client):
     mock_client.post.return_value = Response(
         200, json={"name": "Travel", "user_id": 1}
     )
     result = create_category({"name": "travel"})
     assert result == {"name": "Travel", "user_id": 1}
+    mock_client.get.assert_not_called()
 
 
-@pytest.mark.parametrize(
-    "existing, input_data, expected",
-    [
-        ([{"name": "Food"}], {"name": "food"}, None),
-        ([{"name": "Food"}], {"name": "Food"}, None),
-        ([], {"name": "   "}, None),
-    ],
-)
-def test_create_category_invalid_cases(mocker, existing, input_data, expected):
-    mocker.patch(
-        "src.app.frontend.api_helpers.get_categories", return_value=existing
-    )
-    result = create_category(input_data)
-    assert result is expected
+def test_create_category_empty_name(mock_client):
+    result = create_category({"name": "   "})
+    assert result is None
+    mock_client.post.assert_not_called()
 
 
-def test_create_category_request_error(mock_client, mocker):
-    mocker.patch(
-        "src.app.frontend.api_helpers.get_categories", return_value=[]
-    )
+def test_create_category_name_taken(mock_client):
+    detail = "Category with name 'Food' already exists"
+    mock_client.post.return_value = Response(409, json={"detail": detail})
+    result = create_category({"name": "food"})
+    assert result is None
+    st.error.assert_called_once_with(detail)
+
+
+def test_create_category_request_error(mock_client):
     mock_client.post.side_effect = RequestError("Connection error")
     result = create_category({"name": "Test"})
     assert result is None
@@ -231,6 +410,24 @@ def test_delete_category(mock_client, status_code, expected):
     assert delete_category(123) is expected
 
 
+def test_delete_archived_record(mock_client):
+    mock_client.delete.return_value = Response(
+        409, json={"detail": "Financial record 1 is archived"}
+    )
+
+    assert delete_record(1) is False
+    st.error.assert_called_once_with("Financial record 1 is archived")
+
+
+def test_delete_category_in_use(mock_client):
+    mock_client.delete.return_value = Response(
+        409, json={"detail": "Category 123 has financial records"}
+    )
+
+    assert delete_category(123) is False
+    st.error.assert_called_once_with("Category 123 has financial records")
+
+
 def test_delete_category_request_error(mock_client):
     mock_client.delete.side_effect = RequestError("Connection error")
     result = delete_category(999)
@@ -0,0 +1,102 @@
+import pytest
+import streamlit as st
+
+from src.app.frontend.records_page import (
+    init_session_state,
+    merge_changes,
+)
+
+
+@pytest.fixture(autouse=True)
+def api(mocker):
+    st.session_state.clear()
+    return {
+        name: mocker.patch(f"src.app.frontend.records_page.{name}")
+        for name in ("get_changes", "get_data", "get_categories")
+    }
+
+
+def record(record_id, date, amount=1.0):
+    return {"id": record_id, "date": date, "amount": amount}
+
+
+def test_merge_changes():
+    items = [
+        record(1, "2025-01-01T00:00:00"),
+        record(2, "2025-01-02T00:00:00"),
+        record(3, "2025-01-03T00:00:00"),
+    ]
+    changed = [
+        record(3, "2025-01-01T00:00:00", amount=5.0),
+        record(4, "2025-01-04T00:00:00"),
+    ]
+
+    merged = merge_changes(
+        items,
+        changed,
+        deleted_ids=[2],
+        sort_key=lambda r: (r["date"], r["id"]),
+    )
+
+    assert merged == [
+        record(1, "2025-01-01T00:00:00"),
+        record(3, "2025-01-01T00:00:00", amount=5.0),
+        record(4, "2025-01-04T00:00:00"),
+    ]
+
+
+def test_init_session_state_loads_all_once(api):
+    api["get_changes"].return_value = {"cursor": "c1"}
+    api["get_data"].return_value = [record(1, "2025-01-01T00:00:00")]
+    api["get_categories"].return_value = [{"id": 1, "name": "Other"}]
+
+    init_session_state()
+    init_session_state()
+
+    api["get_changes"].assert_called_once_with()
+    api["get_data"].assert_called_once()
+    assert st.session_state.changes_cursor == "c1"
+
+
+def test_init_session_state_merges_changes_on_refresh(api):
+    st.session_state.records = [
+        record(1, "2025-01-01T00:00:00"),
+        record(2, "2025-01-02T00:00:00"),
+    ]
+    st.session_state.categories = [{"id": 1, "name": "Other"}]
+    st.session_state.changes_cursor = "c1"
+    st.session_state.refresh_records = True
+    api["get_changes"].return_value = {
+        "records": [record(3, "2025-01-03T00:00:00")],
+        "deleted_record_ids": [1],
+        "categories": [{"id": 2, "name": "Food"}],
+        "deleted_category_ids": [],
+        "cursor": "c2",
+    }
+
+    init_session_state()
+
+    api["get_changes"].assert_called_once_with("c1")
+    api["get_data"].assert_not_called()
+    assert [r["id"] for r in st.session_state.records] == [2, 3]
+    assert [c["id"] for c in st.session_state.categories] == [1, 2]
+    assert st.session_state.changes_cursor == "c2"
+    assert st.session_state.refresh_records is False
+
+
+@pytest.mark.parametrize("cursor", [None, "c1"])
+def test_init_session_state_reloads_without_changes(api, cursor):
+    st.session_state.records = []
+    st.session_state.categories = []
+    st.session_state.changes_cursor = cursor
+    st.session_state.refresh_categories = True
+    api["get_changes"].side_effect = [None, {"cursor": "c2"}]
+
+    init_session_state()
+
+    api["get_data"].assert_called_once()
+    api["get_categories"].assert_called_once()
+    if cursor is None:
+        assert st.session_state.changes_cursor is None
+    else:
+        assert st.session_state.changes_cursor == "c2"
@@ -0,0 +1,253 @@
+import asyncio
+
+import fakeredis
+import pytest
+import pytest_asyncio
+from pydantic import BaseModel
+from redis.exceptions import ConnectionError
+
+from app.config import CacheSettings, RedisSettings
+from app.redis.cache import TwoTierCache
+from app.redis.redis_helper import RedisHelper
+
+
+class Item(BaseModel):
+    name: str
+
+
+class ItemRow:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server, **config) -> TwoTierCache:
+    helper = RedisHelper(RedisSettings(breaker_failure_threshold=1))
+    helper.redis_client = fakeredis.FakeAsyncRedis(
+        server=server, decode_responses=True
+    )
+    return TwoTierCache(
+        helper, CacheSettings(resubscribe_seconds=0.01, **config)
+    )
+
+
+@pytest_asyncio.fixture
+async def workers(server):
+    workers = [make_cache(server), make_cache(server)]
+    for worker in workers:
+        await worker.start()
+    await asyncio.sleep(0.05)
+    yield workers
+    for worker in workers:
+        await worker.stop()
+
+
+class Loader:
+    def __init__(self, value="a", delay=0):
+        self.value = value
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_reads_from_memory_then_redis(server):
+    first, second = make_cache(server), make_cache(server)
+    load = Loader()
+
+    assert await first.get_or_load("key", load) == "a"
+    assert await first.get_or_load("key", load) == "a"
+    assert await second.get_or_load("key", load) == "a"
+
+    assert load.calls == 1
+    assert (first.misses, first.l1_hits, second.l2_hits) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_load(server):
+    cache = make_cache(server)
+    load = Loader(delay=0.01)
+
+    values = await asyncio.gather(
+        *[cache.get_or_load("key", load) for _ in range(10)]
+    )
+
+    assert values == ["a"] * 10
+    assert (load.calls, cache.coalesced) == (1, 9)
+
+
+@pytest.mark.asyncio
+async def test_failed_load_is_raised_to_everyone(server):
+    cache = make_cache(server)
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError
+
+    results = await asyncio.gather(
+        *[cache.get_or_load("key", fail) for _ in range(3)],
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_others_load_again_when_shared_load_is_cancelled(server):
+    cache = make_cache(server)
+    leader = asyncio.create_task(
+        cache.get_or_load("key", Loader("a", delay=0.05))
+    )
+    await asyncio.sleep(0.01)
+    load = Loader("b", delay=0.01)
+    followers = [
+        asyncio.create_task(cache.get_or_load("key", load)) for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+
+    leader.cancel()
+
+    assert await asyncio.gather(*followers) == ["b"] * 3
+    assert leader.cancelled()
+    assert load.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_follower_is_cancelled(server):
+    cache = make_cache(server)
+    leader = asyncio.create_task(
+        cache.get_or_load("key", Loader("a", delay=0.02))
+    )
+    await asyncio.sleep(0.01)
+    follower = asyncio.create_task(cache.get_or_load("key", Loader("b")))
+    await asyncio.sleep(0)
+
+    follower.cancel()
+
+    assert await leader == "a"
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+
+@pytest.mark.asyncio
+async def test_load_invalidated_by_another_worker_is_not_stored(server):
+    first, second = make_cache(server), make_cache(server)
+    loading = asyncio.create_task(
+        first.get_or_load("key", Loader("old", delay=0.02))
+    )
+    await asyncio.sleep(0.01)
+
+    await second.invalidate("key")
+
+    assert await loading == "old"
+    assert await make_cache(server).get_or_load("key", Loader("new")) == "new"
+
+
+@pytest.mark.asyncio
+async def test_invalidation_reaches_every_worker(workers):
+    first, second = workers
+    for worker in workers:
+        await worker.get_or_load("key", Loader("old"))
+
+    await first.invalidate("key")
+    await asyncio.sleep(0.05)
+
+    assert len(first) == len(second) == 0
+    assert await second.get_or_load("key", Loader("new")) == "new"
+
+
+@pytest.mark.asyncio
+async def test_worker_keeps_value_loaded_after_own_invalidation(workers):
+    first, second = workers
+    await first.invalidate("key")
+    await first.get_or_load("key", Loader("new"))
+    await asyncio.sleep(0.05)
+
+    assert (len(first), first.invalidations, second.invalidations) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_load_invalidated_meanwhile_is_not_cached(server):
+    cache = make_cache(server)
+    loading = asyncio.create_task(
+        cache.get_or_load("key", Loader("old", delay=0.02))
+    )
+    await asyncio.sleep(0.01)
+
+    await cache.invalidate("key")
+
+    assert await loading == "old"
+    assert await cache.get_or_load("key", Loader("new")) == "new"
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(server):
+    cache = make_cache(server, l1_maxsize=2)
+    for key in "abc":
+        await cache.get_or_load(key, Loader(key))
+
+    assert (len(cache), cache.evictions) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_snapshot(server):
+    cache = make_cache(server, l1_maxsize=2)
+    await cache.get_or_load("key", Loader())
+    await cache.get_or_load("key", Loader())
+    await cache.invalidate("key")
+
+    assert cache.snapshot() == {
+        "size": 0,
+        "maxsize": 2,
+        "l1_hits": 1,
+        "l2_hits": 0,
+        "misses": 1,
+        "coalesced": 0,
+        "evictions": 0,
+        "invalidations": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_decorator_stores_models(server):
+    cache = make_cache(server)
+    calls = []
+
+    @cache.cached(key=lambda user_id: f"items:{user_id}", model=list[Item])
+    async def get_items(user_id):
+        calls.append(user_id)
+        return [ItemRow(f"item{user_id}")]
+
+    assert await get_items(1) == [Item(name="item1")]
+    assert await make_cache(server).cached(
+        key=lambda user_id: f"items:{user_id}", model=list[Item]
+    )(get_items.uncached)(1) == [Item(name="item1")]
+    assert calls == [1]
+
+
+@pytest.mark.asyncio
+async def test_works_in_memory_while_redis_is_down(server, mocker):
+    cache = make_cache(server)
+    mocker.patch.object(
+        cache.helper.redis_client,
+        "execute_command",
+        side_effect=ConnectionError,
+    )
+    load = Loader()
+
+    assert await cache.get_or_load("key", load) == "a"
+    assert await cache.get_or_load("key", load) == "a"
+    await cache.invalidate("key")
+
+    assert load.calls == 1
+    assert len(cache) == 0
+    assert cache.helper.breaker.state == "open"
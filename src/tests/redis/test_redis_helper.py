@@ -0,0 +1,149 @@
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeAsyncRedisConnection
+from redis.asyncio import ConnectionPool
+from redis.exceptions import ConnectionError, ResponseError
+
+from app.config import RedisSettings
+from app.redis import circuit_breaker
+from app.redis.circuit_breaker import CircuitBreaker
+from app.redis.metrics import LatencyHistogram
+from app.redis.redis_helper import InstrumentedRedis, RedisHelper
+
+
+@pytest.fixture
+def clock(mocker):
+    now = [1000.0]
+    mocker.patch.object(
+        circuit_breaker.time, "monotonic", side_effect=lambda: now[0]
+    )
+    return now
+
+
+@pytest.fixture
+def helper(mocker):
+    helper = RedisHelper(
+        RedisSettings(breaker_failure_threshold=2, breaker_reset_seconds=10)
+    )
+    helper.redis_client = mocker.Mock()
+    return helper
+
+
+def test_breaker_opens_and_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.trips == 1
+
+    clock[0] += 10
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert (breaker.state, breaker.trips) == ("open", 2)
+
+    clock[0] += 10
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_replaces_lost_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.allow()
+
+    clock[0] += 10
+    assert breaker.allow()
+
+
+def test_latency_histogram():
+    histogram = LatencyHistogram()
+    for ms in [0.2, 0.4, 3, 3, 2000]:
+        histogram.observe(ms / 1000)
+
+    assert histogram.counts[0] == 2
+    assert histogram.counts[3] == 2
+    assert histogram.counts[-1] == 1
+    assert histogram.percentile(50) == 5
+    assert histogram.percentile(99) == float("inf")
+
+
+@pytest.mark.asyncio
+async def test_execute_falls_back_and_stops_calling(helper):
+    async def failing(client):
+        raise ConnectionError
+
+    calls = [await helper.execute(failing, lambda: "local") for _ in range(3)]
+
+    assert calls == ["local"] * 3
+    assert helper.breaker.failures == 2
+    assert helper.breaker.state == "open"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_reports_breaker_and_commands(helper):
+    async def failing(client):
+        raise ConnectionError
+
+    helper.metrics.observe("GET", 0.001, failed=True)
+    for _ in range(2):
+        await helper.execute(failing, lambda: None)
+
+    snapshot = helper.snapshot()
+
+    assert snapshot["breaker"] == {"state": "open", "failures": 2, "trips": 1}
+    assert snapshot["commands"]["GET"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_execute_raises_other_errors(helper):
+    async def failing(client):
+        raise ResponseError
+
+    with pytest.raises(ResponseError):
+        await helper.execute(failing, lambda: "local")
+    assert helper.breaker.state == "closed"
+
+
+@pytest.mark.asyncio
+async def test_execute_without_client_falls_back():
+    assert await RedisHelper().execute(None, lambda: "local") == "local"
+
+
+@pytest.mark.asyncio
+async def test_instrumented_client_records_commands():
+    helper = RedisHelper()
+    client = InstrumentedRedis(
+        connection_pool=ConnectionPool(
+            connection_class=FakeAsyncRedisConnection,
+            server=fakeredis.FakeServer(),
+        )
+    )
+    client.metrics = helper.metrics
+    helper.redis_client = client
+
+    await helper.execute(lambda c: c.set("key", 1), lambda: None)
+    assert await helper.execute(lambda c: c.get("key"), lambda: None) == b"1"
+    await helper.close()
+
+    snapshot = helper.metrics.snapshot()
+    assert [snapshot["SET"]["calls"], snapshot["GET"]["calls"]] == [1, 1]
+    assert snapshot["GET"]["errors"] == 0
+    assert helper.redis_client is None
+
+
+def test_script_is_registered_once_per_client():
+    helper = RedisHelper()
+    client, other = fakeredis.FakeAsyncRedis(), fakeredis.FakeAsyncRedis()
+
+    script = helper.script(client, "return 1")
+
+    assert helper.script(client, "return 1") is script
+    assert helper.script(other, "return 1").registered_client is other